@@ -1,6 +1,12 @@
 import os
 from django.core.asgi import get_asgi_application
+from app_config.settings.logger import LoggingConfiguration
+from applications.shared.utils.hashing import init_password_hasher
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app_config.deployment')
+os.environ.setdefault('AUTH_ASYNC_VIEWS', 'true')
 
-application= get_asgi_application()
\ No newline at end of file
+init_password_hasher()
+application= get_asgi_application()
+# After Django's own logging setup, which would otherwise replace the queued handlers.
+LoggingConfiguration().configure_logging()
\ No newline at end of file
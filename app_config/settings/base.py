@@ -3,13 +3,13 @@
 import os
 from pathlib import Path
 from typing import List, Dict, Any
-from app_config.settings.cache import redis_cache_config
+from app_config.settings.cache_redis import redis_cache_config
 from app_config.settings.session import redis_session_config
 from app_config.settings.database import postgresql_config
 from functools import lru_cache
-from dotenv import load_dotenv
+from app_config.settings.env import load_environment
 
-load_dotenv()
+load_environment()
 
 class BaseConfig:
     """Core configurations handling Django."""
@@ -51,7 +51,9 @@ class BaseConfig:
             'django_redis',
             'celery',
         ]
-        PROJECT_APPS=[]
+        PROJECT_APPS=[
+            'applications.auth',
+        ]
         return THIRD_PARTY_APPS+ PROJECT_APPS
 
     @property
@@ -69,6 +71,23 @@ class BaseConfig:
         """Database configurations."""
         return self._db_config
 
+    @property
+    def email(self)-> Dict[str, Any]:
+        """
+        Outbound SMTP used by the mail worker.
+        Locally, `python -m aiosmtpd -n -l localhost:1025` is a debugging server printing every mail.
+        """
+        return {
+            'EMAIL_BACKEND':'django.core.mail.backends.smtp.EmailBackend',
+            'EMAIL_HOST':os.getenv('EMAIL_HOST', 'localhost'),
+            'EMAIL_PORT':int(os.getenv('EMAIL_PORT', 1025)),
+            'EMAIL_HOST_USER':os.getenv('EMAIL_HOST_USER', ''),
+            'EMAIL_HOST_PASSWORD':os.getenv('EMAIL_HOST_PASSWORD', ''),
+            'EMAIL_USE_TLS':os.getenv('EMAIL_USE_TLS', 'false').lower()== 'true',
+            'EMAIL_TIMEOUT':int(os.getenv('EMAIL_TIMEOUT', 10)),
+            'DEFAULT_FROM_EMAIL':os.getenv('DEFAULT_FROM_EMAIL', 'no-reply@localhost'),
+        }
+
     @property
     def middleware(self)-> List[str]:
         """
@@ -76,11 +95,15 @@ class BaseConfig:
         CAUTION: Order of list arrangement is crucial for expected application functioning!
         """
         middleware_default= [
+            'applications.shared.middleware.metrics.MetricsMiddleware',
             'django.middleware.security.SecurityMiddleware',
+            'django.contrib.sessions.middleware.SessionMiddleware',
             'django.middleware.common.CommonMiddleware',
             'django.middleware.csrf.CsrfViewMiddleware',
         ]
-        middleware_defined= [] # custom middleware here
+        middleware_defined= [
+            'applications.shared.middleware.rate_limit.RateLimitMiddleware',
+        ] # custom middleware here
 
         return middleware_default + middleware_defined
 
@@ -97,6 +120,7 @@ SECRET_KEY= config.secret_key
 BASE_DIR= config.base_dir
 # DATABASES= config.database (now configured in development.py application run point to avoid ImproperlyConfigured errors during migrate.)
 CACHES= config.cache
+DJANGO_REDIS_CONNECTION_FACTORY= 'app_config.settings.redis_registry.SharedConnectionFactory'
 MIDDLEWARE= config.middleware
 INSTALLED_APPS= config.installed_apps
 
@@ -109,6 +133,16 @@ SESSION_COOKIE_HTTPONLY= config.session['SESSION_COOKIE_HTTPONLY']
 SESSION_COOKIE_AGE= config.session['SESSION_COOKIE_AGE']
 SESSION_SAVE_EVERY_REQUEST= config.session['SESSION_SAVE_EVERY_REQUEST']
 
+# Outbound email (sent by the mail_worker command, never inside a request)
+EMAIL_BACKEND= config.email['EMAIL_BACKEND']
+EMAIL_HOST= config.email['EMAIL_HOST']
+EMAIL_PORT= config.email['EMAIL_PORT']
+EMAIL_HOST_USER= config.email['EMAIL_HOST_USER']
+EMAIL_HOST_PASSWORD= config.email['EMAIL_HOST_PASSWORD']
+EMAIL_USE_TLS= config.email['EMAIL_USE_TLS']
+EMAIL_TIMEOUT= config.email['EMAIL_TIMEOUT']
+DEFAULT_FROM_EMAIL= config.email['DEFAULT_FROM_EMAIL']
+
 # Deployment support
 ASGI_APPLICATION= 'app_config.asgi.application'
 WSGI_APPLICATION= 'app_config.wsgi.application'
@@ -1,10 +1,11 @@
 import os
+import logging
 from typing import Dict, Any
 from urllib.parse import quote
 from redis import ConnectionPool, Redis
-from dotenv import load_dotenv
+from app_config.settings.env import load_environment
 
-load_dotenv()
+load_environment()
 
 
 class RedisCacheConfig:
@@ -15,6 +16,10 @@ class RedisCacheConfig:
         self._redis_port = int(os.getenv('REDIS_PORT', 6379))
         self._redis_db = int(os.getenv('REDIS_DB', 0))
         self._redis_pswd = os.getenv('REDIS_PSWD')
+        self._serializer = os.getenv('CACHE_SERIALIZER', 'msgpack')
+        self._compressor = os.getenv('CACHE_COMPRESSOR', 'zlib')
+        self._compress_min_bytes = int(os.getenv('CACHE_COMPRESS_MIN_BYTES', 1024))
+        self._write_legacy = os.getenv('CACHE_WRITE_LEGACY', 'false').lower() == 'true'
 
         if not self._redis_host:
             raise ValueError("REDIS_HOST environment variable is not set.")
@@ -35,15 +40,34 @@ class RedisCacheConfig:
                 'BACKEND': 'django_redis.cache.RedisCache',
                 'LOCATION': self.redis_url,
                 'OPTIONS': {
-                    'CLIENT_CLASS': 'django_redis.cache.DefaultClient',
+                    'CLIENT_CLASS': 'django_redis.client.DefaultClient',
                     'CONNECTION_POOL_KWARGS': {
                         'max_connections': 100,
                         'retry_on_timeout': True,
                     },
+                    **self.codec_options,
                 },
             }
         }
 
+    @property
+    def codec_options(self) -> Dict[str, Any]:
+        """
+        Serializer options for cached values and sessions.
+        CACHE_SERIALIZER: msgpack | orjson | pickle; CACHE_COMPRESSOR: zlib | lz4 | none,
+        applied to payloads of at least CACHE_COMPRESS_MIN_BYTES.
+        Roll out with CACHE_WRITE_LEGACY=true until every worker runs a release that
+        reads the envelope, then unset it; legacy values stay readable either way.
+        """
+        return {
+            'SERIALIZER': 'applications.shared.utils.codecs.EnvelopeSerializer',
+            'COMPRESSOR': 'django_redis.compressors.identity.IdentityCompressor',
+            'ENVELOPE_SERIALIZER': self._serializer,
+            'ENVELOPE_COMPRESSOR': self._compressor,
+            'ENVELOPE_COMPRESS_MIN_BYTES': self._compress_min_bytes,
+            'ENVELOPE_WRITE_LEGACY': self._write_legacy,
+        }
+
     @property
     def cache_ttl(self) -> int:
         """Returns the default cache TTL (time-to-live) in seconds."""
@@ -51,26 +75,19 @@ class RedisCacheConfig:
 
     @property
     def redis_connect(self) -> ConnectionPool:
-        """Returns a Redis connection pool."""
-        return ConnectionPool.from_url(
-            self.redis_url,
-            max_connections=100,
-            socket_timeout=5,
-            socket_keepalive=True,
-            retry_on_timeout=True,
-        )
+        """Returns the process-wide Redis connection pool."""
+        from app_config.settings.redis_registry import redis_registry
+        return redis_registry().sync_pool()
 
-    def test_redis_connection(self):
-        """Tests the Redis connection."""
+    def test_redis_connection(self) -> bool:
+        """Tests the Redis connection. Call explicitly; importing settings must not touch the network."""
         try:
             r = Redis(connection_pool=self.redis_connect)
-            r.ping()
-            print("Redis connection successful!")
+            return bool(r.ping())
         except Exception as e:
-            print(f"Redis connection failed: {e}")
+            logging.getLogger('django').error(f"Redis connection failed: {e}")
+            return False
 
 
 # Singleton instance
-redis_cache_config = RedisCacheConfig()
-
-print(redis_cache_config.test_redis_connection())
\ No newline at end of file
+redis_cache_config = RedisCacheConfig()
\ No newline at end of file
@@ -1,14 +1,73 @@
 import os
+import time
 from functools import lru_cache
-from typing import Dict, Any
-from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from applications.shared.base import BaseModel
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from applications.shared.base import BaseModel, LiveRowsSession
+from applications.shared.utils import metrics
+from app_config.settings.env import load_environment
 
-load_dotenv()
+load_environment()
 Base= declarative_base(cls=BaseModel)
 
+
+class InstrumentedPoolMixin:
+    """Reports checkout wait time, overflow hits and checkout timeouts to the metrics hooks."""
+    metric_label= 'sync'
+
+    def _do_get(self):
+        started= time.perf_counter()
+        overflow= self._overflow
+        try:
+            connection= super()._do_get()
+        except exc.TimeoutError:
+            metrics.increment('db_pool_timeouts_total', pool=self.metric_label)
+            raise
+        metrics.observe('db_pool_checkout_seconds', time.perf_counter()- started, pool=self.metric_label)
+        if self._overflow> max(overflow, 0):
+            metrics.increment('db_pool_overflow_total', pool=self.metric_label)
+        return connection
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    metric_label= 'sync'
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    metric_label= 'async'
+
+
+def instrument_engine(engine:Engine, label:str)-> None:
+    """Reports query durations and pool invalidations of an engine to the metrics hooks."""
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_execute(connection, cursor, statement, parameters, context, executemany):
+        connection.info.setdefault('query_started', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_execute(connection, cursor, statement, parameters, context, executemany):
+        started= connection.info['query_started'].pop()
+        operation= statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'UNKNOWN'
+        metrics.observe('db_query_seconds', time.perf_counter()- started, pool=label, operation=operation)
+
+    @event.listens_for(engine, 'handle_error')
+    def on_error(context):
+        if context.connection is not None and context.connection.info.get('query_started'):
+            context.connection.info['query_started'].pop()
+        metrics.increment('db_query_errors_total', pool=label)
+
+    @event.listens_for(engine, 'invalidate')
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.increment('db_pool_invalidations_total', pool=label, soft='false')
+
+    @event.listens_for(engine, 'soft_invalidate')
+    def on_soft_invalidate(dbapi_connection, connection_record, exception):
+        metrics.increment('db_pool_invalidations_total', pool=label, soft='true')
+
+
 class DatabaseConfig:
     """Database configurations."""
     def __init__(self):
@@ -17,16 +76,101 @@ class DatabaseConfig:
         self.pg_host= os.getenv('DB_HOST')
         self.pg_port= os.getenv('DB_PORT')
         self.pg_db= os.getenv('DB_NAME')
+        # Full URLs override the DB_* parts, e.g. SQLite files standing in for Postgres.
+        self.database_url= os.getenv('DB_URL')
+        self.database_async_url= os.getenv('DB_ASYNC_URL')
+        self.replica_urls= [url.strip() for url in os.getenv('DB_REPLICA_URLS', '').split(',') if url.strip()]
+        self.replica_retry_seconds= float(os.getenv('DB_REPLICA_RETRY_SECONDS', 30))
+        self.read_your_writes_seconds= float(os.getenv('DB_READ_YOUR_WRITES_SECONDS', 5))
+        # Client users sharded by email over these databases (see app_config/settings/sharding.py).
+        self.shard_urls= [url.strip() for url in os.getenv('DB_SHARD_URLS', '').split(',') if url.strip()]
+
+        self.pool_size= int(os.getenv('DB_POOL_SIZE', 5))
+        self.max_overflow= int(os.getenv('DB_MAX_OVERFLOW', 10))
+        self.pool_recycle= int(os.getenv('DB_POOL_RECYCLE', 1800))
+        self.pool_timeout= float(os.getenv('DB_POOL_TIMEOUT', 30))
+        self.pool_pre_ping= os.getenv('DB_POOL_PRE_PING', 'true').lower()== 'true'
+        self.pool_use_lifo= os.getenv('DB_POOL_USE_LIFO', 'false').lower()== 'true'
+        # Per-process connection budget shared by Django and SQLAlchemy (0 = no budget).
+        self.connection_budget= int(os.getenv('DB_CONNECTION_BUDGET', 0))
+        self.django_pool_share= int(os.getenv('DB_DJANGO_POOL_SHARE', max(1, self.connection_budget// 4)))
+
+        if self.connection_budget and self.django_pool_share>= self.connection_budget:
+            raise ValueError('DB_DJANGO_POOL_SHARE must be lower than DB_CONNECTION_BUDGET.')
+
+    @property
+    def engines_per_database(self)-> int:
+        """
+        SQLAlchemy engines a process opens on the primary and on each shard: the sync one,
+        plus the async one when the ASGI views are enabled (AUTH_ASYNC_VIEWS).
+        """
+        return 2 if os.getenv('AUTH_ASYNC_VIEWS', 'false').lower()== 'true' else 1
+
+    def sqlalchemy_pool_limits(self, engines:Optional[int]=None)-> Tuple[int, int]:
+        """
+        (pool_size, max_overflow) of one SQLAlchemy engine. Under a budget, the SQLAlchemy share
+        is split between the `engines` engines opened on the same database
+        (engines_per_database by default), so together they stay within it.
+        """
+        if not self.connection_budget:
+            return self.pool_size, self.max_overflow
+        engines= engines or self.engines_per_database
+        available= (self.connection_budget- self.django_pool_share)// engines
+        if available< 1:
+            raise ValueError(f'DB_CONNECTION_BUDGET leaves no connection for each of {engines} SQLAlchemy engines.')
+        pool_size= min(self.pool_size, available)
+        return pool_size, min(self.max_overflow, available- pool_size)
+
+    def engine_options(self, asynchronous:bool=False, engines:Optional[int]=None)-> Dict[str, Any]:
+        """Pool options passed to create_engine/create_async_engine; engines as for sqlalchemy_pool_limits()."""
+        pool_size, max_overflow= self.sqlalchemy_pool_limits(engines)
+        return {
+            'poolclass':InstrumentedAsyncQueuePool if asynchronous else InstrumentedQueuePool,
+            'pool_size':pool_size,
+            'max_overflow':max_overflow,
+            'pool_recycle':self.pool_recycle,
+            'pool_timeout':self.pool_timeout,
+            'pool_pre_ping':self.pool_pre_ping,
+            'pool_use_lifo':self.pool_use_lifo,
+        }
 
     @property
     def postgresql_url(self)-> str:
         """Postgresql database URI."""
-        return (f'postgresql://{self.pg_user}:{self.pg_pswd}@'
+        if self.database_url:
+            return self.database_url
+        return (f'postgresql+psycopg://{self.pg_user}:{self.pg_pswd}@'
+                f'{self.pg_host}:{self.pg_port}/{self.pg_db}')
+
+    @property
+    def postgresql_async_url(self)-> str:
+        """Postgresql database URI for the asyncpg driver."""
+        if self.database_async_url:
+            return self.database_async_url
+        return (f'postgresql+asyncpg://{self.pg_user}:{self.pg_pswd}@'
                 f'{self.pg_host}:{self.pg_port}/{self.pg_db}')
 
     @property
     def django_db_config(self)-> Dict[str, Dict[str, Any]]:
-        """Default Django database configuration."""
+        """
+        Default Django database configuration.
+        Under a connection budget Django uses a bounded psycopg pool instead of
+        persistent per-thread connections, so both ORMs stay within the budget.
+        """
+        options= {
+            'connect_timeout':10,
+            'sslmode':'require',
+        }
+        conn_max_age= 60
+        if self.connection_budget:
+            options['pool']= {
+                'min_size':1,
+                'max_size':self.django_pool_share,
+                'timeout':self.pool_timeout,
+                'max_lifetime':self.pool_recycle,
+            }
+            conn_max_age= 0
+
         return {
             'default':{
                 'ENGINE':'django.db.backends.postgresql',
@@ -35,11 +179,8 @@ class DatabaseConfig:
                 'PASSWORD':self.pg_pswd,
                 'HOST':self.pg_host,
                 'PORT':self.pg_port,
-                'CONN_MAX_AGE':60,
-                'OPTIONS':{
-                    'connect_timeout':10,
-                    'sslmode':'require',
-                }
+                'CONN_MAX_AGE':conn_max_age,
+                'OPTIONS':options,
             }
         }
 
@@ -49,16 +190,124 @@ def postgresql_config()-> DatabaseConfig:
     """Returns a cached instance of the database configuration."""
     return DatabaseConfig()
 
-def init_postgresql()-> sessionmaker:
+def init_postgresql(url:Optional[str]=None, label:str='sync')-> sessionmaker:
+    """
+    Session factory on the primary, or on the database at url (a shard). With DB_REPLICA_URLS
+    set, sessions on the primary route read-only statements to the replicas
+    (see app_config/settings/db_routing.py).
+    """
     config= postgresql_config()
-    engine= create_engine(config.postgresql_url)
+    engine= create_engine(url or config.postgresql_url, **config.engine_options())
+    instrument_engine(engine, label)
+
+    if config.replica_urls and url is None:
+        from app_config.settings.db_routing import ReplicaSet, RoutingSession
+        replicas= []
+        for index, replica_url in enumerate(config.replica_urls):
+            # Only the sync engine reads from a replica, so it gets the whole share there.
+            replica= create_engine(replica_url, **config.engine_options(engines=1))
+            instrument_engine(replica, f'replica-{index}')
+            replicas.append(replica)
+        return sessionmaker(
+            class_=RoutingSession,
+            replicas=ReplicaSet(replicas, config.replica_retry_seconds),
+            read_your_writes=config.read_your_writes_seconds,
+            autoflush=False,
+            autocommit=False,
+            bind=engine
+        )
 
-    from applications.auth.auth_models import ClientUser
-    Base.metadata.create_all(bind=engine)
     return sessionmaker(
+        class_=LiveRowsSession,
         autoflush=False,
         autocommit=False,
         bind=engine
     )
 
-SessionLocal= init_postgresql()
\ No newline at end of file
+def init_postgresql_async(url:Optional[str]=None, label:str='async')-> async_sessionmaker:
+    """
+    Async session factory for ASGI views, on the primary or on the database at url.
+    Objects are not expired on commit so attributes stay readable without another await.
+    """
+    config= postgresql_config()
+    engine= create_async_engine(url or config.postgresql_async_url, **config.engine_options(asynchronous=True))
+    instrument_engine(engine.sync_engine, label)
+    return async_sessionmaker(
+        sync_session_class=LiveRowsSession,
+        autoflush=False,
+        expire_on_commit=False,
+        bind=engine
+    )
+
+@lru_cache()
+def session_factory()-> sessionmaker:
+    """Process-wide session factory, built on first use; sharded when DB_SHARD_URLS is set."""
+    if postgresql_config().shard_urls:
+        from app_config.settings.sharding import init_sharded
+        return init_sharded(init_postgresql)
+    return init_postgresql()
+
+@lru_cache()
+def async_session_factory()-> async_sessionmaker:
+    """Process-wide async session factory, built on first use; sharded when DB_SHARD_URLS is set."""
+    if postgresql_config().shard_urls:
+        from app_config.settings.sharding import init_sharded
+        return init_sharded(init_postgresql_async, asynchronous=True)
+    return init_postgresql_async()
+
+def create_schema()-> None:
+    """Creates missing tables and indexes on every shard. Run through `manage.py create_schema`, never on import."""
+    from applications.auth.auth_models import ClientUser, ClientUserArchive
+    for factory in SessionLocal.shards():
+        Base.metadata.create_all(bind=factory.kw['bind'])
+
+
+class LazySessionFactory:
+    """
+    Stands in for a session factory until it is first called, so importing this
+    module opens no connections and builds no engines.
+    """
+    def __init__(self, build:Callable[[], Any]):
+        self._build= build
+
+    def __call__(self, *args, **kwargs):
+        return self._build()(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._build(), name)
+
+    def for_key(self, normalized_email:str):
+        """
+        Session on the database owning a user's email; the only one when unsharded.
+        :raises ShardUnavailable: while the email's bucket moves between shards.
+        """
+        factory= self._build()
+        if isinstance(factory, (sessionmaker, async_sessionmaker)):
+            return factory()
+        return factory.for_key(normalized_email)
+
+    def shards(self)-> List[Any]:
+        """One session factory per database holding users: every shard, or just the one."""
+        factory= self._build()
+        if isinstance(factory, (sessionmaker, async_sessionmaker)):
+            return [factory]
+        return factory.shards()
+
+    def owner(self)-> Callable[[str], int]:
+        """Shard index (into shards()) owning a normalized email, under one snapshot of the map."""
+        factory= self._build()
+        if isinstance(factory, (sessionmaker, async_sessionmaker)):
+            return lambda normalized_email: 0
+        return factory.owner()
+
+    def partition(self, items, key:Callable[[Any], str])-> List[Tuple[Any, List[Any]]]:
+        """(session factory, items) per database, routing each item by key(item), a normalized email."""
+        factory= self._build()
+        if isinstance(factory, (sessionmaker, async_sessionmaker)):
+            items= list(items)
+            return [(factory, items)] if items else []
+        return factory.partition(items, key)
+
+
+SessionLocal= LazySessionFactory(session_factory)
+AsyncSessionLocal= LazySessionFactory(async_session_factory)
\ No newline at end of file
@@ -0,0 +1,114 @@
+"""Read-replica routing for SQLAlchemy sessions."""
+
+import time
+import logging
+import itertools
+import threading
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql import Select
+from applications.shared.base import LiveRowsSession
+from applications.shared.utils import metrics
+
+logger= logging.getLogger('django')
+
+# Monotonic time of the last committed write in the current request (thread or task).
+_last_write_at: ContextVar[float]= ContextVar('last_write_at', default=0.0)
+
+
+class ReplicaSet:
+    """
+    Round-robin over replica engines.
+    A replica that fails to connect is skipped for retry_after seconds and has to
+    answer a SELECT 1 probe before it receives traffic again.
+    """
+    def __init__(self, engines:List[Engine], retry_after:float):
+        self._engines= engines
+        self._retry_after= retry_after
+        self._cycle= itertools.cycle(range(len(engines)))
+        self._down_until: Dict[int, float]= {}
+        self._lock= threading.Lock()
+        for index, engine in enumerate(engines):
+            self._watch(index, engine)
+
+    def _watch(self, index:int, engine:Engine)-> None:
+        @event.listens_for(engine, 'handle_error')
+        def on_error(context):
+            if context.is_disconnect or context.connection is None:
+                self.mark_down(index)
+
+    def mark_down(self, index:int)-> None:
+        """Takes a replica out of rotation for the retry period."""
+        with self._lock:
+            self._down_until[index]= time.monotonic()+ self._retry_after
+        metrics.increment('db_replica_failures_total', replica=str(index))
+        logger.warning(f'Database replica {index} marked down for {self._retry_after}s.')
+
+    def _probe(self, index:int)-> bool:
+        try:
+            with self._engines[index].connect() as connection:
+                connection.execute(text('SELECT 1'))
+        except Exception:
+            # Connection failures already went through mark_down() via handle_error.
+            with self._lock:
+                self._down_until[index]= time.monotonic()+ self._retry_after
+            return False
+        with self._lock:
+            self._down_until.pop(index, None)
+        return True
+
+    def choose(self)-> Optional[Engine]:
+        """Next healthy replica, or None if all of them are down."""
+        for _ in range(len(self._engines)):
+            with self._lock:
+                index= next(self._cycle)
+                down_until= self._down_until.get(index)
+            if down_until is None:
+                return self._engines[index]
+            if down_until<= time.monotonic() and self._probe(index):
+                return self._engines[index]
+        return None
+
+
+class RoutingSession(LiveRowsSession):
+    """
+    Sends plain SELECTs to a replica and everything else to the primary bind.
+    Reads stay on the primary while flushing, for locking reads (SELECT ... FOR UPDATE),
+    when a statement or the session asks for it (use_primary), and for read_your_writes
+    seconds after a committed write in the same request.
+    """
+    def __init__(self, *args, replicas:Optional[ReplicaSet]=None, read_your_writes:float=0.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._replicas= replicas
+        self._read_your_writes= read_your_writes
+        self._wrote= False
+        event.listen(self, 'after_commit', self._after_commit)
+        event.listen(self, 'after_rollback', self._after_rollback)
+
+    def _after_commit(self, session)-> None:
+        if self._wrote:
+            _last_write_at.set(time.monotonic())
+            self._wrote= False
+
+    def _after_rollback(self, session)-> None:
+        self._wrote= False
+
+    def _reads_from_primary(self, clause)-> bool:
+        if self._flushing or self.info.get('use_primary'):
+            return True
+        if not isinstance(clause, Select) or clause.get_execution_options().get('use_primary'):
+            return True
+        # Row locks only mean something on the primary; replicas are read-only anyway.
+        if clause._for_update_arg is not None:
+            return True
+        return time.monotonic()- _last_write_at.get()< self._read_your_writes
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        primary= super().get_bind(mapper=mapper, clause=clause, **kwargs)
+        if self._replicas is None or self._reads_from_primary(clause):
+            if clause is None or not isinstance(clause, Select):
+                self._wrote= True
+            return primary
+        return self._replicas.choose() or primary
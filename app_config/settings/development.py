@@ -1,10 +1,10 @@
 import os
 from functools import lru_cache
 from typing import Dict, List
-from dotenv import load_dotenv
+from app_config.settings.env import load_environment
 from app_config.settings.base import BaseConfig
 
-load_dotenv()
+load_environment()
 
 class DevelopmentConfig(BaseConfig):
     """Development environment specific configurations."""
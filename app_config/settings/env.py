@@ -0,0 +1,13 @@
+"""Loads the project .env file once per process."""
+
+from functools import lru_cache
+from pathlib import Path
+from dotenv import load_dotenv
+
+ENV_FILE= Path(__file__).resolve().parent.parent.parent/ '.env'
+
+
+@lru_cache()
+def load_environment()-> bool:
+    """Loads .env into os.environ on first call; later calls are no-ops."""
+    return load_dotenv(ENV_FILE)
@@ -1,20 +1,143 @@
 import os
+import json
+import queue
+import atexit
 import logging
 import logging.config
-from app_config.settings.base import BASE_DIR
+import logging.handlers
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from applications.shared.utils import metrics
+
+# Attributes every LogRecord has; anything else was passed through `extra=` and goes into the JSON line.
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'taskName'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'line': record.lineno,
+            'process': record.process,
+            'thread': record.threadName,
+        }
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        return json.dumps(entry, default=str)
+
+
+class BatchedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Rotating file handler that leaves flushing to BatchingQueueListener, once per batch.
+    Tracks the file size itself: the stock shouldRollover() seeks the stream, which
+    flushes it on every record.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._size = None
+
+    def emit(self, record):
+        try:
+            line = self.format(record) + self.terminator
+            if self.stream is None:
+                self.stream = self._open()
+            if self._size is None:
+                self._size = os.path.getsize(self.baseFilename)
+            if self.maxBytes and self._size and self._size + len(line) > self.maxBytes:
+                self.doRollover()
+                self._size = 0
+                if self.stream is None:
+                    self.stream = self._open()
+            self.stream.write(line)
+            self._size += len(line)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        """Deferred; see flush_batch()."""
+
+    def flush_batch(self):
+        super().flush()
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Request-side handler: resolves the message and hands the record to the listener.
+    Formatting, tracebacks and file writes all happen on the listener thread. When the
+    queue is full the record is dropped and counted rather than blocking the request.
+    """
+
+    def prepare(self, record):
+        # Resolve args now so later mutation of the arguments cannot change the message.
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.increment('log_records_dropped_total')
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """Listener thread handling records in batches and flushing its file handlers once per batch."""
+
+    def __init__(self, log_queue, *handlers, batch_size=256):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self._batch_size = batch_size
+
+    def _monitor(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = False
+            for record in batch:
+                if record is self._sentinel:
+                    stop = True
+                    continue
+                self.handle(record)
+            for handler in self.handlers:
+                if isinstance(handler, BatchedRotatingFileHandler):
+                    handler.flush_batch()
+            for _ in batch:
+                self.queue.task_done()
+            if stop:
+                return
 
 
 class LoggingConfiguration:
     """Handles logging functionalities."""
 
-    def __init__(self, base_dir=BASE_DIR):
-        self._base_dir = base_dir
+    def __init__(self, base_dir=None):
+        self._base_dir = base_dir or Path(__file__).resolve().parent.parent.parent
         if not self._base_dir:
             raise ValueError(f'Base directory reference not set!')
         self._log_dir = os.path.join(self._base_dir, 'logs')
         self._info_dir = os.path.join(self._log_dir, 'info')
         self._error_dir = os.path.join(self._log_dir, 'errors')
         self._warning_dir = os.path.join(self._log_dir, 'warnings')
+        self._queued = os.getenv('LOG_QUEUE', 'true').lower() == 'true'
+        self._queue_size = int(os.getenv('LOG_QUEUE_SIZE', 10_000))
+        self._listener: Optional[BatchingQueueListener] = None
+        self._handlers: List[logging.Handler] = []
 
     def create_log_dirs(self):
         """Creates dynamically log directories by category."""
@@ -42,36 +165,39 @@ class LoggingConfiguration:
         """Custom logging configurations."""
         _logging = {
             'version': 1,
-            'disable_existing_handlers': False,
+            'disable_existing_loggers': False,
             'formatters': {
                 'standard': {
                     '()': lambda: self.get_formatter(),  # Fix: Make it a callable
                 },
+                'json': {
+                    '()': JsonFormatter,
+                },
             },
             'handlers': {
                 'info_file': {
-                    'class': 'logging.handlers.RotatingFileHandler',
+                    'class': 'app_config.settings.logger.BatchedRotatingFileHandler' if self._queued else 'logging.handlers.RotatingFileHandler',
                     'level': 'INFO',
                     'filename': os.path.join(self._info_dir, 'info.logs'),
                     'maxBytes': 1024 * 1024 * 5,
                     'backupCount': 5,
-                    'formatter': 'standard',
+                    'formatter': 'json',
                 },
                 'error_file': {
-                    'class': 'logging.handlers.RotatingFileHandler',
+                    'class': 'app_config.settings.logger.BatchedRotatingFileHandler' if self._queued else 'logging.handlers.RotatingFileHandler',
                     'level': 'ERROR',
                     'filename': os.path.join(self._error_dir, 'error.log'),
                     'maxBytes': 1024 * 1024 * 5,
                     'backupCount': 5,
-                    'formatter': 'standard',
+                    'formatter': 'json',
                 },
                 'warning_file': {
-                    'class': 'logging.handlers.RotatingFileHandler',
+                    'class': 'app_config.settings.logger.BatchedRotatingFileHandler' if self._queued else 'logging.handlers.RotatingFileHandler',
                     'level': 'WARNING',
                     'filename': os.path.join(self._warning_dir, 'warning.log'),
                     'maxBytes': 1024 * 1024 * 5,
                     'backupCount': 5,
-                    'formatter': 'standard',
+                    'formatter': 'json',
                 },
                 'console_logging': {
                     'class': 'logging.StreamHandler',
@@ -95,9 +221,46 @@ class LoggingConfiguration:
         return _logging
 
     def configure_logging(self):
-        """Sets up logging based on configurations."""
+        """
+        Sets up logging based on configurations.
+        With LOG_QUEUE=true (default) the root logger only gets a queue handler; the
+        configured handlers run on a single listener thread, restarted in forked workers.
+        """
         self.create_log_dirs()
         logging.config.dictConfig(self.logging_conf())
+        if not self._queued:
+            return
+        root = logging.getLogger()
+        self._handlers = list(root.handlers)
+        for handler in self._handlers:
+            root.removeHandler(handler)
+        self._start_listener()
+        atexit.register(self.stop_listener)
+        os.register_at_fork(after_in_child=self._start_listener)
+
+    def _start_listener(self):
+        """Attaches a fresh queue and listener thread to the root logger."""
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            if isinstance(handler, StructuredQueueHandler):
+                root.removeHandler(handler)
+        log_queue = queue.Queue(self._queue_size)
+        self._listener = BatchingQueueListener(log_queue, *self._handlers)
+        self._listener.start()
+        root.addHandler(StructuredQueueHandler(log_queue))
+
+    def stop_listener(self):
+        """Writes out queued records and stops the listener thread."""
+        if self._listener is None:
+            return
+        if self._listener._thread is not None:
+            self._listener.stop()
+        self._listener = None
+        for handler in self._handlers:
+            if isinstance(handler, BatchedRotatingFileHandler):
+                handler.flush_batch()
+            else:
+                handler.flush()
 
     def get_logger(self, name):
         """Returns a configured logger instance."""
@@ -0,0 +1,213 @@
+"""Process-wide Redis connection pools shared by the cache, sessions and application code."""
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlparse
+from redis import Connection, ConnectionPool, Redis
+from redis.asyncio import Connection as AsyncConnection, ConnectionPool as AsyncConnectionPool, Redis as AsyncRedis
+from redis.client import Pipeline
+from app_config.settings.cache_redis import RedisCacheConfig, redis_cache_config
+from applications.shared.utils import metrics
+
+
+def _command_name(args:Tuple[Any, ...])-> str:
+    name= args[0] if args else 'unknown'
+    return (name.decode() if isinstance(name, bytes) else str(name)).upper()
+
+
+class TimedConnection(Connection):
+    """
+    Observes redis_command_seconds{command} from sending a command to its reply.
+    Pipelines are timed as one 'PIPELINE' round trip.
+    """
+    _pending: Optional[Tuple[str, float]]= None
+
+    def send_command(self, *args, **kwargs):
+        started= time.perf_counter()
+        super().send_command(*args, **kwargs)
+        self._pending= (_command_name(args), started)
+
+    def send_packed_command(self, command, check_health=True):
+        started= time.perf_counter()
+        super().send_packed_command(command, check_health)
+        if self._pending is None:
+            self._pending= ('PIPELINE', started)
+
+    def read_response(self, *args, **kwargs):
+        try:
+            return super().read_response(*args, **kwargs)
+        finally:
+            if self._pending is not None:
+                command, started= self._pending
+                self._pending= None
+                metrics.observe('redis_command_seconds', time.perf_counter()- started, command=command)
+
+
+class AsyncTimedConnection(AsyncConnection):
+    """Async variant of TimedConnection."""
+    _pending: Optional[Tuple[str, float]]= None
+
+    async def send_command(self, *args, **kwargs):
+        started= time.perf_counter()
+        await super().send_command(*args, **kwargs)
+        self._pending= (_command_name(args), started)
+
+    async def send_packed_command(self, command, check_health=True):
+        started= time.perf_counter()
+        await super().send_packed_command(command, check_health)
+        if self._pending is None:
+            self._pending= ('PIPELINE', started)
+
+    async def read_response(self, *args, **kwargs):
+        try:
+            return await super().read_response(*args, **kwargs)
+        finally:
+            if self._pending is not None:
+                command, started= self._pending
+                self._pending= None
+                metrics.observe('redis_command_seconds', time.perf_counter()- started, command=command)
+
+
+class RedisRegistry:
+    """
+    Hands out a single sync pool and a single asyncio pool per process.
+    Pools are dropped in forked children (e.g. gunicorn workers forked after the
+    master imported settings) and rebuilt on first use there.
+    REDIS_FAKE=true backs both pools with an in-process fakeredis server (requirements-dev.txt).
+    """
+    def __init__(self, config:RedisCacheConfig):
+        self._config= config
+        self._max_connections= int(os.getenv('REDIS_MAX_CONNECTIONS', 100))
+        self._health_check_interval= int(os.getenv('REDIS_HEALTH_CHECK_INTERVAL', 30))
+        self._fake= os.getenv('REDIS_FAKE', 'false').lower()== 'true'
+        self._lock= threading.Lock()
+        self._pid= os.getpid()
+        self._sync_pool: Optional[ConnectionPool]= None
+        self._async_pool: Optional[AsyncConnectionPool]= None
+        self._fake_server= None
+
+    def reset(self)-> None:
+        """Forgets pools inherited from a parent process without closing its sockets."""
+        self._sync_pool= None
+        self._async_pool= None
+        self._pid= os.getpid()
+
+    def _check_fork(self)-> None:
+        if self._pid!= os.getpid():
+            self.reset()
+
+    def _pool_kwargs(self, asynchronous:bool)-> Dict[str, Any]:
+        kwargs= {}
+        # TLS (rediss://) and unix-socket URLs keep the connection class from_url() picks.
+        if urlparse(self._config.redis_url).scheme== 'redis':
+            kwargs['connection_class']= AsyncTimedConnection if asynchronous else TimedConnection
+        return {
+            **kwargs,
+            'max_connections':self._max_connections,
+            'health_check_interval':self._health_check_interval,
+            'socket_timeout':5,
+            'socket_keepalive':True,
+            'retry_on_timeout':True,
+        }
+
+    def _fake_pool_kwargs(self, asynchronous:bool)-> Dict[str, Any]:
+        import fakeredis
+        from fakeredis import aioredis
+        if self._fake_server is None:
+            self._fake_server= fakeredis.FakeServer()
+        return {
+            'connection_class':aioredis.FakeAsyncRedisConnection if asynchronous else fakeredis.FakeRedisConnection,
+            'server':self._fake_server,
+            'max_connections':self._max_connections,
+        }
+
+    def sync_pool(self)-> ConnectionPool:
+        """The shared synchronous connection pool."""
+        self._check_fork()
+        if self._sync_pool is None:
+            with self._lock:
+                if self._sync_pool is None:
+                    if self._fake:
+                        self._sync_pool= ConnectionPool(**self._fake_pool_kwargs(asynchronous=False))
+                    else:
+                        self._sync_pool= ConnectionPool.from_url(self._config.redis_url, **self._pool_kwargs(asynchronous=False))
+        return self._sync_pool
+
+    def async_pool(self)-> AsyncConnectionPool:
+        """The shared asyncio connection pool; meant for the single event loop of an ASGI worker."""
+        self._check_fork()
+        if self._async_pool is None:
+            with self._lock:
+                if self._async_pool is None:
+                    if self._fake:
+                        self._async_pool= AsyncConnectionPool(**self._fake_pool_kwargs(asynchronous=True))
+                    else:
+                        self._async_pool= AsyncConnectionPool.from_url(self._config.redis_url, **self._pool_kwargs(asynchronous=True))
+        return self._async_pool
+
+    def client(self)-> Redis:
+        """Sync client on the shared pool. Clients are cheap; pools are not."""
+        return Redis(connection_pool=self.sync_pool())
+
+    def async_client(self)-> AsyncRedis:
+        """Async client on the shared pool."""
+        return AsyncRedis(connection_pool=self.async_pool())
+
+    @contextmanager
+    def pipeline(self, transaction:bool=False)-> Iterator[Pipeline]:
+        """
+        Queues commands and sends them in one round trip when the block exits.
+        Usage: with registry.pipeline() as pipe: pipe.incr(key); pipe.expire(key, 60)
+        """
+        pipe= self.client().pipeline(transaction=transaction)
+        try:
+            yield pipe
+            pipe.execute()
+        finally:
+            pipe.reset()
+
+    @staticmethod
+    def _pool_stats(pool)-> Optional[Dict[str, int]]:
+        if pool is None:
+            return None
+        return {
+            'max_connections':pool.max_connections,
+            'created':len(pool._available_connections)+ len(pool._in_use_connections),
+            'in_use':len(pool._in_use_connections),
+            'available':len(pool._available_connections),
+        }
+
+    def stats(self)-> Dict[str, Any]:
+        """Usage of both pools in this process."""
+        self._check_fork()
+        return {
+            'pid':self._pid,
+            'sync':self._pool_stats(self._sync_pool),
+            'async':self._pool_stats(self._async_pool),
+        }
+
+
+@lru_cache()
+def redis_registry()-> RedisRegistry:
+    """Cached process-wide registry."""
+    registry= RedisRegistry(redis_cache_config)
+    os.register_at_fork(after_in_child=registry.reset)
+    return registry
+
+
+try:
+    from django_redis.pool import ConnectionFactory
+except ImportError:
+    ConnectionFactory= None
+
+if ConnectionFactory is not None:
+    class SharedConnectionFactory(ConnectionFactory):
+        """django_redis connection factory reusing the registry pool for the main Redis URL."""
+        def get_or_create_connection_pool(self, params):
+            if params.get('url')== redis_cache_config.redis_url:
+                return redis_registry().sync_pool()
+            return super().get_or_create_connection_pool(params)
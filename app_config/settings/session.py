@@ -1,15 +1,16 @@
+import os
 from typing import Dict, Union
-from app_config.settings.cache import RedisCacheConfig
+from app_config.settings.cache_redis import redis_cache_config
 
 class RedisSessionConfig:
     """Redis session management configurations."""
     def __init__(self):
-        self._redis_config= RedisCacheConfig()
+        self._redis_config= redis_cache_config
 
     @property
     def session_config(self)-> Dict[str, Union[str, int, bool]]:
         return {
-            'SESSION_ENGINE':'django.contrib.sessions.backends.cache',
+            'SESSION_ENGINE':os.getenv('SESSION_ENGINE', 'applications.shared.sessions.two_tier'),
             'SESSION_CACHE_ALIAS':'default',
             'SESSION_COOKIE_NAME':'sessionid',
             'SESSION_COOKIE_SECURE':True,
@@ -0,0 +1,359 @@
+"""
+Horizontal sharding of client users by normalized email.
+A stable hash of the normalized email picks one of a fixed number of virtual buckets and
+the shard map assigns every bucket to one of the DB_SHARD_URLS databases, so each user
+lives on exactly one shard and uniqueness is checked there alone. Resharding moves whole
+buckets between shards (see `manage.py reshard_users`).
+Ids stay unique across shards: shard k hands out ids congruent to k+ 1 modulo the map's
+id stride, so rows keep their id when their bucket moves and id lookups need no shard.
+"""
+
+import os
+import json
+import time
+import heapq
+import asyncio
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+from sqlalchemy import BigInteger, Column, MetaData, Table, func, inspect, select, text, update
+from sqlalchemy.engine import Engine, make_url
+from applications.shared.utils import metrics
+
+logger= logging.getLogger('django')
+
+Result= TypeVar('Result')
+
+# Next id to hand out on a SQLite shard, which has no sequences (one row per shard).
+id_counter= Table('shard_id_counter', MetaData(), Column('next_id', BigInteger, nullable=False))
+
+
+class ShardUnavailable(Exception):
+    """Raised for emails whose bucket is frozen while it moves to another shard."""
+    def __init__(self, bucket:int, retry_after:int):
+        super().__init__(f'Bucket {bucket} is moving to another shard.')
+        self.bucket= bucket
+        self.retry_after= retry_after
+
+
+def shard_bucket(normalized_email:str, buckets:int)-> int:
+    """Virtual bucket of an email; unlike hash(), stable across processes and hosts."""
+    digest= hashlib.blake2b(normalized_email.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')% buckets
+
+
+class ShardMap:
+    """Bucket -> shard assignment, the id stride and the buckets frozen by a running move."""
+    def __init__(self, assignments:List[int], id_stride:int, frozen:Iterable[int]=(), version:int=0):
+        self.assignments= list(assignments)
+        self.id_stride= id_stride
+        self.frozen= frozenset(frozen)
+        self.version= version
+
+    @classmethod
+    def initial(cls, buckets:int, shards:int, id_stride:int)-> 'ShardMap':
+        if not 0< shards<= id_stride:
+            raise ValueError(f'Between 1 and {id_stride} shards are supported, got {shards}.')
+        return cls([bucket% shards for bucket in range(buckets)], id_stride)
+
+    @property
+    def buckets(self)-> int:
+        return len(self.assignments)
+
+    @property
+    def shards(self)-> int:
+        """Shards owning at least one bucket, counted up to the highest one."""
+        return max(self.assignments)+ 1
+
+    def bucket_of(self, normalized_email:str)-> int:
+        return shard_bucket(normalized_email, self.buckets)
+
+    def shard_of(self, normalized_email:str)-> int:
+        return self.assignments[self.bucket_of(normalized_email)]
+
+    def rebalanced(self, shards:int)-> 'ShardMap':
+        """
+        Map spreading the buckets evenly over `shards` shards, moving as few buckets as possible.
+        Buckets of shards beyond the new count all move.
+        """
+        if not 0< shards<= self.id_stride:
+            raise ValueError(f'Between 1 and {self.id_stride} shards are supported, got {shards}.')
+        quota= [self.buckets// shards+ (1 if shard< self.buckets% shards else 0) for shard in range(shards)]
+        owned: Dict[int, List[int]]= {}
+        for bucket, shard in enumerate(self.assignments):
+            owned.setdefault(shard, []).append(bucket)
+
+        assignments= list(self.assignments)
+        spare= []
+        for shard, buckets in owned.items():
+            keep= quota[shard] if shard< shards else 0
+            spare.extend(buckets[keep:])
+        for shard in range(shards):
+            missing= quota[shard]- min(len(owned.get(shard, [])), quota[shard])
+            for _ in range(missing):
+                assignments[spare.pop()]= shard
+        return ShardMap(assignments, self.id_stride, version=self.version)
+
+    def moves(self, target:'ShardMap')-> Dict[Tuple[int, int], List[int]]:
+        """Buckets changing shard on the way to target, grouped by (source, destination)."""
+        moves: Dict[Tuple[int, int], List[int]]= {}
+        for bucket, (source, destination) in enumerate(zip(self.assignments, target.assignments)):
+            if source!= destination:
+                moves.setdefault((source, destination), []).append(bucket)
+        return moves
+
+    def to_dict(self)-> Dict[str, Any]:
+        return {
+            'version':self.version,
+            'id_stride':self.id_stride,
+            'assignments':self.assignments,
+            'frozen':sorted(self.frozen),
+        }
+
+    @classmethod
+    def from_dict(cls, data:Dict[str, Any])-> 'ShardMap':
+        return cls(data['assignments'], data['id_stride'], data.get('frozen', ()), data.get('version', 0))
+
+
+class ShardMapStore:
+    """
+    Shard map stored as JSON at DB_SHARD_MAP_PATH and shared by every worker process.
+    Processes re-read it when the file changes, checking at most every DB_SHARD_MAP_REFRESH seconds.
+    """
+    def __init__(self):
+        self.path= Path(os.getenv(
+            'DB_SHARD_MAP_PATH',
+            Path(__file__).resolve().parent.parent.parent/ 'shard_map.json',
+        ))
+        self.refresh= float(os.getenv('DB_SHARD_MAP_REFRESH', 1))
+        self._map: Optional[ShardMap]= None
+        self._mtime= None
+        self._checked_at= 0.0
+        self._lock= threading.Lock()
+
+    def exists(self)-> bool:
+        return self.path.exists()
+
+    def current(self)-> ShardMap:
+        """
+        :raises RuntimeError: if there is no map yet; `manage.py init_shards` writes the first one.
+        """
+        if self._map is not None and time.monotonic()< self._checked_at+ self.refresh:
+            return self._map
+        with self._lock:
+            self._checked_at= time.monotonic()
+            try:
+                mtime= self.path.stat().st_mtime_ns
+            except FileNotFoundError:
+                raise RuntimeError(f'No shard map at {self.path}; run `manage.py init_shards` first.') from None
+            if mtime!= self._mtime:
+                with open(self.path) as map_file:
+                    self._map= ShardMap.from_dict(json.load(map_file))
+                self._mtime= mtime
+                logger.info(f'Shard map version {self._map.version} loaded.')
+            return self._map
+
+    def save(self, shard_map:ShardMap)-> ShardMap:
+        """Writes the map atomically as the next version."""
+        shard_map.version= (self.current().version if self.exists() else 0)+ 1
+        temp_path= f'{self.path}.tmp'
+        with open(temp_path, 'w') as map_file:
+            json.dump(shard_map.to_dict(), map_file)
+        os.replace(temp_path, self.path)
+        with self._lock:
+            self._map, self._mtime, self._checked_at= shard_map, self.path.stat().st_mtime_ns, time.monotonic()
+        return shard_map
+
+
+@lru_cache()
+def shard_map_store()-> ShardMapStore:
+    return ShardMapStore()
+
+
+class ShardedSessionFactory:
+    """
+    Session factory over the shards. for_key() opens a session on the shard owning an email
+    and shards() lists one factory per shard for scatter-gather and maintenance. Calling it
+    without a key is refused, so no query silently lands on an arbitrary shard.
+    """
+    def __init__(self, factories:List[Any], store:ShardMapStore):
+        self._factories= factories
+        self._store= store
+
+    def __call__(self, *args, **kwargs):
+        raise RuntimeError('Sessions are sharded: use for_key(normalized_email) or shards().')
+
+    def for_key(self, normalized_email:str):
+        """:raises ShardUnavailable: while the email's bucket moves between shards."""
+        shard_map= self._store.current()
+        bucket= shard_map.bucket_of(normalized_email)
+        if bucket in shard_map.frozen:
+            metrics.increment('db_shard_frozen_total')
+            raise ShardUnavailable(bucket, max(1, round(self._store.refresh)))
+        return self._factories[shard_map.assignments[bucket]]()
+
+    def shards(self)-> List[Any]:
+        return list(self._factories)
+
+    def owner(self)-> Callable[[str], int]:
+        """
+        Shard owning each normalized email under the map as it is now. A moving bucket's rows
+        are on two shards until its move ends, so scatter-gather reads keep only the owner's.
+        """
+        return self._store.current().shard_of
+
+    def partition(self, items:Iterable[Result], key:Callable[[Result], str])-> List[Tuple[Any, List[Result]]]:
+        """
+        Groups items by the shard owning key(item), a normalized email, for batched writes.
+        :raises ShardUnavailable: if any of the buckets is moving.
+        """
+        shard_map= self._store.current()
+        groups: Dict[int, List[Result]]= {}
+        for item in items:
+            bucket= shard_map.bucket_of(key(item))
+            if bucket in shard_map.frozen:
+                raise ShardUnavailable(bucket, max(1, round(self._store.refresh)))
+            groups.setdefault(shard_map.assignments[bucket], []).append(item)
+        return [(self._factories[shard], group) for shard, group in sorted(groups.items())]
+
+
+def async_url(url:str)-> str:
+    """Async driver URL for a shard URL: aiosqlite for SQLite, asyncpg for Postgres."""
+    parsed= make_url(url)
+    backend= parsed.get_backend_name()
+    return parsed.set(drivername=f'{backend}+{"aiosqlite" if backend== "sqlite" else "asyncpg"}').render_as_string(hide_password=False)
+
+def shard_urls(asynchronous:bool=False)-> List[str]:
+    """
+    DB_SHARD_URLS, in shard order; only ever append to it. Async URLs come from
+    DB_SHARD_ASYNC_URLS or are derived from the sync ones.
+    """
+    from app_config.settings.database import postgresql_config
+    urls= postgresql_config().shard_urls
+    if not asynchronous:
+        return urls
+    async_urls= [url.strip() for url in os.getenv('DB_SHARD_ASYNC_URLS', '').split(',') if url.strip()]
+    return async_urls or [async_url(url) for url in urls]
+
+def init_sharded(build:Callable[[str, str], Any], asynchronous:bool=False)-> ShardedSessionFactory:
+    """
+    Sharded factory over per-shard factories made by build(url, label), i.e. init_postgresql
+    or init_postgresql_async. Sessions on SQLite shards carry the id stride for allocate_ids().
+    """
+    store= shard_map_store()
+    id_stride= store.current().id_stride if store.exists() else None
+    factories= []
+    for shard, url in enumerate(shard_urls(asynchronous)):
+        factory= build(url, f'shard-{shard}{"-async" if asynchronous else ""}')
+        info= {'shard':shard}
+        if id_stride and make_url(url).get_backend_name()== 'sqlite':
+            info['id_stride']= id_stride
+        factory.configure(info=info)
+        factories.append(factory)
+    return ShardedSessionFactory(factories, store)
+
+
+def _allocate(count:int, stride:int):
+    return update(id_counter).values(next_id=id_counter.c.next_id+ count* stride).returning(id_counter.c.next_id)
+
+def allocate_ids(session, count:int)-> Optional[List[int]]:
+    """
+    Ids for rows about to be inserted into a SQLite shard, in the session's transaction.
+    :returns: None where the database assigns ids itself (Postgres shards, unsharded databases).
+    """
+    stride= session.info.get('id_stride')
+    if not stride:
+        return None
+    next_id= session.execute(_allocate(count, stride)).scalar_one()
+    return list(range(next_id- count* stride, next_id, stride))
+
+async def aallocate_ids(session, count:int)-> Optional[List[int]]:
+    """Async variant of allocate_ids()."""
+    stride= session.info.get('id_stride')
+    if not stride:
+        return None
+    next_id= (await session.execute(_allocate(count, stride))).scalar_one()
+    return list(range(next_id- count* stride, next_id, stride))
+
+def highest_id(engine:Engine)-> int:
+    """Highest user id a database holds or has handed out, archived users included."""
+    from applications.auth.auth_models import ClientUser, ClientUserArchive
+    with engine.connect() as connection:
+        highest= max(
+            connection.execute(select(func.coalesce(func.max(model.id), 0))).scalar_one()
+            for model in (ClientUser, ClientUserArchive)
+        )
+        if engine.dialect.name== 'sqlite' and inspect(connection).has_table(id_counter.name):
+            highest= max(highest, connection.execute(select(func.coalesce(func.max(id_counter.c.next_id), 1))).scalar_one()- 1)
+    return highest
+
+def init_shard_ids(engine:Engine, shard:int, id_stride:int, above:int)-> int:
+    """
+    Makes a shard hand out ids congruent to shard+ 1 modulo id_stride, starting above `above`
+    (the highest id on any shard, so rows of an unsharded database can move anywhere):
+    an interleaved client_user sequence on Postgres, the shard_id_counter row on SQLite.
+    :returns: The next id the shard hands out.
+    """
+    start= (above// id_stride+ 1)* id_stride+ shard+ 1
+    with engine.begin() as connection:
+        if engine.dialect.name== 'sqlite':
+            id_counter.create(connection, checkfirst=True)
+            connection.execute(id_counter.delete())
+            connection.execute(id_counter.insert().values(next_id=start))
+        else:
+            sequence= connection.execute(text("SELECT pg_get_serial_sequence('client_user', 'id')")).scalar_one()
+            connection.execute(text(f'ALTER SEQUENCE {sequence} INCREMENT BY {id_stride} RESTART WITH {start}'))
+    return start
+
+
+@lru_cache()
+def _scatter_pool()-> ThreadPoolExecutor:
+    return ThreadPoolExecutor(
+        max_workers=int(os.getenv('DB_SHARD_SCATTER_WORKERS', 16)),
+        thread_name_prefix='shard-scatter',
+    )
+
+def scatter_gather(factories:List[Callable[[], Any]], query:Callable[[Any], Result])-> List[Result]:
+    """
+    Runs query(session) on every shard concurrently and returns the results in shard order.
+    Sessions are closed afterwards, so queries must return loaded rows, not lazy results.
+    """
+    def on_shard(factory)-> Result:
+        session= factory()
+        try:
+            return query(session)
+        finally:
+            session.close()
+
+    if len(factories)== 1:
+        return [on_shard(factories[0])]
+    return list(_scatter_pool().map(on_shard, factories))
+
+async def ascatter_gather(factories:List[Callable[[], Any]], query:Callable[[Any], Awaitable[Result]])-> List[Result]:
+    """Async variant of scatter_gather()."""
+    async def on_shard(factory)-> Result:
+        async with factory() as session:
+            return await query(session)
+
+    return list(await asyncio.gather(*(on_shard(factory) for factory in factories)))
+
+async def amerge(iterators:List[AsyncIterator[Result]], key:Callable[[Result], Any])-> AsyncIterator[Result]:
+    """heapq.merge() for async iterators that are each sorted by key."""
+    heap= []
+    for index, iterator in enumerate(iterators):
+        async for item in iterator:
+            heap.append((key(item), index, item))
+            break
+    heapq.heapify(heap)
+    while heap:
+        _, index, item= heap[0]
+        yield item
+        async for following in iterators[index]:
+            heapq.heapreplace(heap, (key(following), index, following))
+            break
+        else:
+            heapq.heappop(heap)
@@ -1,5 +1,8 @@
 from django.urls import path, include
+from applications.shared.middleware.metrics import metrics_view
 
 urlpatterns=[
-    path('auth/', include('applications.auth.auth_urls'))
+    path('auth/', include('applications.auth.auth_urls')),
+    path('admin/', include('applications.auth.admin_urls')),
+    path('metrics', metrics_view, name='metrics'),
 ]
\ No newline at end of file
@@ -1,6 +1,11 @@
 import os
 from django.core.wsgi import get_wsgi_application
+from app_config.settings.logger import LoggingConfiguration
+from applications.shared.utils.hashing import init_password_hasher
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app_config.deployment')
 
-application= get_wsgi_application()
\ No newline at end of file
+init_password_hasher()
+application= get_wsgi_application()
+# After Django's own logging setup, which would otherwise replace the queued handlers.
+LoggingConfiguration().configure_logging()
\ No newline at end of file
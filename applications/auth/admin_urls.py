@@ -0,0 +1,11 @@
+import os
+from django.urls import path
+from applications.auth.admin_views import admin_users, admin_users_async, admin_users_export, admin_users_export_async
+
+# ASGI deployments serve the async-native views (see app_config/asgi.py).
+async_views= os.getenv('AUTH_ASYNC_VIEWS', 'false').lower()== 'true'
+
+urlpatterns= [
+    path('users/', admin_users_async if async_views else admin_users, name='admin_users'),
+    path('users/export/', admin_users_export_async if async_views else admin_users_export, name='admin_users_export'),
+]
@@ -0,0 +1,267 @@
+"""
+Admin read API over client users: a keyset-paginated listing and streamed NDJSON/CSV exports.
+Every route requires ADMIN_API_TOKEN as a bearer token and answers 403 while it is unset.
+Password hashes are never part of the output (see ClientUserRow).
+With sharding, every shard is queried and the sorted per-shard results are merged, so
+pages and exports keep one global (created_at, id) order. Each shard only contributes the
+users the shard map assigns to it, so rows copied by a running reshard are not listed twice.
+"""
+
+import io
+import os
+import csv
+import hmac
+import heapq
+import base64
+import logging
+from datetime import datetime
+from typing import AsyncIterator, Callable, Iterable, Iterator, List, Optional, Tuple
+from django.http import HttpResponseForbidden, StreamingHttpResponse
+from app_config.settings.database import SessionLocal, AsyncSessionLocal
+from app_config.settings.sharding import amerge, ascatter_gather, scatter_gather
+from applications.auth.auth_models import ClientUserRow
+from applications.auth.auth_repository import Keyset, alist_users, astream_users, list_users, stream_users
+from applications.shared.queries import field_names
+from applications.shared.utils import fastjson
+from applications.shared.utils.email import normalize_email
+from applications.shared.utils.fastjson import FastJsonResponse
+
+logger= logging.getLogger('django')
+
+PAGE_SIZE= int(os.getenv('ADMIN_PAGE_SIZE', 100))
+PAGE_SIZE_MAX= int(os.getenv('ADMIN_PAGE_SIZE_MAX', 1000))
+EXPORT_BATCH_SIZE= int(os.getenv('ADMIN_EXPORT_BATCH_SIZE', 2000))
+
+EXPORT_FORMATS= {
+    'ndjson':('application/x-ndjson', 'ndjson'),
+    'csv':('text/csv; charset=utf-8', 'csv'),
+}
+
+
+def _authorized(request)-> bool:
+    token= os.getenv('ADMIN_API_TOKEN')
+    # compare_digest() only takes ASCII str; bytes keep a non-ASCII header a 403 rather than a TypeError.
+    return bool(token) and hmac.compare_digest(request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode())
+
+def encode_cursor(row:ClientUserRow)-> str:
+    """Opaque cursor pointing after a row."""
+    return base64.urlsafe_b64encode(f'{row.created_at.isoformat()}|{row.id}'.encode()).rstrip(b'=').decode()
+
+def decode_cursor(cursor:str)-> Keyset:
+    """:raises ValueError: for cursors not made by encode_cursor()."""
+    created_at, _, user_id= base64.urlsafe_b64decode(cursor+ '='* (-len(cursor)% 4)).decode().partition('|')
+    return datetime.fromisoformat(created_at), int(user_id)
+
+def _keyset(row:ClientUserRow)-> Keyset:
+    return row.created_at, row.id
+
+def _owned_by(session, owner:Callable[[str], int])-> Callable[[ClientUserRow], bool]:
+    """Keeps the rows of users the session's shard owns; init_sharded() tags sessions with their shard."""
+    shard= session.info.get('shard', 0)
+    return lambda row: owner(normalize_email(row.email))== shard
+
+def _owned_page(session, owned:Callable[[ClientUserRow], bool], limit:int, after:Optional[Keyset])-> List[ClientUserRow]:
+    """Up to limit rows of the shard's own users; reads further pages while rows of other shards are skipped."""
+    rows= []
+    while True:
+        page= list_users(session, limit, after)
+        rows.extend(row for row in page if owned(row))
+        if len(rows)>= limit or len(page)< limit:
+            return rows[:limit]
+        after= _keyset(page[-1])
+
+async def _aowned_page(session, owned:Callable[[ClientUserRow], bool], limit:int, after:Optional[Keyset])-> List[ClientUserRow]:
+    """Async variant of _owned_page()."""
+    rows= []
+    while True:
+        page= await alist_users(session, limit, after)
+        rows.extend(row for row in page if owned(row))
+        if len(rows)>= limit or len(page)< limit:
+            return rows[:limit]
+        after= _keyset(page[-1])
+
+def _values(row:ClientUserRow)-> List:
+    """Field values with datetimes as ISO 8601, identical for both JSON backends and CSV."""
+    return [
+        value.isoformat() if isinstance(value, datetime) else value
+        for value in (getattr(row, name) for name in field_names(ClientUserRow))
+    ]
+
+def _page_request(request)-> Tuple[Optional[Tuple[int, Optional[Keyset]]], Optional[FastJsonResponse]]:
+    """
+    Validates a listing request.
+    :return: ((limit, after), None) if valid | (None, error response) if not.
+    """
+    if request.method!= 'GET':
+        return None, FastJsonResponse({'error':'Invalid request method!'}, status=405)
+    try:
+        limit= int(request.GET.get('limit', PAGE_SIZE))
+        after= decode_cursor(request.GET['cursor']) if request.GET.get('cursor') else None
+    except (ValueError, UnicodeDecodeError):
+        return None, FastJsonResponse({'error':'Invalid limit or cursor!'}, status=400)
+    if not 0< limit<= PAGE_SIZE_MAX:
+        return None, FastJsonResponse({'error':f'Limit must be between 1 and {PAGE_SIZE_MAX}!'}, status=400)
+    return (limit, after), None
+
+def _page_response(rows:List[ClientUserRow], limit:int)-> FastJsonResponse:
+    """One more row than the limit is fetched to tell whether a next page exists."""
+    names= field_names(ClientUserRow)
+    page= rows[:limit]
+    return FastJsonResponse({
+        'users':[dict(zip(names, _values(row))) for row in page],
+        'next_cursor':encode_cursor(page[-1]) if len(rows)> limit else None,
+    })
+
+def _export_format(request)-> Tuple[Optional[str], Optional[FastJsonResponse]]:
+    if request.method!= 'GET':
+        return None, FastJsonResponse({'error':'Invalid request method!'}, status=405)
+    export_format= request.GET.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return None, FastJsonResponse({'error':f'Format must be one of {", ".join(EXPORT_FORMATS)}!'}, status=400)
+    return export_format, None
+
+def _line_encoder(export_format:str)-> Callable[[List], bytes]:
+    if export_format== 'ndjson':
+        names= field_names(ClientUserRow)
+        return lambda values: fastjson.dumps(dict(zip(names, values)))+ b'\n'
+
+    buffer= io.StringIO()
+    writer= csv.writer(buffer)
+    def encode(values:List)-> bytes:
+        writer.writerow(values)
+        line= buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line.encode()
+    return encode
+
+def _header(export_format:str, encode:Callable[[List], bytes])-> Iterable[bytes]:
+    return [encode(list(field_names(ClientUserRow)))] if export_format== 'csv' else []
+
+def _export_chunks(export_format:str)-> Iterator[bytes]:
+    """Export body in chunks of EXPORT_BATCH_SIZE rows; the sessions live as long as the download."""
+    encode= _line_encoder(export_format)
+    owner= SessionLocal.owner()
+    sessions= [factory() for factory in SessionLocal.shards()]
+    try:
+        yield from _header(export_format, encode)
+        batch= []
+        rows= heapq.merge(*(
+            filter(_owned_by(session, owner), stream_users(session, EXPORT_BATCH_SIZE))
+            for session in sessions
+        ), key=_keyset)
+        for row in rows:
+            batch.append(encode(_values(row)))
+            if len(batch)>= EXPORT_BATCH_SIZE:
+                yield b''.join(batch)
+                batch= []
+        if batch:
+            yield b''.join(batch)
+    finally:
+        for session in sessions:
+            session.close()
+
+async def _afilter(keep:Callable[[ClientUserRow], bool], rows:AsyncIterator[ClientUserRow])-> AsyncIterator[ClientUserRow]:
+    async for row in rows:
+        if keep(row):
+            yield row
+
+async def _aexport_chunks(export_format:str)-> AsyncIterator[bytes]:
+    """Async variant of _export_chunks()."""
+    encode= _line_encoder(export_format)
+    owner= AsyncSessionLocal.owner()
+    sessions= [factory() for factory in AsyncSessionLocal.shards()]
+    try:
+        for header in _header(export_format, encode):
+            yield header
+        batch= []
+        rows= amerge([
+            _afilter(_owned_by(session, owner), astream_users(session, EXPORT_BATCH_SIZE))
+            for session in sessions
+        ], key=_keyset)
+        async for row in rows:
+            batch.append(encode(_values(row)))
+            if len(batch)>= EXPORT_BATCH_SIZE:
+                yield b''.join(batch)
+                batch= []
+        if batch:
+            yield b''.join(batch)
+    finally:
+        for session in sessions:
+            await session.close()
+
+def _export_response(chunks, export_format:str)-> StreamingHttpResponse:
+    content_type, extension= EXPORT_FORMATS[export_format]
+    response= StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition']= f'attachment; filename="users-{datetime.now():%Y%m%d-%H%M%S}.{extension}"'
+    logger.info(f'User export started ({export_format}).')
+    return response
+
+
+# Admin user listing route
+def admin_users(request):
+    """
+    Lists users in creation order, ?limit= per page; follow next_cursor with ?cursor=.
+    :param request:
+    :return:
+    """
+    if not _authorized(request):
+        return HttpResponseForbidden()
+    params, error= _page_request(request)
+    if error:
+        return error
+
+    limit, after= params
+    owner= SessionLocal.owner()
+    pages= scatter_gather(SessionLocal.shards(), lambda session: _owned_page(session, _owned_by(session, owner), limit+ 1, after))
+    return _page_response(list(heapq.merge(*pages, key=_keyset))[:limit+ 1], limit)
+
+
+# Admin user listing route (ASGI)
+async def admin_users_async(request):
+    """
+    Async variant of admin_users().
+    :param request:
+    :return:
+    """
+    if not _authorized(request):
+        return HttpResponseForbidden()
+    params, error= _page_request(request)
+    if error:
+        return error
+
+    limit, after= params
+    owner= AsyncSessionLocal.owner()
+    pages= await ascatter_gather(AsyncSessionLocal.shards(), lambda session: _aowned_page(session, _owned_by(session, owner), limit+ 1, after))
+    return _page_response(list(heapq.merge(*pages, key=_keyset))[:limit+ 1], limit)
+
+
+# Admin user export route
+def admin_users_export(request):
+    """
+    Streams every user as NDJSON (default) or CSV (?format=csv) from a server-side cursor,
+    so memory stays constant whatever the table size.
+    :param request:
+    :return:
+    """
+    if not _authorized(request):
+        return HttpResponseForbidden()
+    export_format, error= _export_format(request)
+    if error:
+        return error
+    return _export_response(_export_chunks(export_format), export_format)
+
+
+# Admin user export route (ASGI)
+async def admin_users_export_async(request):
+    """
+    Async variant of admin_users_export().
+    :param request:
+    :return:
+    """
+    if not _authorized(request):
+        return HttpResponseForbidden()
+    export_format, error= _export_format(request)
+    if error:
+        return error
+    return _export_response(_aexport_chunks(export_format), export_format)
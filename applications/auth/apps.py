@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class AuthConfig(AppConfig):
+    """Client authentication application."""
+    name= 'applications.auth'
+    # 'auth' is taken by django.contrib.auth.
+    label= 'client_auth'
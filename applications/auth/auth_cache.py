@@ -0,0 +1,246 @@
+import os
+import logging
+import itertools
+from typing import Any, Dict, List, Optional, Set
+from django.core.cache import caches
+from redis.exceptions import RedisError
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+from app_config.settings.redis_registry import redis_registry
+from applications.auth.auth_models import ClientUser, ClientUserCredentials
+from applications.auth.auth_repository import find_user_by_email, afind_user_by_email
+from applications.shared.utils import metrics
+from applications.shared.utils.bloom import RedisBloomFilter
+from applications.shared.utils.email import normalize_email
+
+logger= logging.getLogger('django')
+
+
+class EmailExistenceFilter:
+    """
+    Negative cache in front of the email-uniqueness SELECT, keyed on normalized emails.
+    'Definitely absent' answers skip the database; anything else, including an
+    unseeded filter or an unreachable Redis, falls through to the SELECT.
+    Only registration relies on it, where the insert still enforces uniqueness;
+    a wrong 'absent' must never decide that a user does not exist.
+    """
+    def __init__(self):
+        self._key= os.getenv('EMAIL_FILTER_KEY', 'auth:email-filter')
+        self._capacity= int(os.getenv('EMAIL_FILTER_CAPACITY', 1_000_000))
+        self._error_rate= float(os.getenv('EMAIL_FILTER_ERROR_RATE', 0.01))
+        self._filter: Optional[RedisBloomFilter]= None
+
+    @property
+    def bloom(self)-> RedisBloomFilter:
+        """Filter bound to the shared Redis configuration, built on first use."""
+        if self._filter is None:
+            self._filter= RedisBloomFilter(
+                redis_registry().client(),
+                self._key,
+                self._capacity,
+                self._error_rate,
+                async_client=redis_registry().async_client(),
+            )
+        return self._filter
+
+    def might_exist(self, email:str)-> bool:
+        """False only when the filter is seeded and has never seen the email."""
+        try:
+            if not self.bloom.is_ready():
+                return True
+            present= self.bloom.might_contain(email)
+        except RedisError as exc:
+            logger.warning(f'Email filter unavailable, falling back to database: {exc}')
+            return True
+        metrics.increment('email_filter_checks_total', result='maybe' if present else 'absent')
+        return present
+
+    async def amight_exist(self, email:str)-> bool:
+        """Async variant of might_exist()."""
+        try:
+            if not await self.bloom.ais_ready():
+                return True
+            present= await self.bloom.amight_contain(email)
+        except RedisError as exc:
+            logger.warning(f'Email filter unavailable, falling back to database: {exc}')
+            return True
+        metrics.increment('email_filter_checks_total', result='maybe' if present else 'absent')
+        return present
+
+    @staticmethod
+    def record_false_positive()-> None:
+        """Counts a 'maybe' answer the database proved wrong."""
+        metrics.increment('email_filter_false_positives_total')
+
+    def record(self, email:str)-> None:
+        """Adds a newly registered email; failures only cost a later SELECT."""
+        try:
+            self.bloom.add(email)
+        except RedisError as exc:
+            logger.warning(f'Could not add email to filter: {exc}')
+
+    def record_many(self, emails:List[str])-> None:
+        """Adds a batch of newly imported emails."""
+        try:
+            if self.bloom.is_ready():
+                self.bloom.add_many(emails)
+        except RedisError as exc:
+            logger.warning(f'Could not add emails to filter: {exc}')
+
+    async def arecord(self, email:str)-> None:
+        """Async variant of record()."""
+        try:
+            await self.bloom.aadd(email)
+        except RedisError as exc:
+            logger.warning(f'Could not add email to filter: {exc}')
+
+    def warm(self, sessions:List[Session], batch_size:int=10_000)-> int:
+        """
+        Rebuilds the filter from the client_user table, on every shard when sharded.
+        Emails inserted while the rebuild runs are added again once it is swapped in.
+        :returns: Number of emails seeded.
+        """
+        started_at= [session.execute(select(func.now())).scalar_one() for session in sessions]
+        emails= itertools.chain.from_iterable(
+            session.execute(
+                select(ClientUser.normalized_email).execution_options(yield_per=batch_size)
+            ).scalars()
+            for session in sessions
+        )
+        count= self.bloom.rebuild(emails)
+
+        for session, started in zip(sessions, started_at):
+            late_emails= session.execute(
+                select(ClientUser.normalized_email).where(ClientUser.created_at>= started)
+            ).scalars()
+            self.bloom.add_many(late_emails)
+        return count
+
+
+email_filter= EmailExistenceFilter()
+
+
+class UserLookupCache:
+    """
+    Short-lived cache of the login record (id, password hash, verification state) keyed on
+    normalized email, stored through the default Django cache. Only existing users are
+    cached; unknown emails are answered by the database.
+    Entries are dropped after commit when a flush changes a user's password, email, deleted_at
+    or verified_at (see _collect_user_changes), and by explicit invalidate() calls for bulk UPDATEs.
+    """
+    def __init__(self):
+        self._prefix= os.getenv('USER_CACHE_PREFIX', 'auth:user')
+        self._ttl= int(os.getenv('USER_CACHE_TTL', 60))
+
+    @property
+    def cache(self):
+        return caches['default']
+
+    def key(self, normalized_email:str)-> str:
+        return f'{self._prefix}:{normalized_email}'
+
+    @staticmethod
+    def record(user:ClientUserCredentials)-> Dict[str, Any]:
+        return {
+            'id':user.id,
+            'first_name':user.first_name,
+            'last_name':user.last_name,
+            'password_hash':user.password_hash,
+            'verified':user.verified_at is not None,
+        }
+
+    def _cached(self, normalized_email:str)-> Optional[Dict[str, Any]]:
+        try:
+            record= self.cache.get(self.key(normalized_email))
+        except RedisError as exc:
+            logger.warning(f'User cache unavailable, falling back to database: {exc}')
+            return None
+        metrics.increment('user_cache_lookups_total', result='miss' if record is None else 'hit')
+        return record
+
+    def _store(self, normalized_email:str, record:Dict[str, Any])-> None:
+        try:
+            self.cache.set(self.key(normalized_email), record, self._ttl)
+        except RedisError as exc:
+            logger.warning(f'Could not cache user record: {exc}')
+
+    def fetch(self, session, normalized_email:str)-> Optional[Dict[str, Any]]:
+        """
+        Login record for an email: cache, then database. The email filter is not consulted:
+        an email it missed (a failed add, a rebuild racing a sign-up) would lock its user out.
+        """
+        record= self._cached(normalized_email)
+        if record is not None:
+            return record
+        user= find_user_by_email(session, normalized_email)
+        if user is None:
+            return None
+        record= self.record(user)
+        self._store(normalized_email, record)
+        return record
+
+    async def afetch(self, session, normalized_email:str)-> Optional[Dict[str, Any]]:
+        """Async variant of fetch()."""
+        try:
+            record= await self.cache.aget(self.key(normalized_email))
+        except RedisError as exc:
+            logger.warning(f'User cache unavailable, falling back to database: {exc}')
+            record= None
+        else:
+            metrics.increment('user_cache_lookups_total', result='miss' if record is None else 'hit')
+        if record is not None:
+            return record
+        user= await afind_user_by_email(session, normalized_email)
+        if user is None:
+            return None
+        record= self.record(user)
+        try:
+            await self.cache.aset(self.key(normalized_email), record, self._ttl)
+        except RedisError as exc:
+            logger.warning(f'Could not cache user record: {exc}')
+        return record
+
+    def invalidate(self, *normalized_emails:str)-> None:
+        """Drops cached records; a failure leaves them to expire with the TTL."""
+        try:
+            self.cache.delete_many([self.key(email) for email in normalized_emails])
+        except RedisError as exc:
+            logger.warning(f'Could not invalidate cached users: {exc}')
+
+    async def ainvalidate(self, *normalized_emails:str)-> None:
+        """Async variant of invalidate()."""
+        try:
+            await self.cache.adelete_many([self.key(email) for email in normalized_emails])
+        except RedisError as exc:
+            logger.warning(f'Could not invalidate cached users: {exc}')
+
+
+user_lookup_cache= UserLookupCache()
+
+_INVALIDATING_FIELDS= ('password_hash', 'email', 'deleted_at', 'verified_at')
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_user_changes(session, flush_context, instances)-> None:
+    """
+    Remembers emails of users whose login record is about to change.
+    Runs before the flush: SQL expressions such as deleted_at= func.now() leave no history afterwards.
+    """
+    emails: Set[str]= session.info.setdefault('user_cache_evict', set())
+    for instance in session.dirty | session.deleted:
+        if not isinstance(instance, ClientUser):
+            continue
+        state= inspect(instance)
+        if instance in session.deleted or any(state.attrs[field].history.has_changes() for field in _INVALIDATING_FIELDS):
+            history= state.attrs.email.history
+            emails.update(normalize_email(email) for email in (*history.deleted, *history.unchanged, *history.added) if email)
+
+@event.listens_for(Session, 'after_commit')
+def _evict_changed_users(session)-> None:
+    emails= session.info.pop('user_cache_evict', None)
+    if emails:
+        user_lookup_cache.invalidate(*emails)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changed_users(session)-> None:
+    session.info.pop('user_cache_evict', None)
@@ -1,5 +1,13 @@
-from sqlalchemy import Column, String
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Column, DateTime, Index, String, func, text
 from app_config.settings.database import Base
+from applications.shared.utils.email import normalize_email
+
+
+def _normalized_email(context)-> str:
+    return normalize_email(context.get_current_parameters()['email'])
 
 
 class ClientUser(Base):
@@ -15,18 +23,110 @@ class ClientUser(Base):
     email= Column(
         String(100),
         nullable=False,
-        unique=True,
+    )
+    # normalize_email() of email, filled in on insert. Uniqueness and lookups use it rather than
+    # lower(email), whose case folding differs between Python and the databases outside ASCII.
+    normalized_email= Column(
+        String(100),
+        nullable=False,
+        default=_normalized_email,
     )
     password_hash= Column(
         String(255),
         nullable=False,
     )
+    # Set once the user follows the emailed verification link.
+    verified_at= Column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+    # Emails are unique case-insensitively among live rows, so a soft-deleted email can register again.
+    # Lookups must filter on normalized_email and deleted_at IS NULL to use it.
+    __table_args__= (
+        Index(
+            'uq_client_user_live_normalized_email',
+            'normalized_email',
+            unique=True,
+            postgresql_where=text('deleted_at IS NULL'),
+            sqlite_where=text('deleted_at IS NULL'),
+        ),
+        Index(
+            'ix_client_user_deleted_at',
+            'deleted_at',
+            postgresql_where=text('deleted_at IS NOT NULL'),
+            sqlite_where=text('deleted_at IS NOT NULL'),
+        ),
+        # Keyset pagination and exports walk users in (created_at, id) order.
+        Index(
+            'ix_client_user_created_at_id',
+            'created_at',
+            'id',
+        ),
+    )
 
     def __init__(self, first_name:str, last_name:str, email:str, password_hash:str):
         self.first_name= first_name
         self.last_name= last_name
         self.email= email
+        self.normalized_email= normalize_email(email)
         self.password_hash= password_hash
 
     def __repr__(self):
-        return f'<ClientUser: (id={self.id} | name={self.first_name} {self.last_name} | email={self.email})'
\ No newline at end of file
+        return f'<ClientUser: (id={self.id} | name={self.first_name} {self.last_name} | email={self.email})'
+
+
+@dataclass(slots=True, frozen=True)
+class ClientUserRow:
+    """Read model of a client user for listings and exports; never carries the password hash."""
+    id: int
+    first_name: str
+    last_name: str
+    email: str
+    verified_at: Optional[datetime]
+    created_at: datetime
+
+
+@dataclass(slots=True, frozen=True)
+class ClientUserCredentials:
+    """Read model of what a login needs."""
+    id: int
+    first_name: str
+    last_name: str
+    password_hash: str
+    verified_at: Optional[datetime]
+
+
+class ClientUserArchive(Base):
+    """Soft-deleted client users moved out of client_user after the retention period."""
+    live_rows_only= False
+
+    first_name= Column(
+        String(40),
+        nullable=False,
+    )
+    last_name= Column(
+        String(40),
+        nullable=False,
+    )
+    email= Column(
+        String(100),
+        nullable=False,
+    )
+    normalized_email= Column(
+        String(100),
+        nullable=False,
+    )
+    password_hash= Column(
+        String(255),
+        nullable=False,
+    )
+    verified_at= Column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+    archived_at= Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
@@ -0,0 +1,182 @@
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import String, func, literal, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from app_config.settings.sharding import aallocate_ids, allocate_ids
+from applications.auth.auth_models import ClientUser, ClientUserCredentials, ClientUserRow
+from applications.shared.queries import aall_rows, afirst, all_rows, astream, first, select_rows, stream
+
+# Position of a user in listing order: (created_at, id).
+Keyset= Tuple[datetime, int]
+
+
+def _insert_user_if_absent(dialect_name:str, **values):
+    """INSERT ... ON CONFLICT (normalized_email) DO NOTHING RETURNING id for the session's dialect."""
+    insert= sqlite.insert if dialect_name== 'sqlite' else postgresql.insert
+    return (
+        insert(ClientUser)
+        .values(**values)
+        .on_conflict_do_nothing(index_elements=[ClientUser.normalized_email], index_where=ClientUser.live())
+        .returning(ClientUser.id)
+    )
+
+def bulk_create_users_if_absent(session, rows:List[Dict[str, str]])-> List[str]:
+    """
+    Inserts many users with one executemany, skipping emails that are already taken.
+    :returns: Emails actually inserted.
+    """
+    if not rows:
+        return []
+    ids= allocate_ids(session, len(rows))
+    if ids:
+        rows= [dict(row, id=user_id) for row, user_id in zip(rows, ids)]
+    insert= sqlite.insert if session.get_bind().dialect.name== 'sqlite' else postgresql.insert
+    statement= (
+        insert(ClientUser)
+        .on_conflict_do_nothing(index_elements=[ClientUser.normalized_email], index_where=ClientUser.live())
+        .returning(ClientUser.email)
+    )
+    inserted= session.execute(statement, rows).scalars().all()
+    session.commit()
+    return inserted
+
+def _by_email(statement, normalized_email:str):
+    """Filters live rows on normalized_email so the uq_client_user_live_normalized_email index is used."""
+    return statement.where(ClientUser.normalized_email== normalized_email, ClientUser.live())
+
+def email_exists(session, normalized_email:str)-> bool:
+    """Checks if a user with the given normalized email exists."""
+    return session.execute(
+        _by_email(select(ClientUser.id), normalized_email).limit(1)
+    ).first() is not None
+
+async def aemail_exists(session, normalized_email:str)-> bool:
+    """Async variant of email_exists()."""
+    result= await session.execute(
+        _by_email(select(ClientUser.id), normalized_email).limit(1)
+    )
+    return result.first() is not None
+
+def find_user_by_email(session, normalized_email:str)-> Optional[ClientUserCredentials]:
+    """Login lookup by normalized email; a read model, not a tracked ClientUser."""
+    return first(session, _by_email(select_rows(ClientUser, ClientUserCredentials), normalized_email), ClientUserCredentials)
+
+async def afind_user_by_email(session, normalized_email:str)-> Optional[ClientUserCredentials]:
+    """Async variant of find_user_by_email()."""
+    return await afirst(session, _by_email(select_rows(ClientUser, ClientUserCredentials), normalized_email), ClientUserCredentials)
+
+def update_password_hash(session, user_id:int, password_hash:str)-> None:
+    """Stores a rehashed password; callers invalidate the cached login record."""
+    session.execute(update(ClientUser).where(ClientUser.id== user_id).values(password_hash=password_hash))
+    session.commit()
+
+async def aupdate_password_hash(session, user_id:int, password_hash:str)-> None:
+    """Async variant of update_password_hash()."""
+    await session.execute(update(ClientUser).where(ClientUser.id== user_id).values(password_hash=password_hash))
+    await session.commit()
+
+def create_user_if_absent(session, first_name:str, last_name:str, email:str, password_hash:str)-> Optional[int]:
+    """
+    Inserts a user unless the email is already taken, in a single statement.
+    Concurrent sign-ups for one email cannot race into an IntegrityError. With sharding,
+    the session is on the email's shard, which is the only one that can hold it.
+    :returns: The new user id | None if the email already exists.
+    """
+    ids= allocate_ids(session, 1)
+    statement= _insert_user_if_absent(
+        session.get_bind().dialect.name,
+        first_name=first_name,
+        last_name=last_name,
+        email=email,
+        password_hash=password_hash,
+        **({'id':ids[0]} if ids else {}),
+    )
+    user_id= session.execute(statement).scalar_one_or_none()
+    session.commit()
+    return user_id
+
+async def acreate_user_if_absent(session, first_name:str, last_name:str, email:str, password_hash:str)-> Optional[int]:
+    """Async variant of create_user_if_absent()."""
+    ids= await aallocate_ids(session, 1)
+    statement= _insert_user_if_absent(
+        session.bind.dialect.name,
+        first_name=first_name,
+        last_name=last_name,
+        email=email,
+        password_hash=password_hash,
+        **({'id':ids[0]} if ids else {}),
+    )
+    result= await session.execute(statement)
+    user_id= result.scalar_one_or_none()
+    await session.commit()
+    return user_id
+
+def _email_of(user_id:int):
+    return select(ClientUser.normalized_email).where(ClientUser.id== user_id, ClientUser.live())
+
+def find_email_by_id(session, user_id:int)-> Optional[str]:
+    """Normalized email of a live user; ids are unique across shards, so any shard holding the row answers."""
+    return session.execute(_email_of(user_id)).scalars().first()
+
+async def afind_email_by_id(session, user_id:int)-> Optional[str]:
+    """Async variant of find_email_by_id()."""
+    result= await session.execute(_email_of(user_id))
+    return result.scalars().first()
+
+def _mark_verified(user_id:int):
+    """UPDATE of a live, still unverified user; doubles as the existence check."""
+    return (
+        update(ClientUser)
+        .where(ClientUser.id== user_id, ClientUser.live(), ClientUser.verified_at.is_(None))
+        .values(verified_at=func.now())
+        .returning(ClientUser.normalized_email)
+    )
+
+def mark_verified(session, user_id:int)-> Optional[str]:
+    """
+    Marks a user's email as verified in a single statement. Callers invalidate the
+    cached login record, which this bulk UPDATE bypasses.
+    :returns: The user's normalized email | None if the user does not exist, was deleted or is already verified.
+    """
+    email= session.execute(_mark_verified(user_id)).scalar_one_or_none()
+    session.commit()
+    return email
+
+async def amark_verified(session, user_id:int)-> Optional[str]:
+    """Async variant of mark_verified()."""
+    result= await session.execute(_mark_verified(user_id))
+    email= result.scalar_one_or_none()
+    await session.commit()
+    return email
+
+def _listing(dialect_name:str, after:Optional[Keyset]):
+    """Users in (created_at, id) order after a keyset, served by ix_client_user_created_at_id."""
+    statement= select_rows(ClientUser, ClientUserRow).order_by(ClientUser.created_at, ClientUser.id)
+    if after is None:
+        return statement
+    created_at, user_id= after
+    if dialect_name== 'sqlite':
+        # SQLite keeps timestamps as text and the CURRENT_TIMESTAMP default has no fraction,
+        # while bound datetimes always carry one; compare with the text as stored.
+        stored= created_at.replace(tzinfo=None).isoformat(sep=' ')
+        return statement.where(tuple_(ClientUser.created_at, ClientUser.id)> tuple_(literal(stored, String), user_id))
+    return statement.where(tuple_(ClientUser.created_at, ClientUser.id)> tuple_(created_at, user_id))
+
+def list_users(session, limit:int, after:Optional[Keyset]=None)-> List[ClientUserRow]:
+    """
+    One page of users for the admin listing. Pass the last row's (created_at, id) as
+    `after` for the next page; unlike OFFSET, every page costs the same.
+    """
+    return all_rows(session, _listing(session.get_bind().dialect.name, after).limit(limit), ClientUserRow)
+
+async def alist_users(session, limit:int, after:Optional[Keyset]=None)-> List[ClientUserRow]:
+    """Async variant of list_users()."""
+    return await aall_rows(session, _listing(session.bind.dialect.name, after).limit(limit), ClientUserRow)
+
+def stream_users(session, batch_size:int)-> Iterator[ClientUserRow]:
+    """All users in listing order from a server-side cursor, batch_size rows in memory at a time."""
+    return stream(session, _listing(session.get_bind().dialect.name, None), ClientUserRow, batch_size)
+
+def astream_users(session, batch_size:int)-> AsyncIterator[ClientUserRow]:
+    """Async variant of stream_users()."""
+    return astream(session, _listing(session.bind.dialect.name, None), ClientUserRow, batch_size)
@@ -0,0 +1,141 @@
+"""
+Request parsing shared by the auth views.
+Bodies are capped on their Content-Length before anything is read, decoded with
+applications.shared.utils.fastjson and checked against a schema, so malformed or
+oversized payloads are rejected before any Redis, database or hashing work.
+"""
+
+import os
+import logging
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+from applications.auth.auth_models import ClientUser
+from applications.shared.utils import fastjson
+from applications.shared.utils.email import normalize_email
+from applications.shared.utils.fastjson import FastJsonResponse
+
+logger= logging.getLogger('django')
+
+# Largest accepted body; registration and login payloads are a few hundred bytes.
+MAX_BODY_BYTES= int(os.getenv('AUTH_MAX_BODY_BYTES', 4096))
+# Bounds the Argon2 input of new passwords.
+PASSWORD_MAX_LENGTH= int(os.getenv('AUTH_PASSWORD_MAX_LENGTH', 1024))
+
+
+class Field(NamedTuple):
+    """A required, non-blank string field of a JSON payload."""
+    max_length: int
+    strip: bool= False
+    email: bool= False
+
+
+def _column_length(name:str)-> int:
+    return ClientUser.__table__.c[name].type.length
+
+REGISTRATION_SCHEMA: Dict[str, Field]= {
+    'first_name':Field(_column_length('first_name')),
+    'last_name':Field(_column_length('last_name')),
+    'email':Field(_column_length('email'), strip=True, email=True),
+    'password':Field(PASSWORD_MAX_LENGTH),
+}
+
+LOGIN_SCHEMA: Dict[str, Field]= {
+    'email':Field(_column_length('email')),
+    'password':Field(MAX_BODY_BYTES),
+}
+
+
+def _error(message:str, status:int)-> FastJsonResponse:
+    return FastJsonResponse({'error':message}, status=status)
+
+def _is_email(value:str)-> bool:
+    local, at, domain= value.rpartition('@')
+    return bool(at and local and domain)
+
+def json_body(request)-> Tuple[Any, Optional[FastJsonResponse]]:
+    """
+    Decodes a JSON body of at most MAX_BODY_BYTES. The declared length is checked
+    before the body is read; bodies sent without one are checked once read.
+    :param request:
+    :return: (document, None) if valid | (None, error response) if not.
+    """
+    try:
+        declared= int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        declared= 0
+    if declared> MAX_BODY_BYTES or len(request.body)> MAX_BODY_BYTES:
+        logger.warning(f'Request body over {MAX_BODY_BYTES} bytes rejected.')
+        return None, _error('Request body too large!', 413)
+
+    try:
+        return fastjson.loads(request.body), None
+    except fastjson.JSONDecodeError:
+        logger.warning('Invalid JSON data!')
+        return None, _error('Invalid JSON!', 400)
+
+def check_fields(data:Any, schema:Dict[str, Field], missing_message:str)-> Tuple[Optional[Dict[str, str]], Optional[str]]:
+    """
+    Checks a decoded payload against a schema; other keys are ignored. Shared with
+    `manage.py import_users`, so imported rows pass the same checks as sign-ups.
+    :return: (fields, None) if valid | (None, reason) if not.
+    """
+    if not isinstance(data, dict):
+        return None, missing_message
+
+    fields= {}
+    for name, field in schema.items():
+        value= data.get(name)
+        if not isinstance(value, str) or not value.strip():
+            return None, missing_message
+        if field.strip:
+            value= value.strip()
+        if len(value)> field.max_length:
+            return None, f'Field {name} is longer than {field.max_length} characters!'
+        if field.email and not _is_email(value):
+            return None, 'Invalid email address!'
+        fields[name]= value
+    return fields, None
+
+def validate(data:Any, schema:Dict[str, Field], missing_message:str)-> Tuple[Optional[Dict[str, str]], Optional[FastJsonResponse]]:
+    """
+    check_fields() with its reason turned into a 400 response.
+    :return: (fields, None) if valid | (None, error response) if not.
+    """
+    fields, reason= check_fields(data, schema, missing_message)
+    if reason:
+        return None, _error(reason, 400)
+    return fields, None
+
+def _post_payload(request, schema:Dict[str, Field], missing_message:str)-> Tuple[Optional[Dict[str, str]], Optional[FastJsonResponse]]:
+    if request.method!= 'POST':
+        logger.warning('Request method invalid!')
+        return None, _error('Invalid request method!', 405)
+    data, error= json_body(request)
+    if error:
+        return None, error
+    return validate(data, schema, missing_message)
+
+def registration_fields(request)-> Tuple[Optional[Dict[str, str]], Optional[FastJsonResponse]]:
+    """
+    Validates the registration request and extracts its fields.
+    :param request:
+    :return: (fields, None) if valid | (None, error response) if not.
+    """
+    fields, error= _post_payload(request, REGISTRATION_SCHEMA, 'Some required fields are empty!')
+    if error:
+        return None, error
+    fields['normalized_email']= normalize_email(fields['email'])
+    return fields, None
+
+def login_fields(request)-> Tuple[Optional[Dict[str, str]], Optional[FastJsonResponse]]:
+    """
+    Validates the login request and extracts its fields.
+    :param request:
+    :return: (fields, None) if valid | (None, error response) if not.
+    """
+    fields, error= _post_payload(request, LOGIN_SCHEMA, 'Email and password are required!')
+    if error:
+        return None, error
+    return {
+        'password':fields['password'],
+        'normalized_email':normalize_email(fields['email']),
+    }, None
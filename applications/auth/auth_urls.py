@@ -1,6 +1,12 @@
+import os
 from django.urls import path
-from applications.auth.auth_views import register
+from applications.auth.auth_views import register, register_async, verify, verify_async, login, login_async
+
+# ASGI deployments serve the async-native views (see app_config/asgi.py).
+async_views= os.getenv('AUTH_ASYNC_VIEWS', 'false').lower()== 'true'
 
 urlpatterns= [
-    path('register/', register, name='register')
-]
\ No newline at end of file
+    path('register/', register_async if async_views else register, name='register'),
+    path('verify/', verify_async if async_views else verify, name='verify'),
+    path('login/', login_async if async_views else login, name='login'),
+]
@@ -1,79 +1,463 @@
 # TO-DO:
 # add password and email hashing functionality.
-# register route should redirect to recaptcha, then to confirmation page. email is sent to provided email.
-# if user verifies email, add to database else expire token.
-# token generation functionality.
+# register route should redirect to recaptcha, then to confirmation page.
 # custom error handlers.
 
-from django.http import JsonResponse
 import logging
-import json
-from app_config.settings.database import SessionLocal
-from applications.auth.auth_models import ClientUser
-from applications.shared.utils.hashing import hash_password
+from redis.exceptions import RedisError
+from typing import Dict, List, Optional, Tuple
+from app_config.settings.database import SessionLocal, AsyncSessionLocal
+from app_config.settings.sharding import ShardUnavailable, ascatter_gather, scatter_gather
+from applications.auth.auth_cache import email_filter, user_lookup_cache
+from applications.auth.auth_requests import login_fields, registration_fields
+from applications.auth.auth_repository import (
+    email_exists,
+    aemail_exists,
+    create_user_if_absent,
+    acreate_user_if_absent,
+    find_email_by_id,
+    afind_email_by_id,
+    mark_verified,
+    amark_verified,
+    update_password_hash,
+    aupdate_password_hash,
+)
+from applications.shared.middleware.rate_limit import defers_rate_limit, rate_limiter, rate_limited_response
+from applications.shared.utils import metrics
+from applications.shared.utils.fastjson import FastJsonResponse
+from applications.shared.utils.mail_queue import mail_queue
+from applications.shared.utils.hashing import (
+    dummy_hash,
+    adummy_hash,
+    hash_password_pooled,
+    hash_password_async,
+    verify_password_pooled,
+    verify_password_async,
+    verify_and_rehash_pooled,
+    verify_and_rehash_async,
+    HashingPoolSaturated,
+)
+from applications.shared.utils.tokens import SignedToken, TokenInvalid, verification_signer, verification_revocations
 
 logger= logging.getLogger('django')
 
+# Session key holding the id of the logged-in ClientUser.
+SESSION_USER_KEY= 'client_user_id'
+
+
+def _invalid_credentials_response()-> FastJsonResponse:
+    """401 response shared by unknown emails and wrong passwords."""
+    return FastJsonResponse({
+        'error':'Invalid email or password!'
+    }, status=401)
+
+def _unverified_response()-> FastJsonResponse:
+    """403 response for correct credentials of an unverified email."""
+    return FastJsonResponse({
+        'error':'Please verify your email address before logging in.'
+    }, status=403)
+
+def _logged_in_response(user:Dict[str, object])-> FastJsonResponse:
+    """200 response once the session holds the user."""
+    logger.info(f'Login successful for user {user["id"]}.')
+    return FastJsonResponse({
+        'message':f'Welcome back, {user["first_name"]}!',
+        'id':user['id'],
+    }, status=200)
+
+def _duplicate_response()-> FastJsonResponse:
+    """400 response for an email that is already registered."""
+    return FastJsonResponse({
+        'error':'User with this email already exists!'
+    }, status=400)
+
+def _created_response(user_id:int, fields:Dict[str, str])-> FastJsonResponse:
+    """201 response built from the submitted fields and the returned id."""
+    logger.info(f'Registration successful! User: {fields["first_name"]} {fields["last_name"]}')
+    return FastJsonResponse({
+        'message':f'Registration successful! New user: {fields["first_name"]} {fields["last_name"]}',
+        'id':user_id,
+    }, status=201)
+
+def _verification_mail(user_id:int, fields:Dict[str, str])-> Tuple[str, str, Dict[str, str]]:
+    """(kind, recipient, context) of the verification mail job for a new user."""
+    return 'verification', fields['email'], {
+        'first_name':fields['first_name'],
+        'token':verification_signer().issue(user_id),
+    }
+
+def _verification_token(request)-> Tuple[Optional[SignedToken], Optional[FastJsonResponse]]:
+    """
+    Validates the ?token= of a verification link without any I/O.
+    :param request:
+    :return: (token, None) if signed and unexpired | (None, error response) if not.
+    """
+    if request.method!= 'GET':
+        return None, FastJsonResponse({
+            'error':'Invalid request method!'
+        }, status=405)
+
+    try:
+        return verification_signer().validate(request.GET.get('token', '')), None
+    except TokenInvalid as exc:
+        logger.warning(f'Verification token rejected: {exc.reason}')
+        return None, _invalid_token_response()
+
+def _invalid_token_response()-> FastJsonResponse:
+    """400 response for a forged, expired, revoked or already used token."""
+    return FastJsonResponse({
+        'error':'Invalid or expired verification link!'
+    }, status=400)
+
+def _found_email(per_shard:List[Optional[str]])-> Optional[str]:
+    """Normalized email found on one of the shards, if any."""
+    return next((email for email in per_shard if email is not None), None)
+
+def _revoke_used(token:SignedToken)-> None:
+    """
+    Revokes a token that just verified its user, so replays are refused from Redis
+    without an UPDATE on the shards. The UPDATE stays the guarantee if Redis is down.
+    """
+    try:
+        verification_revocations().revoke(token)
+    except RedisError as exc:
+        logger.warning(f'Could not revoke used verification token: {exc}')
+
+async def _arevoke_used(token:SignedToken)-> None:
+    """Async variant of _revoke_used()."""
+    try:
+        await verification_revocations().arevoke(token)
+    except RedisError as exc:
+        logger.warning(f'Could not revoke used verification token: {exc}')
+
+def _verified_response(user_id:int)-> FastJsonResponse:
+    """200 response once the email is verified."""
+    logger.info(f'Email verified for user {user_id}.')
+    return FastJsonResponse({
+        'message':'Email verified successfully!'
+    }, status=200)
+
+def _busy_response(exc:HashingPoolSaturated)-> FastJsonResponse:
+    """503 response for a saturated hashing pool."""
+    logger.warning('Hashing pool saturated, registration rejected.')
+    response= FastJsonResponse({
+        'error':'Server is busy. Please try again shortly.'
+    }, status=503)
+    response['Retry-After']= str(exc.retry_after)
+    return response
+
+def _moving_response(exc:ShardUnavailable)-> FastJsonResponse:
+    """503 response for an email whose shard bucket is being moved."""
+    logger.warning(f'Request rejected while bucket {exc.bucket} moves between shards.')
+    response= FastJsonResponse({
+        'error':'Server is busy. Please try again shortly.'
+    }, status=503)
+    response['Retry-After']= str(exc.retry_after)
+    return response
+
 
 # Registration route
+@defers_rate_limit
 def register(request):
     """
     Handles user registration requests.
     :param request:
     :return:
     """
-    if request.method!= 'POST':
-        logger.error('Request method invalid!')
-        return JsonResponse({
-            'error':'Invalid request method!'
-        }, status=405)
+    with metrics.stage('parse'):
+        fields, error= registration_fields(request)
+    retry_after= rate_limiter().hit_email(request, fields['normalized_email'] if fields else None)
+    if retry_after:
+        return rate_limited_response(retry_after)
+    if error:
+        return error
 
-    session= SessionLocal()
     try:
-        try:
-            data= json.loads(request.body)
-        except json.JSONDecodeError:
-            logger.error('Invalid JSON data!')
-            return JsonResponse({
-                'error':'Invalid JSON!'
-            }, status=400)
-
-        first_name= data.get('first_name')
-        last_name= data.get('last_name')
-        email= data.get('email')
-        password= data.get('password')
-
-        if not all([first_name, last_name, email, password]):
-            return JsonResponse({
-                'error':'Some required fields are empty!'
-            }, status=400)
-
-
-        user= session.query(ClientUser).filter_by(email=email).first()
-        if user:
-            return JsonResponse({
-                'error':'User with this email already exists!'
-            }, status=400)
-
-        new_user= ClientUser(
-            first_name=first_name,
-            last_name=last_name,
-            email=email,
-            password_hash= hash_password(password),
-        )
-
-        new_user.save(session)
-
-        logger.info(f'Registration successful! User: {new_user.first_name} {new_user.last_name}')
-        return JsonResponse({
-            'message':f'Registration successful! New user: {new_user}'
-        }, status=201)
+        session= SessionLocal.for_key(fields['normalized_email'])
+    except ShardUnavailable as exc:
+        return _moving_response(exc)
+    try:
+        # Known emails are rejected before paying for Argon2; a definite miss
+        # in the email filter skips the lookup altogether.
+        with metrics.stage('lookup'):
+            if email_filter.might_exist(fields['normalized_email']):
+                if email_exists(session, fields['normalized_email']):
+                    return _duplicate_response()
+                email_filter.record_false_positive()
+
+        with metrics.stage('hash'):
+            password_hash= hash_password_pooled(fields['password'])
+
+        # The insert itself enforces uniqueness, so a concurrent duplicate is still a 400.
+        with metrics.stage('insert'):
+            user_id= create_user_if_absent(
+                session,
+                first_name=fields['first_name'],
+                last_name=fields['last_name'],
+                email=fields['email'],
+                password_hash=password_hash,
+            )
+        if user_id is None:
+            return _duplicate_response()
+
+        with metrics.stage('post_commit'):
+            email_filter.record(fields['normalized_email'])
+            try:
+                mail_queue().enqueue(*_verification_mail(user_id, fields))
+            except RedisError as exc:
+                logger.error(f'Could not queue verification mail for user {user_id}: {exc}')
+        return _created_response(user_id, fields)
+
+    except HashingPoolSaturated as exc:
+        return _busy_response(exc)
 
     except Exception as exc:
         logger.error(f'An unexpected error occurred: {str(exc)}')
-        return JsonResponse({
+        return FastJsonResponse({
             'error':'An internal error occurred during user registration. Please try again later.'
         }, status=500)
 
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
+
+
+# Registration route (ASGI)
+@defers_rate_limit
+async def register_async(request):
+    """
+    Handles user registration requests without leaving the event loop.
+    Awaits the async session and the hashing pool instead of running in a sync_to_async thread.
+    :param request:
+    :return:
+    """
+    with metrics.stage('parse'):
+        fields, error= registration_fields(request)
+    retry_after= await rate_limiter().ahit_email(request, fields['normalized_email'] if fields else None)
+    if retry_after:
+        return rate_limited_response(retry_after)
+    if error:
+        return error
+
+    try:
+        session= AsyncSessionLocal.for_key(fields['normalized_email'])
+    except ShardUnavailable as exc:
+        return _moving_response(exc)
+    async with session:
+        try:
+            with metrics.stage('lookup'):
+                if await email_filter.amight_exist(fields['normalized_email']):
+                    if await aemail_exists(session, fields['normalized_email']):
+                        return _duplicate_response()
+                    email_filter.record_false_positive()
+
+            with metrics.stage('hash'):
+                password_hash= await hash_password_async(fields['password'])
+
+            with metrics.stage('insert'):
+                user_id= await acreate_user_if_absent(
+                    session,
+                    first_name=fields['first_name'],
+                    last_name=fields['last_name'],
+                    email=fields['email'],
+                    password_hash=password_hash,
+                )
+            if user_id is None:
+                return _duplicate_response()
+
+            with metrics.stage('post_commit'):
+                await email_filter.arecord(fields['normalized_email'])
+                try:
+                    await mail_queue().aenqueue(*_verification_mail(user_id, fields))
+                except RedisError as exc:
+                    logger.error(f'Could not queue verification mail for user {user_id}: {exc}')
+            return _created_response(user_id, fields)
+
+        except HashingPoolSaturated as exc:
+            return _busy_response(exc)
+
+        except Exception as exc:
+            logger.error(f'An unexpected error occurred: {str(exc)}')
+            return FastJsonResponse({
+                'error':'An internal error occurred during user registration. Please try again later.'
+            }, status=500)
+
+
+# Email verification route
+def verify(request):
+    """
+    Verifies the email of the user a verification token was issued for.
+    Forged and expired tokens are rejected before any Redis or database access;
+    the database update itself refuses already verified users, so links are single use.
+    The user's cached login record is dropped, so the next login sees the verification,
+    and the used token is revoked, so a replayed link is refused before the database.
+    Tokens carry only the user id, so with sharding the user's email is looked up on every
+    shard and the update runs on the shard owning it, like any other write: a user whose
+    bucket is moving gets a 503, and a copy left by a reshard is never updated instead.
+    :param request:
+    :return:
+    """
+    token, error= _verification_token(request)
+    if error:
+        return error
+
+    try:
+        if verification_revocations().is_revoked(token):
+            return _invalid_token_response()
+        email= _found_email(scatter_gather(SessionLocal.shards(), lambda session: find_email_by_id(session, token.user_id)))
+        if email is None:
+            return _invalid_token_response()
+        session= SessionLocal.for_key(email)
+        try:
+            verified= mark_verified(session, token.user_id)
+        finally:
+            session.close()
+        if verified is None:
+            return _invalid_token_response()
+        user_lookup_cache.invalidate(email)
+        _revoke_used(token)
+        return _verified_response(token.user_id)
+
+    except ShardUnavailable as exc:
+        return _moving_response(exc)
+
+    except Exception as exc:
+        logger.error(f'An unexpected error occurred: {str(exc)}')
+        return FastJsonResponse({
+            'error':'An internal error occurred during email verification. Please try again later.'
+        }, status=500)
+
+
+# Email verification route (ASGI)
+async def verify_async(request):
+    """
+    Async variant of verify().
+    :param request:
+    :return:
+    """
+    token, error= _verification_token(request)
+    if error:
+        return error
+
+    try:
+        if await verification_revocations().ais_revoked(token):
+            return _invalid_token_response()
+        email= _found_email(await ascatter_gather(AsyncSessionLocal.shards(), lambda session: afind_email_by_id(session, token.user_id)))
+        if email is None:
+            return _invalid_token_response()
+        async with AsyncSessionLocal.for_key(email) as session:
+            verified= await amark_verified(session, token.user_id)
+        if verified is None:
+            return _invalid_token_response()
+        await user_lookup_cache.ainvalidate(email)
+        await _arevoke_used(token)
+        return _verified_response(token.user_id)
+
+    except ShardUnavailable as exc:
+        return _moving_response(exc)
+
+    except Exception as exc:
+        logger.error(f'An unexpected error occurred: {str(exc)}')
+        return FastJsonResponse({
+            'error':'An internal error occurred during email verification. Please try again later.'
+        }, status=500)
+
+
+# Login route
+@defers_rate_limit
+def login(request):
+    """
+    Logs a user in and stores them in the Redis-backed session.
+    Unknown emails still pay for one Argon2 verification against a dummy hash.
+    :param request:
+    :return:
+    """
+    fields, error= login_fields(request)
+    retry_after= rate_limiter().hit_email(request, fields['normalized_email'] if fields else None, per_client=True)
+    if retry_after:
+        return rate_limited_response(retry_after)
+    if error:
+        return error
+
+    try:
+        session= SessionLocal.for_key(fields['normalized_email'])
+    except ShardUnavailable as exc:
+        return _moving_response(exc)
+    try:
+        user= user_lookup_cache.fetch(session, fields['normalized_email'])
+        if user is None:
+            verify_password_pooled(fields['password'], dummy_hash())
+            return _invalid_credentials_response()
+
+        valid, new_hash= verify_and_rehash_pooled(fields['password'], user['password_hash'])
+        if not valid:
+            return _invalid_credentials_response()
+        if new_hash:
+            update_password_hash(session, user['id'], new_hash)
+            user_lookup_cache.invalidate(fields['normalized_email'])
+        if not user['verified']:
+            return _unverified_response()
+
+        request.session.cycle_key()
+        request.session[SESSION_USER_KEY]= user['id']
+        return _logged_in_response(user)
+
+    except HashingPoolSaturated as exc:
+        return _busy_response(exc)
+
+    except Exception as exc:
+        logger.error(f'An unexpected error occurred: {str(exc)}')
+        return FastJsonResponse({
+            'error':'An internal error occurred during login. Please try again later.'
+        }, status=500)
+
+    finally:
+        session.close()
+
+
+# Login route (ASGI)
+@defers_rate_limit
+async def login_async(request):
+    """
+    Async variant of login().
+    :param request:
+    :return:
+    """
+    fields, error= login_fields(request)
+    retry_after= await rate_limiter().ahit_email(request, fields['normalized_email'] if fields else None, per_client=True)
+    if retry_after:
+        return rate_limited_response(retry_after)
+    if error:
+        return error
+
+    try:
+        session= AsyncSessionLocal.for_key(fields['normalized_email'])
+    except ShardUnavailable as exc:
+        return _moving_response(exc)
+    async with session:
+        try:
+            user= await user_lookup_cache.afetch(session, fields['normalized_email'])
+            if user is None:
+                await verify_password_async(fields['password'], await adummy_hash())
+                return _invalid_credentials_response()
+
+            valid, new_hash= await verify_and_rehash_async(fields['password'], user['password_hash'])
+            if not valid:
+                return _invalid_credentials_response()
+            if new_hash:
+                await aupdate_password_hash(session, user['id'], new_hash)
+                await user_lookup_cache.ainvalidate(fields['normalized_email'])
+            if not user['verified']:
+                return _unverified_response()
+
+            await request.session.acycle_key()
+            await request.session.aset(SESSION_USER_KEY, user['id'])
+            return _logged_in_response(user)
+
+        except HashingPoolSaturated as exc:
+            return _busy_response(exc)
+
+        except Exception as exc:
+            logger.error(f'An unexpected error occurred: {str(exc)}')
+            return FastJsonResponse({
+                'error':'An internal error occurred during login. Please try again later.'
+            }, status=500)
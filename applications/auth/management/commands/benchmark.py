@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from benchmarks.runner import DEFAULT_SUITES, SUITES, format_regression, load, regressions_against, run_suites, save
+
+
+class Command(BaseCommand):
+    """Runs the benchmark suites in benchmarks/ and compares them with an earlier run."""
+    help= 'Runs benchmark suites, writes JSON results and fails on regressions against a baseline.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--suite', nargs='+', choices=list(SUITES), default=list(DEFAULT_SUITES))
+        parser.add_argument('--stand-ins', action='store_true', help='Use a temporary SQLite file and fakeredis.')
+        parser.add_argument('--output', default='benchmark-results.json')
+        parser.add_argument('--compare', metavar='BASELINE', help='Results file of an earlier commit.')
+        parser.add_argument('--threshold', type=float, default=0.1, help='Allowed relative slowdown (0.1 = 10%%).')
+
+    def handle(self, *args, **options):
+        try:
+            results= run_suites(options['suite'], options['stand_ins'], log=self.stderr.write)
+        except (ValueError, RuntimeError) as exc:
+            raise CommandError(str(exc))
+        save(results, options['output'])
+        self.stdout.write(f'Results for {results["meta"]["commit"]} written to {options["output"]}')
+
+        if not options['compare']:
+            return
+        regressions= regressions_against(results, load(options['compare']), options['threshold'])
+        for regression in regressions:
+            self.stdout.write(self.style.ERROR(f'REGRESSION {format_regression(regression)}'))
+        if regressions:
+            raise CommandError(f'{len(regressions)} metrics regressed by more than {options["threshold"]:.0%}.')
+        self.stdout.write(self.style.SUCCESS(
+            f'No regressions above {options["threshold"]:.0%} against {options["compare"]}.'
+        ))
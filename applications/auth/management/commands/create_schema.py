@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from app_config.settings.database import create_schema
+
+
+class Command(BaseCommand):
+    """Creates the SQLAlchemy-managed tables."""
+    help= 'Creates missing SQLAlchemy tables and indexes (no longer done on import).'
+
+    def handle(self, *args, **options):
+        create_schema()
+        self.stdout.write(self.style.SUCCESS('Schema is up to date.'))
@@ -0,0 +1,185 @@
+import os
+import csv
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+from django.core.management.base import BaseCommand, CommandError
+from app_config.settings.database import SessionLocal
+from applications.auth.auth_cache import email_filter
+from applications.auth.auth_repository import bulk_create_users_if_absent
+from applications.auth.auth_requests import REGISTRATION_SCHEMA, check_fields
+from applications.shared.utils.email import normalize_email
+from applications.shared.utils.hashing import hash_password
+
+
+def _lines(handle:IO[str])-> Iterator[str]:
+    """readline() loop; unlike file iteration it keeps tell() usable for checkpoints."""
+    while True:
+        line= handle.readline()
+        if not line:
+            return
+        yield line
+
+def read_records(handle:IO[str], source_format:str, offset:int)-> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Streams (offset after record, record, parse error) from a CSV or NDJSON file.
+    The offset is what a checkpoint stores to resume after this record.
+    """
+    if source_format== 'csv':
+        header= next(csv.reader([handle.readline()]), None)
+        if not header:
+            return
+        if offset:
+            handle.seek(offset)
+        for row in csv.reader(_lines(handle)):
+            if len(row)!= len(header):
+                yield handle.tell(), None, 'column count mismatch'
+                continue
+            yield handle.tell(), dict(zip(header, row)), None
+        return
+
+    handle.seek(offset)
+    for line in _lines(handle):
+        if not line.strip():
+            continue
+        try:
+            record= json.loads(line)
+        except json.JSONDecodeError:
+            yield handle.tell(), None, 'invalid JSON'
+            continue
+        if not isinstance(record, dict):
+            yield handle.tell(), None, 'record is not an object'
+            continue
+        yield handle.tell(), record, None
+
+def validate_record(record:Dict[str, Any])-> Tuple[Optional[Dict[str, str]], Optional[str]]:
+    """
+    Runs the registration checks on a record: required fields, column lengths read from
+    ClientUser and the email format, with the email stripped. Rows are routed and
+    deduplicated on normalize_email() of it, as sign-ups are.
+    :returns: (fields, None) if valid | (None, reason it is rejected) if not.
+    """
+    return check_fields(record, REGISTRATION_SCHEMA, 'Some required fields are empty!')
+
+
+class Command(BaseCommand):
+    """Bulk user import for partner tenant onboarding."""
+    help= 'Imports users from a CSV or NDJSON file in resumable batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='CSV (with header) or NDJSON file.')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help='Defaults to the file extension.')
+        parser.add_argument('--batch-size', type=int, default=5_000)
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Hashing processes.')
+        parser.add_argument('--checkpoint', help='Checkpoint file. Defaults to <source>.checkpoint.')
+        parser.add_argument('--rejects', help='NDJSON file receiving rejected rows. Defaults to <source>.rejects.')
+        parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint.')
+
+    def handle(self, *args, **options):
+        source= options['source']
+        if not os.path.exists(source):
+            raise CommandError(f'Source file not found: {source}')
+        source_format= options['format'] or ('csv' if source.lower().endswith('.csv') else 'ndjson')
+        checkpoint_path= options['checkpoint'] or f'{source}.checkpoint'
+        rejects_path= options['rejects'] or f'{source}.rejects'
+
+        state= self._load_checkpoint(checkpoint_path, source) if not options['restart'] else None
+        if state:
+            self.stdout.write(f'Resuming from offset {state["offset"]} ({state["imported"]} already imported).')
+        else:
+            state= {'source':os.path.abspath(source), 'offset':0, 'imported':0, 'skipped':0, 'rejected':0}
+
+        started= time.perf_counter()
+        with open(source, newline='', encoding='utf-8') as handle, \
+                open(rejects_path, 'a', encoding='utf-8') as rejects, \
+                ProcessPoolExecutor(max_workers=options['workers']) as hashers:
+            batch: List[Dict[str, str]]= []
+            batch_rejected= 0
+            for offset, record, error in read_records(handle, source_format, state['offset']):
+                fields= None
+                if not error:
+                    fields, error= validate_record(record)
+                if error:
+                    rejects.write(json.dumps({'offset':offset, 'reason':error, 'record':self._redact(record)})+ '\n')
+                    batch_rejected+= 1
+                else:
+                    batch.append(fields)
+
+                if len(batch)>= options['batch_size']:
+                    self._write_batch(batch, batch_rejected, offset, state, hashers, options['workers'], checkpoint_path)
+                    rejects.flush()
+                    batch, batch_rejected= [], 0
+
+            if batch or batch_rejected:
+                self._write_batch(batch, batch_rejected, handle.tell(), state, hashers, options['workers'], checkpoint_path)
+
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        elapsed= time.perf_counter()- started
+        self.stdout.write(self.style.SUCCESS(
+            f'Import finished in {elapsed:.1f}s: {state["imported"]} imported, '
+            f'{state["skipped"]} skipped as duplicates, {state["rejected"]} rejected (see {rejects_path}).'
+        ))
+
+    def _write_batch(self, batch, rejected, offset, state, hashers, workers, checkpoint_path):
+        """Hashes a batch across the process pool, inserts it and advances the checkpoint."""
+        batch_started= time.perf_counter()
+        passwords= [record['password'] for record in batch]
+        hashes= list(hashers.map(hash_password, passwords, chunksize=max(1, len(batch)// (workers* 4))))
+        hashed_at= time.perf_counter()
+
+        rows= [{
+            'first_name':record['first_name'].strip(),
+            'last_name':record['last_name'].strip(),
+            'email':record['email'],
+            'password_hash':password_hash,
+        } for record, password_hash in zip(batch, hashes)]
+
+        inserted= []
+        for factory, shard_rows in SessionLocal.partition(rows, key=lambda row: normalize_email(row['email'])):
+            session= factory()
+            try:
+                inserted.extend(bulk_create_users_if_absent(session, shard_rows))
+            finally:
+                session.close()
+        email_filter.record_many([normalize_email(email) for email in inserted])
+        finished= time.perf_counter()
+
+        state['offset']= offset
+        state['imported']+= len(inserted)
+        state['skipped']+= len(rows)- len(inserted)
+        state['rejected']+= rejected
+        self._save_checkpoint(checkpoint_path, state)
+
+        elapsed= finished- batch_started
+        self.stdout.write(
+            f'Batch: {len(inserted)} inserted, {len(rows)- len(inserted)} skipped, {rejected} rejected | '
+            f'{len(rows)/ elapsed if elapsed else 0:.0f} rows/s '
+            f'(hash {hashed_at- batch_started:.2f}s, insert {finished- hashed_at:.2f}s)'
+        )
+
+    @staticmethod
+    def _redact(record:Optional[Dict[str, Any]])-> Optional[Dict[str, Any]]:
+        """Keeps passwords out of the rejects file."""
+        if record is None:
+            return None
+        return {key:value for key, value in record.items() if key!= 'password'}
+
+    @staticmethod
+    def _load_checkpoint(path:str, source:str)-> Optional[Dict[str, Any]]:
+        try:
+            with open(path) as checkpoint:
+                state= json.load(checkpoint)
+        except (OSError, ValueError):
+            return None
+        if state.get('source')!= os.path.abspath(source):
+            raise CommandError(f'Checkpoint {path} belongs to {state.get("source")}; use --restart to discard it.')
+        return state
+
+    @staticmethod
+    def _save_checkpoint(path:str, state:Dict[str, Any])-> None:
+        temp_path= f'{path}.tmp'
+        with open(temp_path, 'w') as checkpoint:
+            json.dump(state, checkpoint)
+        os.replace(temp_path, path)
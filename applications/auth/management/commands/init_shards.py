@@ -0,0 +1,43 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from app_config.settings.database import SessionLocal, create_schema, postgresql_config
+from app_config.settings.sharding import ShardMap, highest_id, init_shard_ids, shard_map_store
+
+
+class Command(BaseCommand):
+    """Prepares the DB_SHARD_URLS databases for sharded client users."""
+    help= ('Writes the first shard map, creates the tables on every shard and interleaves their user ids. '
+           'Run again after appending a shard to DB_SHARD_URLS, then move buckets onto it with reshard_users.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--buckets', type=int, default=int(os.getenv('DB_SHARD_BUCKETS', 1024)),
+                            help='Virtual buckets; fixed once the map exists.')
+        parser.add_argument('--id-stride', type=int, default=int(os.getenv('DB_SHARD_ID_STRIDE', 64)),
+                            help='Upper bound on the number of shards; fixed once the map exists.')
+
+    def handle(self, *args, **options):
+        urls= postgresql_config().shard_urls
+        if not urls:
+            raise CommandError('DB_SHARD_URLS is not set.')
+
+        store= shard_map_store()
+        if store.exists():
+            shard_map= store.current()
+            if len(urls)> shard_map.id_stride:
+                raise CommandError(f'The shard map supports at most {shard_map.id_stride} shards.')
+            self.stdout.write(f'Keeping shard map version {shard_map.version} at {store.path}.')
+        else:
+            try:
+                shard_map= store.save(ShardMap.initial(options['buckets'], len(urls), options['id_stride']))
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(f'Wrote shard map version 1 at {store.path}: {shard_map.buckets} buckets over {len(urls)} shards.')
+
+        create_schema()
+        engines= [factory.kw['bind'] for factory in SessionLocal.shards()]
+        above= max(highest_id(engine) for engine in engines)
+        for shard, engine in enumerate(engines):
+            start= init_shard_ids(engine, shard, shard_map.id_stride, above)
+            self.stdout.write(f'Shard {shard}: next user id {start}.')
+
+        self.stdout.write(self.style.SUCCESS(f'{len(engines)} shards ready.'))
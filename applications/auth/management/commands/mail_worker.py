@@ -0,0 +1,53 @@
+import os
+import socket
+import time
+from django.core.management.base import BaseCommand
+from applications.shared.utils.mail_queue import MailSender, mail_queue
+
+
+class Command(BaseCommand):
+    """Consumer of the Redis mail queue."""
+    help= 'Sends queued mails in batches over one SMTP connection, retrying with backoff.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--name', default=f'{socket.gethostname()}-{os.getpid()}',
+                            help='Stable worker name; jobs left unacknowledged by a previous run with this name are requeued.')
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--poll-timeout', type=float, default=5.0, help='Seconds to block waiting for jobs.')
+        parser.add_argument('--idle-timeout', type=float, default=30.0, help='Close the SMTP connection after this many idle seconds.')
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is empty.')
+
+    def handle(self, *args, **options):
+        queue= mail_queue()
+        sender= MailSender(options['idle_timeout'])
+        worker= options['name']
+
+        recovered= queue.recover(worker)
+        if recovered:
+            self.stdout.write(f'Requeued {recovered} unacknowledged jobs from a previous run.')
+
+        total_sent= 0
+        started= time.perf_counter()
+        try:
+            while True:
+                queue.promote_due()
+                jobs= queue.take(worker, options['batch_size'], options['poll_timeout'])
+                if not jobs:
+                    if options['once']:
+                        break
+                    sender.close_if_idle()
+                    continue
+                sent, failed= sender.send_batch(jobs)
+                queue.settle(worker, sent, failed)
+                total_sent+= len(sent)
+                if failed:
+                    self.stderr.write(f'{len(failed)} of {len(jobs)} mails failed and were scheduled for retry.')
+        except KeyboardInterrupt:
+            pass
+        finally:
+            sender.close()
+
+        elapsed= time.perf_counter()- started
+        self.stdout.write(self.style.SUCCESS(
+            f'Sent {total_sent} mails in {elapsed:.1f}s; queue: {queue.stats()}'
+        ))
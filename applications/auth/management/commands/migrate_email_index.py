@@ -0,0 +1,148 @@
+from django.core.management.base import BaseCommand, CommandError
+from sqlalchemy import text
+from app_config.settings.database import SessionLocal
+from applications.shared.utils.email import normalize_email
+
+TABLES= ('client_user', 'client_user_archive')
+# Nullable while it is backfilled; SET NOT NULL once every row has it.
+ADD_COLUMN_SQL= 'ALTER TABLE {table} ADD COLUMN IF NOT EXISTS normalized_email VARCHAR(100)'
+UNFILLED_BATCH_SQL= """
+    SELECT id, email FROM {table}
+    WHERE normalized_email IS NULL AND id> :last_id
+    ORDER BY id LIMIT :batch_size
+"""
+FILL_SQL= 'UPDATE {table} SET normalized_email= :normalized_email WHERE id= :user_id'
+NOT_NULL_SQL= 'ALTER TABLE {table} ALTER COLUMN normalized_email SET NOT NULL'
+DUPLICATES_SQL= text("""
+    SELECT normalized_email, array_agg(id ORDER BY id) AS ids
+    FROM client_user
+    WHERE deleted_at IS NULL
+    GROUP BY normalized_email
+    HAVING count(*)> 1
+""")
+TRIM_BATCH_SQL= text("""
+    UPDATE client_user SET email= btrim(email)
+    WHERE id IN (
+        SELECT id FROM client_user WHERE email<> btrim(email) LIMIT :batch_size
+    )
+""")
+CREATE_INDEX_SQL= [
+    text(
+        'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_client_user_live_normalized_email '
+        'ON client_user (normalized_email) WHERE deleted_at IS NULL'
+    ),
+    text(
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_client_user_deleted_at '
+        'ON client_user (deleted_at) WHERE deleted_at IS NOT NULL'
+    ),
+]
+DROP_LEGACY_SQL= [
+    text('ALTER TABLE client_user DROP CONSTRAINT IF EXISTS client_user_email_key'),
+    text('DROP INDEX CONCURRENTLY IF EXISTS uq_client_user_email_lower'),
+    text('DROP INDEX CONCURRENTLY IF EXISTS uq_client_user_live_email_lower'),
+]
+
+
+class Command(BaseCommand):
+    """
+    Moves client_user from a case-sensitive email constraint to a unique normalized_email.
+    The column is filled with normalize_email() in Python, so the database's own case
+    folding, which disagrees with Python's outside ASCII, never decides uniqueness.
+    Deploy the code writing normalized_email before running it.
+    """
+    help= 'Adds and backfills normalized_email, builds its live unique index, drops the old constraints and trims emails.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5_000)
+        parser.add_argument('--dry-run', action='store_true', help='Only report emails colliding once normalized.')
+
+    def _backfill(self, factory, table:str, batch_size:int)-> int:
+        """Fills normalized_email of the table's rows lacking it, batch_size rows per transaction."""
+        session= factory()
+        try:
+            filled= 0
+            last_id= 0
+            while True:
+                rows= session.execute(
+                    text(UNFILLED_BATCH_SQL.format(table=table)), {'last_id':last_id, 'batch_size':batch_size}
+                ).all()
+                if not rows:
+                    session.commit()
+                    return filled
+                session.execute(text(FILL_SQL.format(table=table)), [
+                    {'normalized_email':normalize_email(email), 'user_id':user_id} for user_id, email in rows
+                ])
+                session.commit()
+                filled+= len(rows)
+                last_id= rows[-1].id
+        finally:
+            session.close()
+
+    def handle(self, *args, **options):
+        shards= SessionLocal.shards()
+        # Filling the new column changes no email, so it is safe before the duplicate check.
+        for shard, factory in enumerate(shards):
+            for table in TABLES:
+                session= factory()
+                try:
+                    session.execute(text(ADD_COLUMN_SQL.format(table=table)))
+                    session.commit()
+                finally:
+                    session.close()
+                filled= self._backfill(factory, table, options['batch_size'])
+                self.stdout.write(f'Shard {shard}: filled normalized_email for {filled} rows of {table}.')
+
+        # Every shard is checked before any of them is changed. normalized_email is the trimmed,
+        # case-folded email, so trimming later cannot create a duplicate this missed.
+        duplicates= []
+        for factory in shards:
+            session= factory()
+            try:
+                duplicates.extend(session.execute(DUPLICATES_SQL).all())
+            finally:
+                session.close()
+        for normalized, ids in duplicates:
+            self.stderr.write(f'{normalized}: user ids {ids}')
+        if duplicates:
+            raise CommandError(
+                f'{len(duplicates)} live emails collide once normalized; merge or soft-delete them first.'
+            )
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS('No duplicate normalized emails found.'))
+            return
+
+        for shard, factory in enumerate(shards):
+            # The normalized_email index takes over uniqueness before the legacy constraints go;
+            # client_user_email_key spans soft-deleted rows too, so trimming must wait until it is dropped.
+            # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+            engine= factory.kw['bind']
+            with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+                for statement in CREATE_INDEX_SQL+ DROP_LEGACY_SQL:
+                    connection.execute(statement)
+
+            session= factory()
+            try:
+                trimmed= 0
+                while True:
+                    updated= session.execute(TRIM_BATCH_SQL, {'batch_size':options['batch_size']}).rowcount
+                    session.commit()
+                    trimmed+= updated
+                    if not updated:
+                        break
+                self.stdout.write(f'Shard {shard}: trimmed whitespace from {trimmed} emails.')
+            finally:
+                session.close()
+
+            # Rows written or archived by processes still on the old code in the meantime.
+            for table in TABLES:
+                self._backfill(factory, table, options['batch_size'])
+                session= factory()
+                try:
+                    session.execute(text(NOT_NULL_SQL.format(table=table)))
+                    session.commit()
+                finally:
+                    session.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            'uq_client_user_live_normalized_email and ix_client_user_deleted_at are in place; legacy email constraints dropped.'
+        ))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from sqlalchemy import text
+from app_config.settings.database import SessionLocal
+
+CREATE_INDEX_SQL= {
+    'postgresql':text('CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_client_user_created_at_id ON client_user (created_at, id)'),
+    'sqlite':text('CREATE INDEX IF NOT EXISTS ix_client_user_created_at_id ON client_user (created_at, id)'),
+}
+
+
+class Command(BaseCommand):
+    """Adds the (created_at, id) index behind the admin listing and export to an existing table."""
+    help= 'Builds ix_client_user_created_at_id without locking client_user against writes.'
+
+    def handle(self, *args, **options):
+        for shard, factory in enumerate(SessionLocal.shards()):
+            # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+            engine= factory.kw['bind']
+            with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+                connection.execute(CREATE_INDEX_SQL[engine.dialect.name])
+            self.stdout.write(f'Shard {shard}: index built.')
+
+        self.stdout.write(self.style.SUCCESS('ix_client_user_created_at_id is in place.'))
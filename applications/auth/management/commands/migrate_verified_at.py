@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from sqlalchemy import text
+from app_config.settings.database import SessionLocal
+
+# Nullable without a default: a catalog-only change that does not rewrite client_user.
+# client_user_archive gets it too: purge_soft_deleted copies every client_user column across.
+ADD_COLUMN_SQL= [
+    text('ALTER TABLE client_user ADD COLUMN IF NOT EXISTS verified_at TIMESTAMP WITH TIME ZONE'),
+    text('ALTER TABLE client_user_archive ADD COLUMN IF NOT EXISTS verified_at TIMESTAMP WITH TIME ZONE'),
+]
+BACKFILL_BATCH_SQL= text("""
+    UPDATE client_user SET verified_at= created_at
+    WHERE id IN (
+        SELECT id FROM client_user WHERE verified_at IS NULL AND created_at< :cutoff LIMIT :batch_size
+    )
+""")
+
+
+class Command(BaseCommand):
+    """Adds verified_at to client_user and client_user_archive in existing databases."""
+    help= 'Adds the verified_at column and optionally marks users registered before verification existed as verified.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mark-existing-verified', action='store_true', help='Backfill verified_at for existing users.')
+        parser.add_argument('--batch-size', type=int, default=5_000)
+
+    def handle(self, *args, **options):
+        for shard, factory in enumerate(SessionLocal.shards()):
+            session= factory()
+            try:
+                for statement in ADD_COLUMN_SQL:
+                    session.execute(statement)
+                session.commit()
+                self.stdout.write(f'Shard {shard}: verified_at columns present.')
+                if not options['mark_existing_verified']:
+                    continue
+
+                cutoff= session.execute(text('SELECT now()')).scalar_one()
+                backfilled= 0
+                while True:
+                    updated= session.execute(BACKFILL_BATCH_SQL, {'cutoff':cutoff, 'batch_size':options['batch_size']}).rowcount
+                    session.commit()
+                    backfilled+= updated
+                    if not updated:
+                        break
+                self.stdout.write(self.style.SUCCESS(f'Shard {shard}: marked {backfilled} existing users as verified.'))
+            finally:
+                session.close()
@@ -0,0 +1,39 @@
+import time
+from datetime import datetime, timedelta, timezone
+from django.core.management.base import BaseCommand
+from app_config.settings.database import SessionLocal
+from applications.auth.auth_models import ClientUser, ClientUserArchive
+from applications.shared.base import archive_soft_deleted
+
+
+class Command(BaseCommand):
+    """Archives client users soft-deleted longer than the retention period."""
+    help= 'Moves soft-deleted client_user rows older than the retention period into client_user_archive.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-days', type=int, default=90)
+        parser.add_argument('--chunk-size', type=int, default=1_000)
+        parser.add_argument('--pause', type=float, default=0.05, help='Seconds to sleep between chunks.')
+        parser.add_argument('--max-chunks', type=int, default=0, help='Stop after this many chunks (0 = until done).')
+
+    def handle(self, *args, **options):
+        cutoff= datetime.now(timezone.utc)- timedelta(days=options['retention_days'])
+        moved_total= 0
+        chunks= 0
+        for shard, factory in enumerate(SessionLocal.shards()):
+            session= factory()
+            try:
+                while not options['max_chunks'] or chunks< options['max_chunks']:
+                    moved= archive_soft_deleted(session, ClientUser, ClientUserArchive, cutoff, options['chunk_size'])
+                    if not moved:
+                        break
+                    moved_total+= moved
+                    chunks+= 1
+                    self.stdout.write(f'Chunk {chunks} (shard {shard}): archived {moved} rows ({moved_total} total).')
+                    time.sleep(options['pause'])
+            finally:
+                session.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {moved_total} users soft-deleted before {cutoff.isoformat()}.'
+        ))
@@ -0,0 +1,180 @@
+import time
+from datetime import timedelta
+from typing import Any, Dict, Set
+from django.core.management.base import BaseCommand, CommandError
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from app_config.settings.database import SessionLocal
+from app_config.settings.sharding import ShardMap, shard_bucket, shard_map_store
+from applications.auth.auth_models import ClientUser
+from applications.shared.utils.email import normalize_email
+
+client_user= ClientUser.__table__
+
+
+class Command(BaseCommand):
+    """
+    Rebalances client users over the shards, moving whole buckets.
+    Per (source, destination) pair: rows are copied in batches while both shards stay
+    online, the buckets are frozen (requests for their emails get a 503), rows changed
+    since the copy started are copied again and rows deleted from the source since then
+    (hard deletes, archiving) are deleted from the destination, the map is flipped and the
+    buckets unfrozen, and finally the moved rows are deleted from the source in batches. Copies are upserts
+    on id, so an interrupted run can simply be repeated (after --unfreeze if it stopped
+    while buckets were frozen). Archived users stay on the shard that archived them.
+    """
+    help= 'Moves client users between shards in batches until every shard owns an equal share of buckets.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shards', type=int, help='Shards to spread the buckets over. Defaults to all of DB_SHARD_URLS.')
+        parser.add_argument('--batch-size', type=int, default=1_000)
+        parser.add_argument('--pause', type=float, default=0.05, help='Seconds to sleep between batches.')
+        parser.add_argument('--settle', type=float, help='Seconds to wait for every process to load a new map. '
+                                                          'Defaults to twice DB_SHARD_MAP_REFRESH plus 2.')
+        parser.add_argument('--dry-run', action='store_true', help='Only report the buckets that would move.')
+        parser.add_argument('--unfreeze', action='store_true', help='Unfreeze buckets left frozen by an interrupted run and stop.')
+
+    def handle(self, *args, **options):
+        store= shard_map_store()
+        factories= SessionLocal.shards()
+        current= store.current()
+
+        if options['unfreeze']:
+            store.save(ShardMap(current.assignments, current.id_stride))
+            self.stdout.write(self.style.SUCCESS(f'Unfroze {len(current.frozen)} buckets.'))
+            return
+        if current.frozen:
+            raise CommandError(f'{len(current.frozen)} buckets are frozen by an interrupted run; rerun with --unfreeze first.')
+
+        shards= options['shards'] or len(factories)
+        if shards> len(factories):
+            raise CommandError(f'Only {len(factories)} shards are configured in DB_SHARD_URLS.')
+        if current.shards> len(factories):
+            raise CommandError(f'The shard map uses {current.shards} shards but only {len(factories)} are configured.')
+        try:
+            moves= current.moves(current.rebalanced(shards))
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        if not moves:
+            self.stdout.write(self.style.SUCCESS('Buckets are already balanced.'))
+            return
+        for (source, destination), buckets in sorted(moves.items()):
+            self.stdout.write(f'Shard {source} -> shard {destination}: {len(buckets)} buckets.')
+        if options['dry_run']:
+            return
+
+        settle= options['settle'] if options['settle'] is not None else store.refresh* 2+ 2
+        for (source, destination), buckets in sorted(moves.items()):
+            self._move(factories[source], factories[destination], set(buckets), destination, settle, options)
+            self.stdout.write(self.style.SUCCESS(f'Moved {len(buckets)} buckets from shard {source} to shard {destination}.'))
+
+    def _move(self, source, destination, buckets:Set[int], target:int, settle:float, options:Dict[str, Any]):
+        store= shard_map_store()
+        session= source()
+        try:
+            copy_started= session.execute(select(func.now())).scalar_one()
+        finally:
+            session.close()
+
+        copied= self._copy(source, destination, buckets, options)
+        self.stdout.write(f'Copied {copied} rows; freezing {len(buckets)} buckets.')
+        shard_map= store.current()
+        store.save(ShardMap(shard_map.assignments, shard_map.id_stride, shard_map.frozen| buckets))
+        time.sleep(settle)
+
+        try:
+            # One second of margin: SQLite keeps whole seconds, and copying a row twice is harmless.
+            caught_up= self._copy(source, destination, buckets, options, changed_since=copy_started- timedelta(seconds=1))
+            pruned= self._prune(source, destination, buckets, options)
+        except BaseException:
+            # The source still owns every row; unfreeze without switching over.
+            shard_map= store.current()
+            store.save(ShardMap(shard_map.assignments, shard_map.id_stride, shard_map.frozen- buckets))
+            raise
+        self.stdout.write(f'Copied {caught_up} rows changed and pruned {pruned} rows deleted during the copy; switching buckets over.')
+        shard_map= store.current()
+        assignments= list(shard_map.assignments)
+        for bucket in buckets:
+            assignments[bucket]= target
+        store.save(ShardMap(assignments, shard_map.id_stride, shard_map.frozen- buckets))
+        time.sleep(settle)
+
+        deleted= self._delete(source, buckets, options)
+        self.stdout.write(f'Deleted {deleted} moved rows from the source shard.')
+
+    def _batches(self, factory, buckets:Set[int], options:Dict[str, Any], changed_since=None):
+        """Yields (session, rows) for rows of the buckets in id order, batch_size rows scanned at a time."""
+        bucket_count= shard_map_store().current().buckets
+        session= factory()
+        try:
+            last_id= 0
+            while True:
+                statement= select(client_user).where(client_user.c.id> last_id)
+                if changed_since is not None:
+                    statement= statement.where(or_(
+                        client_user.c.created_at>= changed_since,
+                        client_user.c.updated_at>= changed_since,
+                        client_user.c.deleted_at>= changed_since,
+                    ))
+                rows= session.execute(
+                    statement.order_by(client_user.c.id).limit(options['batch_size']).execution_options(include_deleted=True)
+                ).mappings().all()
+                # Ends the read transaction, so SQLite writers are not blocked between batches.
+                session.commit()
+                if not rows:
+                    return
+                last_id= rows[-1]['id']
+                yield session, [
+                    dict(row) for row in rows
+                    if shard_bucket(normalize_email(row['email']), bucket_count) in buckets
+                ]
+                time.sleep(options['pause'])
+        finally:
+            session.close()
+
+    def _copy(self, source, destination, buckets:Set[int], options:Dict[str, Any], changed_since=None)-> int:
+        """Upserts the buckets' rows, soft-deleted ones included, from source into destination."""
+        copied= 0
+        target= destination()
+        try:
+            insert= sqlite.insert if target.get_bind().dialect.name== 'sqlite' else postgresql.insert
+            for _, rows in self._batches(source, buckets, options, changed_since):
+                if not rows:
+                    continue
+                statement= insert(client_user).values(rows)
+                target.execute(statement.on_conflict_do_update(
+                    index_elements=[client_user.c.id],
+                    set_={column.name:statement.excluded[column.name] for column in client_user.columns if column.name!= 'id'},
+                ))
+                target.commit()
+                copied+= len(rows)
+        finally:
+            target.close()
+        return copied
+
+    def _prune(self, source, destination, buckets:Set[int], options:Dict[str, Any])-> int:
+        """
+        Deletes the buckets' rows from destination whose id is gone from source: users deleted
+        or archived there after they were copied. Holds the buckets' ids in memory.
+        """
+        kept= {row['id'] for _, rows in self._batches(source, buckets, options) for row in rows}
+        pruned= 0
+        for session, rows in self._batches(destination, buckets, options):
+            stale= [row['id'] for row in rows if row['id'] not in kept]
+            if not stale:
+                continue
+            session.execute(client_user.delete().where(client_user.c.id.in_(stale)))
+            session.commit()
+            pruned+= len(stale)
+        return pruned
+
+    def _delete(self, source, buckets:Set[int], options:Dict[str, Any])-> int:
+        deleted= 0
+        for session, rows in self._batches(source, buckets, options):
+            if not rows:
+                continue
+            session.execute(client_user.delete().where(client_user.c.id.in_([row['id'] for row in rows])))
+            session.commit()
+            deleted+= len(rows)
+        return deleted
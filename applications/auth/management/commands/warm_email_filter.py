@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from app_config.settings.database import SessionLocal
+from applications.auth.auth_cache import email_filter
+
+
+class Command(BaseCommand):
+    """Seeds the registration email filter from the client_user table."""
+    help= 'Rebuilds the Redis email-existence filter used by registration.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        sessions= [factory() for factory in SessionLocal.shards()]
+        try:
+            count= email_filter.warm(sessions, batch_size=options['batch_size'])
+        finally:
+            for session in sessions:
+                session.close()
+
+        bloom= email_filter.bloom
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {count} emails into {bloom.key} '
+            f'({"RedisBloom" if bloom.uses_module() else "bitset"}, {bloom.size} bits, {bloom.hash_count} hashes). '
+            f'Estimated false positive rate: {bloom.estimated_false_positive_rate():.4%}'
+        ))
@@ -1,12 +1,21 @@
 import re
-from sqlalchemy.orm import declared_attr
-from sqlalchemy import Column, DateTime, Integer, func
+from datetime import datetime
+from functools import lru_cache
+from sqlalchemy.orm import Session, declared_attr, with_loader_criteria
+from sqlalchemy import Column, DateTime, Integer, event, func, select, text, true
 
 
-def camel_to_snake(name):
-    return re.sub(r'(?<!^)(?=[A-Z])', '_', name).lower()
+_WORD_BOUNDARY= re.compile(r'(?<!^)(?=[A-Z])')
+
+
+@lru_cache()
+def camel_to_snake(name:str)-> str:
+    return _WORD_BOUNDARY.sub('_', name).lower()
 
 class BaseModel:
+    # Soft-deleted rows are hidden from ORM selects unless a model opts out here.
+    live_rows_only= True
+
     @declared_attr
     def __tablename__(self):
         """
@@ -20,6 +29,14 @@ class BaseModel:
     updated_at= Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
     deleted_at= Column(DateTime(timezone=True), nullable=True)
 
+    @classmethod
+    def live(cls):
+        """
+        Criterion selecting rows that are not soft-deleted.
+        :return:
+        """
+        return cls.deleted_at.is_(None)
+
     def save(self, session):
         """
         Automatically handles session commit and rollback if necessary.
@@ -43,5 +60,107 @@ class BaseModel:
         except Exception as exc:
             raise exc
 
+    async def asave(self, session):
+        """
+        Async variant of save() for an AsyncSession.
+        :param session:
+        :return:
+        """
+        try:
+            session.add(self)
+            await session.commit()
+        except Exception as exc:
+            raise exc
+
+    async def asoft_delete(self, session):
+        """
+        Async variant of soft_delete() for an AsyncSession.
+        :param session:
+        :return:
+        """
+        try:
+            self.deleted_at= func.now()
+            await session.commit()
+        except Exception as exc:
+            raise exc
+
     def __repr__(self):
-        return f'<{self.__class__.__name__}(id={self.id})>'
\ No newline at end of file
+        return f'<{self.__class__.__name__}(id={self.id})>'
+
+
+def _live_rows_criteria(cls):
+    return cls.deleted_at.is_(None) if cls.live_rows_only else true()
+
+
+class LiveRowsSession(Session):
+    """
+    Session whose ORM selects skip soft-deleted rows by default.
+    Pass execution_options(include_deleted=True) to see them.
+    """
+
+
+@event.listens_for(LiveRowsSession, 'do_orm_execute')
+def _filter_live_rows(execute_state):
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not execute_state.is_relationship_load
+        and not execute_state.execution_options.get('include_deleted', False)
+    ):
+        execute_state.statement= execute_state.statement.options(
+            with_loader_criteria(BaseModel, _live_rows_criteria, include_aliases=True)
+        )
+
+
+def archive_soft_deleted(session, model, archive_model, cutoff:datetime, chunk_size:int)-> int:
+    """
+    Moves one chunk of rows soft-deleted before the cutoff into the archive table.
+    Each call is its own short transaction; on PostgreSQL, SKIP LOCKED keeps it off rows in use.
+    :returns: Number of rows moved.
+    """
+    if session.get_bind().dialect.name== 'sqlite':
+        return _archive_soft_deleted_sqlite(session, model, archive_model, cutoff, chunk_size)
+    columns= ', '.join(column.name for column in model.__table__.columns)
+    table= model.__tablename__
+    statement= text(f"""
+        WITH moved AS (
+            DELETE FROM {table}
+            WHERE id IN (
+                SELECT id FROM {table}
+                WHERE deleted_at< :cutoff
+                ORDER BY id
+                LIMIT :chunk_size
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING {columns}
+        )
+        INSERT INTO {archive_model.__tablename__} ({columns})
+        SELECT {columns} FROM moved
+    """)
+    try:
+        moved= session.execute(statement, {'cutoff':cutoff, 'chunk_size':chunk_size}).rowcount
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return moved
+
+def _archive_soft_deleted_sqlite(session, model, archive_model, cutoff:datetime, chunk_size:int)-> int:
+    """SQLite has no DML in CTEs; it serializes writers, so copy and delete in one transaction instead."""
+    table= model.__table__
+    try:
+        ids= session.execute(
+            select(table.c.id).where(table.c.deleted_at< cutoff).order_by(table.c.id).limit(chunk_size)
+            .execution_options(include_deleted=True)
+        ).scalars().all()
+        if ids:
+            session.execute(archive_model.__table__.insert().from_select(
+                [column.name for column in table.columns],
+                select(*table.columns).where(table.c.id.in_(ids)),
+            ))
+            session.execute(table.delete().where(table.c.id.in_(ids)))
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return len(ids)
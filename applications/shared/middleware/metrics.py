@@ -0,0 +1,74 @@
+"""Request latency instrumentation and the Prometheus scrape endpoint."""
+
+import os
+import hmac
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.http import HttpResponse, HttpResponseForbidden
+from applications.shared.utils import metrics
+from applications.shared.utils.prometheus import prometheus_exporter
+
+
+def route_label(request)-> str:
+    """
+    URL pattern of the resolved view (e.g. 'auth/register/'), so ids in paths do not
+    explode the label set; 'unmatched' before resolution or for 404s.
+    """
+    match= getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.route or match.view_name or 'unmatched'
+
+
+class MetricsMiddleware:
+    """
+    Observes http_request_duration_seconds{route, method, status} for every request.
+    Stage timings recorded with metrics.stage() inside the view carry the same route label.
+    Place it first so the duration covers the rest of the middleware stack.
+    """
+    sync_capable= True
+    async_capable= True
+
+    def __init__(self, get_response):
+        self.get_response= get_response
+        prometheus_exporter()
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def _finish(request, started:float, response)-> None:
+        metrics.observe(
+            'http_request_duration_seconds',
+            time.perf_counter()- started,
+            route=route_label(request),
+            method=request.method,
+            status=str(response.status_code),
+        )
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started= time.perf_counter()
+        metrics.bind_request(lambda: route_label(request))
+        response= self.get_response(request)
+        self._finish(request, started, response)
+        return response
+
+    async def __acall__(self, request):
+        started= time.perf_counter()
+        metrics.bind_request(lambda: route_label(request))
+        response= await self.get_response(request)
+        self._finish(request, started, response)
+        return response
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint summing every worker's totals.
+    Scrapers must send METRICS_TOKEN as a bearer token; without one configured every scrape is refused.
+    """
+    token= os.getenv('METRICS_TOKEN')
+    # compare_digest() only takes ASCII str; bytes keep a non-ASCII header a 403 rather than a TypeError.
+    if not token or not hmac.compare_digest(request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode()):
+        return HttpResponseForbidden()
+    return HttpResponse(prometheus_exporter().render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,257 @@
+"""Sliding-window rate limiting for the auth endpoints."""
+
+import os
+import math
+import time
+import logging
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.http import JsonResponse
+from redis.exceptions import RedisError
+from app_config.settings.redis_registry import redis_registry
+from applications.shared.utils import metrics
+
+logger= logging.getLogger('django')
+
+# Sliding-window counter over every identity in one atomic call: all keys are
+# checked first and only incremented if none of them is over its limit.
+# KEYS: current/previous window key pairs. ARGV: window ms, elapsed ms, then one limit per pair.
+# Returns 0 when allowed, otherwise the milliseconds until the current window ends.
+SLIDING_WINDOW_LUA= """
+local window= tonumber(ARGV[1])
+local elapsed= tonumber(ARGV[2])
+local weight= 1- elapsed/ window
+for pair= 1, #KEYS/ 2 do
+    local current= tonumber(redis.call('GET', KEYS[pair* 2- 1]) or '0')
+    local previous= tonumber(redis.call('GET', KEYS[pair* 2]) or '0')
+    if previous* weight+ current>= tonumber(ARGV[pair+ 2]) then
+        return window- elapsed
+    end
+end
+for pair= 1, #KEYS/ 2 do
+    redis.call('INCR', KEYS[pair* 2- 1])
+    redis.call('PEXPIRE', KEYS[pair* 2- 1], window* 2)
+end
+return 0
+"""
+
+Identity= Tuple[str, int]
+
+
+class LocalSlidingWindow:
+    """In-process sliding-window counter used while Redis is unreachable."""
+    def __init__(self, window_ms:int, max_keys:int=100_000):
+        self._window_ms= window_ms
+        self._max_keys= max_keys
+        self._counts: Dict[str, Tuple[int, int, int]]= {}
+        self._lock= threading.Lock()
+
+    def hit(self, identities:List[Identity], now_ms:int)-> int:
+        """Same contract as the Lua script: 0 if allowed, else ms until the window ends."""
+        index, elapsed= divmod(now_ms, self._window_ms)
+        weight= 1- elapsed/ self._window_ms
+        with self._lock:
+            states= []
+            for key, limit in identities:
+                window_index, current, previous= self._counts.get(key, (index, 0, 0))
+                if window_index!= index:
+                    previous= current if window_index== index- 1 else 0
+                    current= 0
+                if previous* weight+ current>= limit:
+                    return self._window_ms- elapsed
+                states.append((key, current, previous))
+            for key, current, previous in states:
+                self._counts[key]= (index, current+ 1, previous)
+            if len(self._counts)> self._max_keys:
+                self._counts= {key:state for key, state in self._counts.items() if state[0]>= index- 1}
+        return 0
+
+
+class RateLimiter:
+    """
+    Redis sliding-window limiter: one EVALSHA per check, covering every identity.
+    Falls back to a per-process window for RATE_LIMIT_FALLBACK_SECONDS after a Redis error.
+    """
+    def __init__(self):
+        self.window_ms= int(float(os.getenv('RATE_LIMIT_WINDOW', 60))* 1000)
+        self.per_ip= int(os.getenv('RATE_LIMIT_PER_IP', 30))
+        self.per_email= int(os.getenv('RATE_LIMIT_PER_EMAIL', 5))
+        self._prefix= os.getenv('RATE_LIMIT_PREFIX', 'ratelimit')
+        self._fallback_seconds= float(os.getenv('RATE_LIMIT_FALLBACK_SECONDS', 30))
+        self._local= LocalSlidingWindow(self.window_ms)
+        self._redis_down_until= 0.0
+        self._script= None
+        self._async_script= None
+
+    def _keys_and_args(self, identities:List[Identity], now_ms:int)-> Tuple[List[str], List[int]]:
+        index, elapsed= divmod(now_ms, self.window_ms)
+        keys= []
+        for identity, _ in identities:
+            keys.append(f'{self._prefix}:{identity}:{index}')
+            keys.append(f'{self._prefix}:{identity}:{index- 1}')
+        return keys, [self.window_ms, elapsed]+ [limit for _, limit in identities]
+
+    def _fallback(self, identities:List[Identity], now_ms:int, exc:Exception)-> int:
+        if time.monotonic()>= self._redis_down_until:
+            logger.warning(f'Rate limiter falling back to local counters: {exc}')
+        self._redis_down_until= time.monotonic()+ self._fallback_seconds
+        metrics.increment('rate_limit_fallbacks_total')
+        return self._local.hit(identities, now_ms)
+
+    @staticmethod
+    def _retry_after(wait_ms:int)-> int:
+        return max(1, math.ceil(wait_ms/ 1000))
+
+    def hit(self, identities:List[Identity])-> int:
+        """
+        Counts one request against every identity.
+        :returns: 0 if allowed | seconds to wait before retrying.
+        """
+        now_ms= int(time.time()* 1000)
+        if time.monotonic()< self._redis_down_until:
+            wait_ms= self._local.hit(identities, now_ms)
+        else:
+            try:
+                if self._script is None:
+                    self._script= redis_registry().client().register_script(SLIDING_WINDOW_LUA)
+                keys, args= self._keys_and_args(identities, now_ms)
+                wait_ms= int(self._script(keys=keys, args=args))
+            except RedisError as exc:
+                wait_ms= self._fallback(identities, now_ms, exc)
+        if wait_ms:
+            metrics.increment('rate_limit_rejections_total')
+            return self._retry_after(wait_ms)
+        return 0
+
+    async def ahit(self, identities:List[Identity])-> int:
+        """Async variant of hit() on the shared asyncio pool."""
+        now_ms= int(time.time()* 1000)
+        if time.monotonic()< self._redis_down_until:
+            wait_ms= self._local.hit(identities, now_ms)
+        else:
+            try:
+                if self._async_script is None:
+                    self._async_script= redis_registry().async_client().register_script(SLIDING_WINDOW_LUA)
+                keys, args= self._keys_and_args(identities, now_ms)
+                wait_ms= int(await self._async_script(keys=keys, args=args))
+            except RedisError as exc:
+                wait_ms= self._fallback(identities, now_ms, exc)
+        if wait_ms:
+            metrics.increment('rate_limit_rejections_total')
+            return self._retry_after(wait_ms)
+        return 0
+
+    def _email_identities(self, request, normalized_email:Optional[str], per_client:bool)-> List[Identity]:
+        identities= list(getattr(request, 'rate_limit_deferred', ()))
+        if normalized_email is not None:
+            scope= f'email:{normalized_email}'
+            if per_client:
+                scope+= f':ip:{getattr(request, "rate_limit_client_ip", None) or request.META.get("REMOTE_ADDR", "unknown")}'
+            identities.append((scope, self.per_email))
+        return identities
+
+    def hit_email(self, request, normalized_email:Optional[str], per_client:bool=False)-> int:
+        """
+        Per-email limit, checked by auth views once the body is parsed, in the same call as the
+        per-IP limit RateLimitMiddleware deferred to the view (see defers_rate_limit).
+        Pass normalized_email=None for a body without a valid email: the IP is still counted.
+        per_client keys the email limit on email and client IP, so failed logins from one
+        address cannot lock the owner out everywhere.
+        :returns: 0 if allowed | seconds to wait before retrying.
+        """
+        identities= self._email_identities(request, normalized_email, per_client)
+        return self.hit(identities) if identities else 0
+
+    async def ahit_email(self, request, normalized_email:Optional[str], per_client:bool=False)-> int:
+        """Async variant of hit_email()."""
+        identities= self._email_identities(request, normalized_email, per_client)
+        return await self.ahit(identities) if identities else 0
+
+
+@lru_cache()
+def rate_limiter()-> RateLimiter:
+    """Cached process-wide rate limiter."""
+    return RateLimiter()
+
+
+def rate_limited_response(retry_after:int)-> JsonResponse:
+    """429 response with Retry-After."""
+    response= JsonResponse({
+        'error':'Too many requests. Please try again later.'
+    }, status=429)
+    response['Retry-After']= str(retry_after)
+    return response
+
+
+def defers_rate_limit(view):
+    """
+    Marks a view that calls RateLimiter.hit_email() on every POST. RateLimitMiddleware then
+    leaves the per-IP limit to that call, so both limits cost one Redis round trip.
+    """
+    view.rate_limit_deferred= True
+    return view
+
+
+class RateLimitMiddleware:
+    """
+    Per-IP sliding-window limit on RATE_LIMIT_PATHS, enforced from headers only,
+    before the request body is read. POSTs to views marked with defers_rate_limit
+    are counted by the view instead, in one call with their per-email limit.
+    Works natively under WSGI and ASGI.
+    """
+    sync_capable= True
+    async_capable= True
+
+    def __init__(self, get_response):
+        self.get_response= get_response
+        self._paths= tuple(path.strip() for path in os.getenv('RATE_LIMIT_PATHS', '/auth/').split(',') if path.strip())
+        self._trust_forwarded= os.getenv('RATE_LIMIT_TRUST_FORWARDED', 'false').lower()== 'true'
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+            # Django calls process_view in the mode it is defined in.
+            self.process_view= self.aprocess_view
+
+    def _client_ip(self, request)-> str:
+        if self._trust_forwarded:
+            forwarded= request.META.get('HTTP_X_FORWARDED_FOR')
+            if forwarded:
+                return forwarded.split(',')[0].strip()
+        return request.META.get('REMOTE_ADDR', 'unknown')
+
+    def _identities(self, request)-> List[Identity]:
+        if not request.path.startswith(self._paths):
+            return []
+        request.rate_limit_client_ip= self._client_ip(request)
+        return [(f'ip:{request.rate_limit_client_ip}', rate_limiter().per_ip)]
+
+    def _deferred(self, request, view_func, identities:List[Identity])-> bool:
+        if request.method== 'POST' and getattr(view_func, 'rate_limit_deferred', False):
+            request.rate_limit_deferred= identities
+            return True
+        return False
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """Runs once the view is resolved, still before the body is read."""
+        identities= self._identities(request)
+        if not identities or self._deferred(request, view_func, identities):
+            return None
+        retry_after= rate_limiter().hit(identities)
+        return rate_limited_response(retry_after) if retry_after else None
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        """Async variant of process_view(), installed in its place under ASGI."""
+        identities= self._identities(request)
+        if not identities or self._deferred(request, view_func, identities):
+            return None
+        retry_after= await rate_limiter().ahit(identities)
+        return rate_limited_response(retry_after) if retry_after else None
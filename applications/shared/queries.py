@@ -0,0 +1,76 @@
+"""
+Read-only queries returning slotted dataclasses instead of ORM instances.
+Only the dataclass's columns are selected, and rows become plain objects without
+identity-map entries, attribute instrumentation or change tracking. Use ORM instances
+for writes only.
+
+Read models are declared next to their ORM model, e.g.:
+
+    @dataclass(slots=True, frozen=True)
+    class ClientUserRow:
+        id: int
+        email: str
+"""
+
+import dataclasses
+from functools import lru_cache
+from typing import Any, AsyncIterator, Iterator, List, Optional, Tuple, Type, TypeVar
+from sqlalchemy import Select, select
+
+Row= TypeVar('Row')
+
+
+@lru_cache()
+def field_names(row_class:type)-> Tuple[str, ...]:
+    return tuple(field.name for field in dataclasses.fields(row_class))
+
+@lru_cache()
+def columns_of(model:type, row_class:type)-> Tuple[Any, ...]:
+    """Model columns named like the read model's fields, in field order."""
+    return tuple(getattr(model, name) for name in field_names(row_class))
+
+def select_rows(model:type, row_class:type)-> Select:
+    """
+    SELECT of the read model's columns; add where/order_by/limit as usual.
+    Sessions from the shared factories still hide soft-deleted rows (see LiveRowsSession).
+    """
+    return select(*columns_of(model, row_class))
+
+def first(session, statement:Select, row_class:Type[Row])-> Optional[Row]:
+    row= session.execute(statement).first()
+    return row_class(*row) if row is not None else None
+
+async def afirst(session, statement:Select, row_class:Type[Row])-> Optional[Row]:
+    """Async variant of first()."""
+    row= (await session.execute(statement)).first()
+    return row_class(*row) if row is not None else None
+
+def all_rows(session, statement:Select, row_class:Type[Row])-> List[Row]:
+    return [row_class(*row) for row in session.execute(statement)]
+
+async def aall_rows(session, statement:Select, row_class:Type[Row])-> List[Row]:
+    """Async variant of all_rows()."""
+    return [row_class(*row) for row in await session.execute(statement)]
+
+def stream(session, statement:Select, row_class:Type[Row], batch_size:int=1000)-> Iterator[Row]:
+    """
+    Yields rows batch by batch from a server-side cursor, so memory stays bounded by
+    batch_size whatever the result size. Keep the session open until exhausted.
+    """
+    result= session.execute(statement.execution_options(yield_per=batch_size))
+    try:
+        for partition in result.partitions():
+            for row in partition:
+                yield row_class(*row)
+    finally:
+        result.close()
+
+async def astream(session, statement:Select, row_class:Type[Row], batch_size:int=1000)-> AsyncIterator[Row]:
+    """Async variant of stream()."""
+    result= await session.stream(statement.execution_options(yield_per=batch_size))
+    try:
+        async for partition in result.partitions():
+            for row in partition:
+                yield row_class(*row)
+    finally:
+        await result.close()
@@ -0,0 +1,212 @@
+"""
+Two-tier session engine: a bounded per-process LRU in front of the Redis-backed cache sessions.
+Writes and deletes are published on a Redis channel so every worker drops its local copy.
+
+SESSION_ENGINE= 'applications.shared.sessions.two_tier'
+"""
+
+import os
+import sys
+import copy
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+from django.contrib.sessions.backends.cache import SessionStore as CacheSessionStore
+from redis.exceptions import RedisError
+from app_config.settings.redis_registry import redis_registry
+from applications.shared.utils import metrics
+
+logger= logging.getLogger('django')
+
+
+class LocalSessionCache:
+    """Size-limited LRU of session payloads whose entries also expire after a TTL."""
+    def __init__(self, max_entries:int, ttl:float):
+        self._max_entries= max_entries
+        self._ttl= ttl
+        self._entries: OrderedDict[str, Tuple[float, Dict[str, Any]]]= OrderedDict()
+        self._lock= threading.Lock()
+        self.hits= 0
+        self.misses= 0
+        self.evictions= 0
+
+    def get(self, key:str)-> Optional[Dict[str, Any]]:
+        """A private copy of the cached payload, or None."""
+        with self._lock:
+            entry= self._entries.get(key)
+            if entry is None or entry[0]<= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses+= 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits+= 1
+            data= entry[1]
+        return copy.deepcopy(data)
+
+    def set(self, key:str, data:Dict[str, Any], ttl:Optional[float]=None)-> None:
+        """Caches a copy of the payload for min(ttl, local TTL) seconds."""
+        expires_at= time.monotonic()+ min(ttl if ttl is not None else self._ttl, self._ttl)
+        data= copy.deepcopy(data)
+        with self._lock:
+            self._entries[key]= (expires_at, data)
+            self._entries.move_to_end(key)
+            while len(self._entries)> self._max_entries:
+                self._entries.popitem(last=False)
+                self.evictions+= 1
+
+    def evict(self, key:str)-> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self)-> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self)-> Dict[str, Any]:
+        """Hit ratio and an approximate (shallow) memory footprint."""
+        with self._lock:
+            entries= list(self._entries.items())
+            hits, misses, evictions= self.hits, self.misses, self.evictions
+        approx_bytes= sum(
+            sys.getsizeof(key)+ sys.getsizeof(data)+ sum(sys.getsizeof(k)+ sys.getsizeof(v) for k, v in data.items())
+            for key, (_, data) in entries
+        )
+        lookups= hits+ misses
+        return {
+            'entries':len(entries),
+            'hits':hits,
+            'misses':misses,
+            'evictions':evictions,
+            'hit_ratio':hits/ lookups if lookups else 0.0,
+            'approx_bytes':approx_bytes,
+        }
+
+
+class SessionInvalidationListener:
+    """
+    Background thread evicting local entries announced on the invalidation channel.
+    Messages are '<sender id>:<cache key>'; a worker ignores its own messages.
+    If the subscription drops, the local cache is cleared since messages may have been missed.
+    """
+    def __init__(self, cache:LocalSessionCache, channel:str):
+        self._cache= cache
+        self._channel= channel
+        self._pid= None
+        self._lock= threading.Lock()
+        self.sender_id= uuid.uuid4().hex
+
+    def ensure_started(self)-> None:
+        if self._pid== os.getpid():
+            return
+        with self._lock:
+            if self._pid== os.getpid():
+                return
+            self._pid= os.getpid()
+            self.sender_id= uuid.uuid4().hex
+            self._cache.clear()
+            threading.Thread(target=self._run, name='session-invalidation', daemon=True).start()
+
+    def publish(self, cache_key:str)-> None:
+        try:
+            redis_registry().client().publish(self._channel, f'{self.sender_id}:{cache_key}')
+        except RedisError as exc:
+            logger.warning(f'Could not publish session invalidation: {exc}')
+
+    def _run(self)-> None:
+        backoff= 1.0
+        while True:
+            try:
+                pubsub= redis_registry().client().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self._channel)
+                backoff= 1.0
+                for message in pubsub.listen():
+                    sender, _, cache_key= message['data'].decode().partition(':')
+                    if sender!= self.sender_id:
+                        self._cache.evict(cache_key)
+            except RedisError as exc:
+                logger.warning(f'Session invalidation channel lost, clearing local sessions: {exc}')
+                self._cache.clear()
+                time.sleep(backoff)
+                backoff= min(backoff* 2, 30.0)
+
+
+@lru_cache()
+def local_session_cache()-> LocalSessionCache:
+    """Cached process-wide local session tier."""
+    return LocalSessionCache(
+        max_entries=int(os.getenv('SESSION_LOCAL_MAX_ENTRIES', 10_000)),
+        ttl=float(os.getenv('SESSION_LOCAL_TTL', 30)),
+    )
+
+@lru_cache()
+def invalidation_listener()-> SessionInvalidationListener:
+    """Cached process-wide invalidation listener."""
+    return SessionInvalidationListener(
+        local_session_cache(),
+        os.getenv('SESSION_INVALIDATION_CHANNEL', 'sessions:invalidate'),
+    )
+
+
+class SessionStore(CacheSessionStore):
+    """Cache session store consulting the local LRU before Redis."""
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        invalidation_listener().ensure_started()
+
+    def _remember(self, data:Dict[str, Any])-> None:
+        if self.session_key is not None and data:
+            local_session_cache().set(self.cache_key, data, ttl=self.get_expiry_age(expiry=data.get('_session_expiry')))
+
+    def _forget(self, cache_key:str)-> None:
+        local_session_cache().evict(cache_key)
+        invalidation_listener().publish(cache_key)
+
+    def load(self):
+        if self.session_key is not None:
+            data= local_session_cache().get(self.cache_key)
+            metrics.increment('session_local_lookups_total', result='miss' if data is None else 'hit')
+            if data is not None:
+                return data
+        data= super().load()
+        self._remember(data)
+        return data
+
+    async def aload(self):
+        if self.session_key is not None:
+            data= local_session_cache().get(await self.acache_key())
+            metrics.increment('session_local_lookups_total', result='miss' if data is None else 'hit')
+            if data is not None:
+                return data
+        data= await super().aload()
+        self._remember(data)
+        return data
+
+    def save(self, must_create=False):
+        super().save(must_create=must_create)
+        if self.session_key is not None:
+            self._forget(self.cache_key)
+            self._remember(self._get_session(no_load=must_create))
+
+    async def asave(self, must_create=False):
+        await super().asave(must_create=must_create)
+        if self.session_key is not None:
+            self._forget(await self.acache_key())
+            self._remember(await self._aget_session(no_load=must_create))
+
+    def delete(self, session_key=None):
+        key= session_key or self.session_key
+        super().delete(session_key)
+        if key is not None:
+            self._forget(self.cache_key_prefix+ key)
+
+    async def adelete(self, session_key=None):
+        key= session_key or self.session_key
+        await super().adelete(session_key)
+        if key is not None:
+            self._forget(self.cache_key_prefix+ key)
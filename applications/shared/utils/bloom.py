@@ -0,0 +1,147 @@
+import math
+import hashlib
+from typing import Iterable, List, Optional
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from redis.exceptions import ResponseError
+
+
+class RedisBloomFilter:
+    """
+    Bloom filter stored in Redis.
+    Uses the RedisBloom module (BF.*) when the server has it, otherwise a plain
+    Redis bitset addressed with SETBIT/GETBIT.
+    A filter only answers once it has been seeded; until then callers should treat
+    every item as possibly present.
+    """
+    SEED_BATCH_SIZE= 10_000
+
+    def __init__(self, client:Redis, key:str, capacity:int, error_rate:float, async_client:Optional[AsyncRedis]=None):
+        self._client= client
+        self._async_client= async_client
+        self.key= key
+        self.capacity= capacity
+        self.error_rate= error_rate
+        self.size= max(8, int(-capacity* math.log(error_rate)/ (math.log(2)** 2)))
+        self.hash_count= max(1, round(self.size/ capacity* math.log(2)))
+        self._native= None
+
+    @property
+    def ready_key(self)-> str:
+        return f'{self.key}:ready'
+
+    def _offsets(self, item:str)-> List[int]:
+        """Bit offsets of an item using double hashing over one blake2b digest."""
+        digest= hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first= int.from_bytes(digest[:8], 'big')
+        second= int.from_bytes(digest[8:], 'big') | 1
+        return [(first+ index* second)% self.size for index in range(self.hash_count)]
+
+    def uses_module(self)-> bool:
+        """Checks once whether the server provides RedisBloom."""
+        if self._native is None:
+            try:
+                self._client.execute_command('BF.EXISTS', f'{self.key}:probe', 'probe')
+                self._native= True
+            except ResponseError:
+                self._native= False
+        return self._native
+
+    def is_ready(self)-> bool:
+        """True once the filter has been seeded."""
+        return bool(self._client.exists(self.ready_key))
+
+    def might_contain(self, item:str)-> bool:
+        """False means the item was definitely never added."""
+        if self.uses_module():
+            return bool(self._client.execute_command('BF.EXISTS', self.key, item))
+        pipeline= self._client.pipeline(transaction=False)
+        for offset in self._offsets(item):
+            pipeline.getbit(self.key, offset)
+        return all(pipeline.execute())
+
+    async def amight_contain(self, item:str)-> bool:
+        """Async variant of might_contain(); the module check must already be done."""
+        if self.uses_module():
+            return bool(await self._async_client.execute_command('BF.EXISTS', self.key, item))
+        pipeline= self._async_client.pipeline(transaction=False)
+        for offset in self._offsets(item):
+            pipeline.getbit(self.key, offset)
+        return all(await pipeline.execute())
+
+    async def ais_ready(self)-> bool:
+        """Async variant of is_ready()."""
+        return bool(await self._async_client.exists(self.ready_key))
+
+    def add(self, item:str, key:Optional[str]=None)-> None:
+        """Adds a single item."""
+        self.add_many([item], key=key)
+
+    async def aadd(self, item:str)-> None:
+        """Async variant of add()."""
+        if self.uses_module():
+            await self._async_client.execute_command('BF.ADD', self.key, item)
+            return
+        pipeline= self._async_client.pipeline(transaction=False)
+        for offset in self._offsets(item):
+            pipeline.setbit(self.key, offset, 1)
+        await pipeline.execute()
+
+    def add_many(self, items:Iterable[str], key:Optional[str]=None)-> int:
+        """
+        Adds items in pipelined batches.
+        :returns: Number of items added.
+        """
+        key= key or self.key
+        count= 0
+        pipeline= self._client.pipeline(transaction=False)
+        batch= []
+        for item in items:
+            batch.append(item)
+            count+= 1
+            if len(batch)>= self.SEED_BATCH_SIZE:
+                self._queue_add(pipeline, key, batch)
+                pipeline.execute()
+                batch= []
+        if batch:
+            self._queue_add(pipeline, key, batch)
+            pipeline.execute()
+        return count
+
+    def _queue_add(self, pipeline, key:str, batch:List[str])-> None:
+        if self.uses_module():
+            pipeline.execute_command('BF.MADD', key, *batch)
+            return
+        for item in batch:
+            for offset in self._offsets(item):
+                pipeline.setbit(key, offset, 1)
+
+    def rebuild(self, items:Iterable[str])-> int:
+        """
+        Seeds a fresh filter under a temporary key and swaps it in atomically,
+        so readers never see a half-seeded filter.
+        :returns: Number of items seeded.
+        """
+        building_key= f'{self.key}:building'
+        self._client.delete(building_key)
+        if self.uses_module():
+            self._client.execute_command('BF.RESERVE', building_key, self.error_rate, self.capacity)
+        count= self.add_many(items, key=building_key)
+        if not count and not self.uses_module():
+            self._client.setbit(building_key, 0, 0)
+        pipeline= self._client.pipeline(transaction=True)
+        pipeline.rename(building_key, self.key)
+        pipeline.set(self.ready_key, 1)
+        pipeline.execute()
+        return count
+
+    def estimated_false_positive_rate(self)-> float:
+        """False positive rate estimated from the current fill of the filter."""
+        if self.uses_module():
+            info= self._client.execute_command('BF.INFO', self.key)
+            fields= dict(zip(info[::2], info[1::2]))
+            inserted= int(fields.get(b'Number of items inserted', fields.get('Number of items inserted', 0)))
+        else:
+            fill= self._client.bitcount(self.key)/ self.size
+            return fill** self.hash_count
+        return (1- math.exp(-self.hash_count* inserted/ self.size))** self.hash_count
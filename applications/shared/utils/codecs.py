@@ -0,0 +1,147 @@
+"""
+Versioned envelope for values stored in Redis by the Django cache (and cache-backed sessions).
+
+Layout: MAGIC (2 bytes) | envelope version | serializer id | compressor id | payload.
+Values without the magic prefix are legacy pickles written by django_redis' default
+PickleSerializer and are still read, so switching formats does not require a flush.
+"""
+
+import math
+import zlib
+import pickle
+import logging
+from typing import Any, Callable, Dict, Tuple
+from django_redis.serializers.base import BaseSerializer
+
+try:
+    import msgpack
+except ImportError:
+    msgpack= None
+
+try:
+    import orjson
+except ImportError:
+    orjson= None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame= None
+
+logger= logging.getLogger('django')
+
+MAGIC= b'\xa7\x1e'
+ENVELOPE_VERSION= 1
+HEADER_SIZE= len(MAGIC)+ 3
+
+SERIALIZER_IDS= {'pickle':0, 'msgpack':1, 'orjson':2}
+COMPRESSOR_IDS= {'none':0, 'zlib':1, 'lz4':2}
+
+# Values a codec cannot represent exactly; they are stored with pickle instead.
+UNENCODABLE= (TypeError, ValueError, OverflowError)
+
+
+def _msgpack_dumps(value:Any)-> bytes:
+    # strict_types makes tuples, sets and other non-native types fail instead of
+    # silently turning into lists, so they round-trip through pickle.
+    return msgpack.packb(value, use_bin_type=True, strict_types=True)
+
+def _msgpack_loads(data:bytes)-> Any:
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+def _json_native(value:Any)-> bool:
+    """True if value is made only of types JSON gives back unchanged (dicts need str keys)."""
+    kind= type(value)
+    if kind in (str, int, bool) or value is None:
+        return True
+    if kind is float:
+        return math.isfinite(value)
+    if kind is list:
+        return all(_json_native(item) for item in value)
+    if kind is dict:
+        return all(type(key) is str and _json_native(item) for key, item in value.items())
+    return False
+
+def _orjson_dumps(value:Any)-> bytes:
+    # orjson would turn tuples into lists and datetimes into strings; refusing
+    # anything else than JSON-native types sends those values to pickle instead.
+    if not _json_native(value):
+        raise TypeError(f'{type(value).__name__} does not round-trip through JSON.')
+    return orjson.dumps(value)
+
+def _pickle_dumps(value:Any)-> bytes:
+    return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+DUMPS: Dict[int, Callable[[Any], bytes]]= {0:_pickle_dumps, 1:_msgpack_dumps, 2:_orjson_dumps}
+LOADS: Dict[int, Callable[[bytes], Any]]= {0:pickle.loads, 1:_msgpack_loads, 2:lambda data: orjson.loads(data)}
+
+
+def _compress(compressor_id:int, data:bytes, level:int)-> bytes:
+    if compressor_id== COMPRESSOR_IDS['lz4']:
+        return lz4_frame.compress(data)
+    return zlib.compress(data, level)
+
+def _decompress(compressor_id:int, data:bytes)-> bytes:
+    if compressor_id== COMPRESSOR_IDS['none']:
+        return data
+    if compressor_id== COMPRESSOR_IDS['lz4']:
+        if lz4_frame is None:
+            raise ValueError('Cached value is lz4-compressed but lz4 is not installed.')
+        return lz4_frame.decompress(data)
+    return zlib.decompress(data)
+
+
+class EnvelopeSerializer(BaseSerializer):
+    """
+    django_redis serializer writing enveloped values and reading both enveloped and legacy ones.
+    Compression happens here (only above a size threshold and only if it saves space),
+    so the cache should keep django_redis' IdentityCompressor.
+
+    OPTIONS read from the cache settings:
+        ENVELOPE_SERIALIZER: 'msgpack' | 'orjson' | 'pickle'
+        ENVELOPE_COMPRESSOR: 'zlib' | 'lz4' | 'none' (lz4 falls back to zlib when not installed)
+        ENVELOPE_COMPRESS_MIN_BYTES: payloads below this size are stored uncompressed
+        ENVELOPE_COMPRESS_LEVEL: zlib level
+        ENVELOPE_WRITE_LEGACY: write bare pickles readable by the previous release (rollout step one)
+    """
+    def __init__(self, options:Dict[str, Any]):
+        super().__init__(options)
+        serializer= options.get('ENVELOPE_SERIALIZER', 'msgpack')
+        if serializer== 'msgpack' and msgpack is None or serializer== 'orjson' and orjson is None:
+            logger.warning(f'Cache serializer {serializer} is not installed, using pickle.')
+            serializer= 'pickle'
+        compressor= options.get('ENVELOPE_COMPRESSOR', 'zlib')
+        if compressor== 'lz4' and lz4_frame is None:
+            compressor= 'zlib'
+        self._serializer_id= SERIALIZER_IDS[serializer]
+        self._compressor_id= COMPRESSOR_IDS[compressor]
+        self._min_bytes= int(options.get('ENVELOPE_COMPRESS_MIN_BYTES', 1024))
+        self._level= int(options.get('ENVELOPE_COMPRESS_LEVEL', 6))
+        self._write_legacy= bool(options.get('ENVELOPE_WRITE_LEGACY', False))
+
+    def _encode(self, value:Any)-> Tuple[int, bytes]:
+        if self._serializer_id:
+            try:
+                return self._serializer_id, DUMPS[self._serializer_id](value)
+            except UNENCODABLE:
+                pass
+        return SERIALIZER_IDS['pickle'], _pickle_dumps(value)
+
+    def dumps(self, value:Any)-> bytes:
+        if self._write_legacy:
+            return _pickle_dumps(value)
+        serializer_id, payload= self._encode(value)
+        compressor_id= COMPRESSOR_IDS['none']
+        if self._compressor_id and len(payload)>= self._min_bytes:
+            compressed= _compress(self._compressor_id, payload, self._level)
+            if len(compressed)< len(payload):
+                compressor_id, payload= self._compressor_id, compressed
+        return MAGIC+ bytes((ENVELOPE_VERSION, serializer_id, compressor_id))+ payload
+
+    def loads(self, value:bytes)-> Any:
+        if not value.startswith(MAGIC):
+            return pickle.loads(value)
+        version, serializer_id, compressor_id= value[len(MAGIC):HEADER_SIZE]
+        if version!= ENVELOPE_VERSION:
+            raise ValueError(f'Unsupported cache envelope version {version}.')
+        return LOADS[serializer_id](_decompress(compressor_id, value[HEADER_SIZE:]))
@@ -0,0 +1,6 @@
+def normalize_email(email:str)-> str:
+    """
+    Canonical form used for email lookups and uniqueness: surrounding whitespace
+    removed and case folded, stored in client_user.normalized_email.
+    """
+    return email.strip().lower()
@@ -0,0 +1,44 @@
+"""
+JSON encoding and decoding for request handling, on orjson when it is installed and the
+standard library otherwise. Both backends accept and produce the same documents for the
+plain dicts, lists, strings and numbers the API exchanges.
+"""
+
+import json
+from typing import Any
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson= None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so one except clause covers both backends.
+JSONDecodeError= json.JSONDecodeError
+
+
+def loads(data:bytes)-> Any:
+    """
+    Parses a JSON document.
+    :raises JSONDecodeError: (also for invalid UTF-8).
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    try:
+        return json.loads(data)
+    except UnicodeDecodeError as exc:
+        raise JSONDecodeError(str(exc), '', 0)
+
+def dumps(data:Any)-> bytes:
+    """Encodes a JSON document as UTF-8 bytes."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, cls=DjangoJSONEncoder).encode()
+
+
+class FastJsonResponse(HttpResponse):
+    """JsonResponse for dict payloads, encoded with dumps()."""
+    def __init__(self, data:dict, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
@@ -1,8 +1,137 @@
+import os
+import json
+import fcntl
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
 from argon2 import PasswordHasher
 from argon2.exceptions import VerifyMismatchError, HashingError
+from applications.shared.utils import metrics
 
+logger= logging.getLogger('django')
 
-password_hasher= PasswordHasher()
+
+class Argon2Calibration:
+    """
+    Picks Argon2 cost parameters meeting a per-hash latency budget on the current host.
+    The chosen parameters are stored on disk so every worker process hashes alike.
+    """
+    MIN_MEMORY_COST= 8* 1024
+    MAX_TIME_COST= 10
+
+    def __init__(self):
+        self._target_ms= float(os.getenv('ARGON2_TARGET_MS', 50))
+        self._max_memory_cost= int(os.getenv('ARGON2_MAX_MEMORY_KIB', 64* 1024))
+        self._parallelism= int(os.getenv('ARGON2_PARALLELISM', min(os.cpu_count() or 1, 4)))
+        self._params_path= Path(os.getenv(
+            'ARGON2_PARAMS_PATH',
+            Path(__file__).resolve().parent.parent.parent.parent/ 'argon2_params.json',
+        ))
+
+    @property
+    def target_ms(self)-> float:
+        """Per-hash latency budget in milliseconds."""
+        return self._target_ms
+
+    def measure(self, params:Dict[str, int], rounds:int=3)-> float:
+        """Median duration in milliseconds of hashing with the given parameters."""
+        hasher= PasswordHasher(**params)
+        hasher.hash('calibration')
+        samples= []
+        for _ in range(rounds):
+            started= time.perf_counter()
+            hasher.hash('calibration')
+            samples.append((time.perf_counter()- started)* 1000)
+        return sorted(samples)[len(samples)// 2]
+
+    def calibrate(self)-> Dict[str, int]:
+        """
+        Shrinks memory cost until one pass fits the budget, then raises time cost
+        as long as the budget still holds.
+        """
+        params= {
+            'time_cost':1,
+            'memory_cost':self._max_memory_cost,
+            'parallelism':self._parallelism,
+        }
+        while params['memory_cost']> self.MIN_MEMORY_COST and self.measure(params)> self._target_ms:
+            params['memory_cost']//= 2
+
+        while params['time_cost']< self.MAX_TIME_COST:
+            candidate= dict(params, time_cost=params['time_cost']+ 1)
+            if self.measure(candidate)> self._target_ms:
+                break
+            params= candidate
+
+        logger.info(f'Argon2 calibrated for {self._target_ms}ms budget: {params}')
+        return params
+
+    def load(self)-> Optional[Dict[str, int]]:
+        """Returns the stored parameters, if any."""
+        try:
+            with open(self._params_path) as params_file:
+                stored= json.load(params_file)
+        except (OSError, ValueError):
+            return None
+        return {key:int(stored[key]) for key in ('time_cost', 'memory_cost', 'parallelism') if key in stored}
+
+    @contextmanager
+    def locked(self)-> Iterator[None]:
+        """
+        Exclusive lock shared by every process calibrating against the same parameters file,
+        so workers booting together neither measure each other's load nor race to write it.
+        """
+        with open(self._params_path.with_suffix('.lock'), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def store(self, params:Dict[str, int])-> None:
+        """Atomically persists the chosen parameters."""
+        temp_path= self._params_path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(temp_path, 'w') as params_file:
+            json.dump(dict(params, target_ms=self._target_ms), params_file)
+        os.replace(temp_path, self._params_path)
+
+
+def _build_password_hasher(params:Optional[Dict[str, int]])-> PasswordHasher:
+    return PasswordHasher(**params) if params else PasswordHasher()
+
+
+password_hasher= _build_password_hasher(Argon2Calibration().load())
+
+
+def init_password_hasher(mode:Optional[str]=None)-> PasswordHasher:
+    """
+    Startup calibration step. Depending on ARGON2_CALIBRATE:
+    'missing' calibrates only when no parameters are stored yet, 'always' recalibrates,
+    'never' keeps stored parameters or library defaults.
+    :returns: The process-wide password hasher.
+    """
+    global password_hasher
+    mode= (mode or os.getenv('ARGON2_CALIBRATE', 'missing')).lower()
+    calibration= Argon2Calibration()
+    params= calibration.load()
+
+    if mode== 'always' or (mode== 'missing' and params is None):
+        with calibration.locked():
+            # A worker that held the lock first may have stored parameters meanwhile.
+            params= calibration.load() if mode== 'missing' else None
+            if params is None:
+                params= calibration.calibrate()
+                calibration.store(params)
+
+    password_hasher= _build_password_hasher(params)
+    warm_dummy_hash()
+    return password_hasher
 
 
 def hash_password(password:str)-> str:
@@ -27,12 +156,177 @@ def verify_password(password:str, hashed_password:str)-> bool:
     except VerifyMismatchError:
         return False
 
-# ------------
-# UTILITY TEST
-# ------------
+def needs_rehash(hashed_password:str)-> bool:
+    """Checks if a stored hash was made with outdated Argon2 parameters."""
+    return password_hasher.check_needs_rehash(hashed_password)
+
+def verify_and_rehash(password:str, hashed_password:str)-> Tuple[bool, Optional[str]]:
+    """
+    Verifies a given string and rehashes it if the stored hash uses outdated parameters.
+    :returns: (True, new hash or None) if strings match | (False, None) if not.
+    """
+    if not verify_password(password, hashed_password):
+        return False, None
+    if needs_rehash(hashed_password):
+        return True, hash_password(password)
+    return True, None
+
+
+_dummy_hash: Optional[str]= None
+
+
+def warm_dummy_hash()-> str:
+    """Computes the dummy hash in the calling thread; meant for startup, before any request."""
+    global _dummy_hash
+    _dummy_hash= hash_password(os.urandom(16).hex())
+    return _dummy_hash
 
-#password= hash_password('caintheterrible')
-#print(password)
 
-#check= verify_password('caintheterrible', password)
-#print(check)
\ No newline at end of file
+class HashingPoolSaturated(Exception):
+    """Raised when the hashing pool has no free slot for a new job."""
+    def __init__(self, retry_after:int):
+        super().__init__(f'Hashing pool saturated, retry after {retry_after}s.')
+        self.retry_after= retry_after
+
+
+class HashingPool:
+    """
+    Bounded process pool running Argon2 away from request threads.
+    Admission is capped at workers + queue size; extra jobs are rejected immediately
+    instead of queueing behind a burst of sign-ups.
+    """
+    def __init__(self, max_workers:Optional[int]=None, queue_size:Optional[int]=None, retry_after:Optional[int]=None):
+        self._max_workers= max_workers or int(os.getenv('HASH_POOL_WORKERS', os.cpu_count() or 1))
+        self._queue_size= queue_size if queue_size is not None else int(os.getenv('HASH_POOL_QUEUE_SIZE', self._max_workers))
+        self._retry_after= retry_after or int(os.getenv('HASH_POOL_RETRY_AFTER', 1))
+        self._lock= threading.Lock()
+        self._executor= None
+        self._slots= None
+        self._pid= None
+
+    @property
+    def capacity(self)-> int:
+        """Maximum number of jobs running or waiting at once."""
+        return self._max_workers+ self._queue_size
+
+    @property
+    def retry_after(self)-> int:
+        """Seconds a rejected client should wait before retrying."""
+        return self._retry_after
+
+    def _get_executor(self)-> ProcessPoolExecutor:
+        """Builds the executor on first use and again after a fork."""
+        with self._lock:
+            if self._executor is None or self._pid!= os.getpid():
+                self._executor= ProcessPoolExecutor(max_workers=self._max_workers)
+                self._slots= threading.BoundedSemaphore(self.capacity)
+                self._pid= os.getpid()
+            return self._executor
+
+    def submit(self, fn:Callable[..., Any], *args:Any)-> Future:
+        """
+        Schedules a job on the pool if a slot is free.
+        :raises: HashingPoolSaturated if the pool is full.
+        """
+        executor= self._get_executor()
+        slots= self._slots
+        if not slots.acquire(blocking=False):
+            raise HashingPoolSaturated(self._retry_after)
+        try:
+            future= executor.submit(fn, *args)
+        except Exception:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        return future
+
+    def shutdown(self, wait:bool=True)-> None:
+        """Stops worker processes."""
+        with self._lock:
+            if self._executor is not None and self._pid== os.getpid():
+                self._executor.shutdown(wait=wait)
+            self._executor= None
+
+
+@lru_cache()
+def hashing_pool()-> HashingPool:
+    """Cached process-wide hashing pool."""
+    return HashingPool()
+
+
+def hash_password_pooled(password:str)-> str:
+    """
+    Hashes a given string on the hashing pool, blocking the caller until done.
+    :raises: HashingPoolSaturated if the pool is full.
+    """
+    future= hashing_pool().submit(hash_password, password)
+    with metrics.timer('password_hash_seconds', operation='hash'):
+        return future.result()
+
+def verify_password_pooled(password:str, hashed_password:str)-> bool:
+    """
+    Verifies a given string on the hashing pool, blocking the caller until done.
+    :raises: HashingPoolSaturated if the pool is full.
+    """
+    future= hashing_pool().submit(verify_password, password, hashed_password)
+    with metrics.timer('password_hash_seconds', operation='verify'):
+        return future.result()
+
+def verify_and_rehash_pooled(password:str, hashed_password:str)-> Tuple[bool, Optional[str]]:
+    """
+    Runs verify_and_rehash on the hashing pool, blocking the caller until done.
+    :raises: HashingPoolSaturated if the pool is full.
+    """
+    future= hashing_pool().submit(verify_and_rehash, password, hashed_password)
+    with metrics.timer('password_hash_seconds', operation='verify'):
+        return future.result()
+
+def dummy_hash()-> str:
+    """
+    Hash of a random password with the current parameters. Verifying against it costs
+    the same as a real verification, so failed logins for unknown emails take as long
+    as failed logins for known ones. init_password_hasher() computes it at startup;
+    otherwise it is computed once on the hashing pool, never on a request thread.
+    :raises: HashingPoolSaturated if the pool is full.
+    """
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash= hash_password_pooled(os.urandom(16).hex())
+    return _dummy_hash
+
+async def adummy_hash()-> str:
+    """
+    Async variant of dummy_hash().
+    :raises: HashingPoolSaturated if the pool is full.
+    """
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash= await hash_password_async(os.urandom(16).hex())
+    return _dummy_hash
+
+async def hash_password_async(password:str)-> str:
+    """
+    Awaitable variant of hash_password for async views.
+    :raises: HashingPoolSaturated if the pool is full.
+    """
+    future= hashing_pool().submit(hash_password, password)
+    with metrics.timer('password_hash_seconds', operation='hash'):
+        return await asyncio.wrap_future(future)
+
+async def verify_password_async(password:str, hashed_password:str)-> bool:
+    """
+    Awaitable variant of verify_password for async views.
+    :raises: HashingPoolSaturated if the pool is full.
+    """
+    future= hashing_pool().submit(verify_password, password, hashed_password)
+    with metrics.timer('password_hash_seconds', operation='verify'):
+        return await asyncio.wrap_future(future)
+
+async def verify_and_rehash_async(password:str, hashed_password:str)-> Tuple[bool, Optional[str]]:
+    """
+    Awaitable variant of verify_and_rehash for async views.
+    :raises: HashingPoolSaturated if the pool is full.
+    """
+    future= hashing_pool().submit(verify_and_rehash, password, hashed_password)
+    with metrics.timer('password_hash_seconds', operation='verify'):
+        return await asyncio.wrap_future(future)
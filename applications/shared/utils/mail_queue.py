@@ -0,0 +1,219 @@
+"""
+Redis-backed outbound mail queue.
+
+Requests only RPUSH a small JSON job; a `manage.py mail_worker` process turns jobs into
+messages and sends them in batches over one long-lived SMTP connection.
+Failed sends go to a retry sorted set scored by their next attempt time, and jobs that
+keep failing end up on a dead-letter list for inspection.
+"""
+
+import os
+import json
+import time
+import uuid
+import random
+import socket
+import logging
+import smtplib
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from django.core.mail import EmailMessage, get_connection
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from applications.shared.utils import metrics
+
+logger= logging.getLogger('django')
+
+# Moves due retries back onto the queue; atomic so that concurrent workers never requeue a job twice.
+PROMOTE_DUE_LUA= """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, job in ipairs(due) do
+    redis.call('ZREM', KEYS[1], job)
+    redis.call('RPUSH', KEYS[2], job)
+end
+return #due
+"""
+
+MessageBuilder= Callable[[Dict[str, Any]], EmailMessage]
+
+_builders: Dict[str, MessageBuilder]= {}
+
+
+def register_builder(kind:str, builder:MessageBuilder)-> None:
+    """Registers the function turning a job's context into an EmailMessage for a kind of mail."""
+    _builders[kind]= builder
+
+
+class MailQueue:
+    """
+    Producer and consumer side of the queue.
+    Keys: MAIL_QUEUE_KEY (pending list), <key>:retry (sorted set), <key>:dead (list) and
+    <key>:processing:<worker> (jobs taken by a worker but not yet acknowledged).
+    """
+    def __init__(self, client:Redis, async_client:Optional[AsyncRedis]=None):
+        self._client= client
+        self._async_client= async_client
+        self.key= os.getenv('MAIL_QUEUE_KEY', 'mail:queue')
+        self.retry_key= f'{self.key}:retry'
+        self.dead_key= f'{self.key}:dead'
+        self.max_attempts= int(os.getenv('MAIL_MAX_ATTEMPTS', 5))
+        self.backoff_base= float(os.getenv('MAIL_BACKOFF_BASE', 30))
+        self.backoff_max= float(os.getenv('MAIL_BACKOFF_MAX', 3600))
+        self._promote_due= client.register_script(PROMOTE_DUE_LUA)
+
+    @staticmethod
+    def job(kind:str, to:str, context:Dict[str, Any])-> str:
+        return json.dumps({'id':uuid.uuid4().hex, 'kind':kind, 'to':to, 'context':context, 'attempts':0})
+
+    def enqueue(self, kind:str, to:str, context:Dict[str, Any])-> None:
+        """Queues a mail; one round trip."""
+        self._client.rpush(self.key, self.job(kind, to, context))
+        metrics.increment('mail_enqueued_total', kind=kind)
+
+    async def aenqueue(self, kind:str, to:str, context:Dict[str, Any])-> None:
+        """Async variant of enqueue()."""
+        await self._async_client.rpush(self.key, self.job(kind, to, context))
+        metrics.increment('mail_enqueued_total', kind=kind)
+
+    def processing_key(self, worker:str)-> str:
+        return f'{self.key}:processing:{worker}'
+
+    def recover(self, worker:str)-> int:
+        """Requeues jobs a previous run of this worker took but never acknowledged."""
+        recovered= 0
+        while self._client.lmove(self.processing_key(worker), self.key, 'RIGHT', 'LEFT') is not None:
+            recovered+= 1
+        return recovered
+
+    def promote_due(self, limit:int=1000)-> int:
+        """Moves retries whose backoff has elapsed back onto the queue."""
+        return int(self._promote_due(keys=[self.retry_key, self.key], args=[time.time(), limit]))
+
+    def take(self, worker:str, batch_size:int, timeout:float)-> List[bytes]:
+        """
+        Blocks up to timeout seconds for a job, then takes up to batch_size jobs without
+        blocking. Jobs stay on the worker's processing list until acknowledged.
+        """
+        processing= self.processing_key(worker)
+        first= self._client.blmove(self.key, processing, timeout, 'LEFT', 'RIGHT')
+        if first is None:
+            return []
+        pipeline= self._client.pipeline(transaction=False)
+        for _ in range(batch_size- 1):
+            pipeline.lmove(self.key, processing, 'LEFT', 'RIGHT')
+        return [first]+ [raw for raw in pipeline.execute() if raw is not None]
+
+    def settle(self, worker:str, sent:List[bytes], failed:List[Tuple[bytes, str]])-> None:
+        """Acknowledges a batch: drops sent jobs and schedules or dead-letters failed ones."""
+        processing= self.processing_key(worker)
+        pipeline= self._client.pipeline(transaction=False)
+        for raw in sent:
+            pipeline.lrem(processing, 1, raw)
+        for raw, error in failed:
+            pipeline.lrem(processing, 1, raw)
+            try:
+                job= json.loads(raw)
+            except ValueError:
+                pipeline.rpush(self.dead_key, raw)
+                continue
+            job['attempts']+= 1
+            job['last_error']= error
+            if job['attempts']>= self.max_attempts:
+                pipeline.rpush(self.dead_key, json.dumps(job))
+                metrics.increment('mail_dead_lettered_total', kind=job['kind'])
+            else:
+                pipeline.zadd(self.retry_key, {json.dumps(job):time.time()+ self.backoff(job['attempts'])})
+                metrics.increment('mail_retries_total', kind=job['kind'])
+        pipeline.execute()
+
+    def backoff(self, attempts:int)-> float:
+        """Exponential backoff with full jitter."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base* 2** (attempts- 1)))
+
+    def stats(self)-> Dict[str, int]:
+        pipeline= self._client.pipeline(transaction=False)
+        pipeline.llen(self.key)
+        pipeline.zcard(self.retry_key)
+        pipeline.llen(self.dead_key)
+        queued, retrying, dead= pipeline.execute()
+        return {'queued':queued, 'retrying':retrying, 'dead':dead}
+
+
+class MailSender:
+    """
+    Sends batches over a single SMTP connection that stays open between batches and is
+    reopened once if the server dropped it. Each message is sent separately so that one
+    rejected recipient does not fail the whole batch.
+    """
+    def __init__(self, idle_timeout:float):
+        self._connection= None
+        self._idle_timeout= idle_timeout
+        self._last_used= 0.0
+
+    def _open(self):
+        self.close_if_idle()
+        if self._connection is None:
+            self._connection= get_connection(fail_silently=False)
+            self._connection.open()
+        return self._connection
+
+    def close(self)-> None:
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._connection= None
+
+    def close_if_idle(self)-> bool:
+        """
+        Closes the connection once it has been unused for idle_timeout seconds.
+        :returns: True if it was closed.
+        """
+        if self._connection is None or time.monotonic()- self._last_used<= self._idle_timeout:
+            return False
+        self.close()
+        return True
+
+    def _send(self, message:EmailMessage)-> None:
+        try:
+            self._open().send_messages([message])
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            self.close()
+            self._open().send_messages([message])
+        self._last_used= time.monotonic()
+
+    def send_batch(self, jobs:List[bytes])-> Tuple[List[bytes], List[Tuple[bytes, str]]]:
+        """:returns: (sent jobs, [(failed job, error)])."""
+        sent, failed= [], []
+        for raw in jobs:
+            try:
+                job= json.loads(raw)
+                message= _builders[job['kind']](job)
+                message.to= [job['to']]
+                self._send(message)
+                sent.append(raw)
+            except (smtplib.SMTPException, socket.error, KeyError, ValueError) as exc:
+                logger.warning(f'Mail send failed: {exc!r}')
+                failed.append((raw, repr(exc)))
+        metrics.increment('mail_sent_total', len(sent))
+        return sent, failed
+
+
+def verification_message(job:Dict[str, Any])-> EmailMessage:
+    """Verification mail with the link built from VERIFICATION_URL and the job's token."""
+    context= job['context']
+    link= f'{os.getenv("VERIFICATION_URL", "http://localhost:8000/auth/verify/")}?token={context["token"]}'
+    return EmailMessage(
+        subject='Confirm your email address',
+        body=f'Hi {context["first_name"]},\n\nPlease confirm your email address by opening this link:\n{link}\n',
+    )
+
+register_builder('verification', verification_message)
+
+
+@lru_cache()
+def mail_queue()-> MailQueue:
+    """Cached mail queue on the shared Redis pools."""
+    from app_config.settings.redis_registry import redis_registry
+    return MailQueue(redis_registry().client(), async_client=redis_registry().async_client())
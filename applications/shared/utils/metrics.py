@@ -0,0 +1,65 @@
+"""
+Metrics hooks shared across the application.
+Instrumented code emits counters and observations; registered hooks decide where they go.
+With no hook registered, emitting costs a single list check.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, List, Optional
+
+MetricHook= Callable[[str, str, float, dict], None]
+
+_hooks: List[MetricHook]= []
+
+# Returns the route label of the current request; bound by MetricsMiddleware.
+_route_of_request: ContextVar[Optional[Callable[[], str]]]= ContextVar('metrics_route_of_request', default=None)
+
+
+def register_hook(hook:MetricHook)-> None:
+    """
+    Registers a callable receiving (kind, name, value, labels) for every emitted metric.
+    kind is 'counter' or 'observation'.
+    """
+    if hook not in _hooks:
+        _hooks.append(hook)
+
+def unregister_hook(hook:MetricHook)-> None:
+    """Removes a previously registered hook."""
+    if hook in _hooks:
+        _hooks.remove(hook)
+
+def increment(name:str, value:float=1, **labels)-> None:
+    """Emits a counter increment."""
+    for hook in _hooks:
+        hook('counter', name, value, labels)
+
+def observe(name:str, value:float, **labels)-> None:
+    """Emits an observation, e.g. a duration in seconds."""
+    for hook in _hooks:
+        hook('observation', name, value, labels)
+
+
+@contextmanager
+def timer(name:str, **labels)-> Iterator[None]:
+    """Observes the duration of the block in seconds, also when it raises."""
+    started= time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter()- started, **labels)
+
+def bind_request(route_of_request:Callable[[], str])-> None:
+    """Makes stage timings in this context carry the current request's route label."""
+    _route_of_request.set(route_of_request)
+
+@contextmanager
+def stage(name:str)-> Iterator[None]:
+    """
+    Times one stage of a request, e.g. `with metrics.stage('hash'):`.
+    Observed as request_stage_seconds{route, stage}.
+    """
+    route_of_request= _route_of_request.get()
+    with timer('request_stage_seconds', route=route_of_request() if route_of_request else 'none', stage=name):
+        yield
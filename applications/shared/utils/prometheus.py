@@ -0,0 +1,187 @@
+"""
+Prometheus text-format export of the metrics hooks.
+
+Each process aggregates counters and histograms in memory. With METRICS_DIR set, every
+process also writes its totals to METRICS_DIR/metrics_<pid>_<start>.json (periodically
+and on scrape), and /metrics sums all files, so any gunicorn worker can answer a scrape
+for the whole server. Files of exited workers are kept so counters never go backwards;
+clear the directory when the server (not a worker) restarts.
+"""
+
+import os
+import glob
+import json
+import time
+import bisect
+import logging
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+from applications.shared.utils import metrics
+
+logger= logging.getLogger('django')
+
+DEFAULT_BUCKETS= (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelSet= Tuple[Tuple[str, str], ...]
+SeriesKey= Tuple[str, LabelSet]
+
+
+def _label_set(labels:dict)-> LabelSet:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def _escape(value:str)-> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(labels:Iterable[Tuple[str, str]])-> str:
+    pairs= ','.join(f'{key}="{_escape(value)}"' for key, value in labels)
+    return f'{{{pairs}}}' if pairs else ''
+
+
+class PrometheusRegistry:
+    """In-process counters and histograms fed by the metrics hooks."""
+    def __init__(self, buckets:Tuple[float, ...]=DEFAULT_BUCKETS):
+        self._buckets= buckets
+        self._lock= threading.Lock()
+        self._counters: Dict[SeriesKey, float]= {}
+        # Per series: non-cumulative bucket counts (last slot is +Inf), sum, count.
+        self._histograms: Dict[SeriesKey, List]= {}
+
+    def hook(self, kind:str, name:str, value:float, labels:dict)-> None:
+        """Metrics hook; register with metrics.register_hook(registry.hook)."""
+        key= (name, _label_set(labels))
+        with self._lock:
+            if kind== 'counter':
+                self._counters[key]= self._counters.get(key, 0.0)+ value
+                return
+            histogram= self._histograms.get(key)
+            if histogram is None:
+                histogram= self._histograms[key]= [[0]* (len(self._buckets)+ 1), 0.0, 0]
+            histogram[0][bisect.bisect_left(self._buckets, value)]+= 1
+            histogram[1]+= value
+            histogram[2]+= 1
+
+    def reset(self)-> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self)-> Dict:
+        """JSON-serialisable copy of the current totals."""
+        with self._lock:
+            return {
+                'buckets':list(self._buckets),
+                'counters':[[name, list(map(list, labels)), value] for (name, labels), value in self._counters.items()],
+                'histograms':[
+                    [name, list(map(list, labels)), list(counts), total, count]
+                    for (name, labels), (counts, total, count) in self._histograms.items()
+                ],
+            }
+
+    @staticmethod
+    def render(snapshots:List[Dict])-> str:
+        """Sums snapshots (one per process) into the Prometheus text exposition format."""
+        counters: Dict[SeriesKey, float]= {}
+        histograms: Dict[SeriesKey, List]= {}
+        buckets: List[float]= list(DEFAULT_BUCKETS)
+        for snapshot in snapshots:
+            buckets= snapshot['buckets']
+            for name, labels, value in snapshot['counters']:
+                key= (name, tuple(map(tuple, labels)))
+                counters[key]= counters.get(key, 0.0)+ value
+            for name, labels, counts, total, count in snapshot['histograms']:
+                key= (name, tuple(map(tuple, labels)))
+                merged= histograms.setdefault(key, [[0]* len(counts), 0.0, 0])
+                merged[0]= [left+ right for left, right in zip(merged[0], counts)]
+                merged[1]+= total
+                merged[2]+= count
+
+        lines: List[str]= []
+        typed= set()
+        for (name, labels), value in sorted(counters.items()):
+            if name not in typed:
+                lines.append(f'# TYPE {name} counter')
+                typed.add(name)
+            lines.append(f'{name}{_format_labels(labels)} {value:g}')
+        for (name, labels), (counts, total, count) in sorted(histograms.items()):
+            if name not in typed:
+                lines.append(f'# TYPE {name} histogram')
+                typed.add(name)
+            cumulative= 0
+            for bound, bucket_count in zip([*map(str, buckets), '+Inf'], counts):
+                cumulative+= bucket_count
+                lines.append(f'{name}_bucket{_format_labels((*labels, ("le", bound)))} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {total:g}')
+            lines.append(f'{name}_count{_format_labels(labels)} {count}')
+        return '\n'.join(lines)+ '\n'
+
+
+class MultiprocessExporter:
+    """Writes this process's snapshot to METRICS_DIR and renders the sum over all processes."""
+    def __init__(self, registry:PrometheusRegistry, directory:Optional[str], interval:float):
+        self._registry= registry
+        self._directory= directory
+        self._interval= interval
+        self._path: Optional[str]= None
+        self._thread: Optional[threading.Thread]= None
+
+    def start(self)-> None:
+        """Starts the periodic writer; called again in forked children with fresh totals."""
+        if not self._directory:
+            return
+        os.makedirs(self._directory, exist_ok=True)
+        self._path= os.path.join(self._directory, f'metrics_{os.getpid()}_{int(time.time())}.json')
+        self._thread= threading.Thread(target=self._run, name='metrics-writer', daemon=True)
+        self._thread.start()
+
+    def after_fork(self)-> None:
+        self._registry.reset()
+        self.start()
+
+    def _run(self)-> None:
+        while True:
+            time.sleep(self._interval)
+            self.write()
+
+    def write(self)-> None:
+        if not self._path:
+            return
+        temp_path= f'{self._path}.tmp'
+        try:
+            with open(temp_path, 'w') as snapshot_file:
+                json.dump(self._registry.snapshot(), snapshot_file)
+            os.replace(temp_path, self._path)
+        except OSError as exc:
+            logger.warning(f'Could not write metrics snapshot: {exc}')
+
+    def render(self)-> str:
+        if not self._directory:
+            return self._registry.render([self._registry.snapshot()])
+        self.write()
+        snapshots= []
+        for path in glob.glob(os.path.join(self._directory, 'metrics_*.json')):
+            try:
+                with open(path) as snapshot_file:
+                    snapshots.append(json.load(snapshot_file))
+            except (OSError, ValueError):
+                continue
+        return self._registry.render(snapshots)
+
+
+@lru_cache()
+def prometheus_exporter()-> MultiprocessExporter:
+    """
+    Cached exporter; the first call registers the metrics hook and starts the writer.
+    METRICS_DIR enables multiprocess aggregation, METRICS_FLUSH_INTERVAL sets how often
+    (seconds) each process writes its totals.
+    """
+    registry= PrometheusRegistry()
+    exporter= MultiprocessExporter(
+        registry,
+        os.getenv('METRICS_DIR'),
+        float(os.getenv('METRICS_FLUSH_INTERVAL', 5)),
+    )
+    metrics.register_hook(registry.hook)
+    exporter.start()
+    os.register_at_fork(after_in_child=exporter.after_fork)
+    return exporter
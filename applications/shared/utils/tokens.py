@@ -0,0 +1,145 @@
+"""
+Signed, expiring tokens validated without any database or Redis lookup.
+
+Token layout before base64url: user id (8 bytes) | expiry epoch (4 bytes) | nonce (8 bytes) | HMAC-SHA256 tag (16 bytes).
+Revoked tokens are tracked by nonce in Redis sets bucketed by expiry hour; each set
+expires together with the last token it can hold.
+"""
+
+import os
+import hmac
+import time
+import base64
+import struct
+import hashlib
+import secrets
+from functools import lru_cache
+from typing import List, NamedTuple, Optional
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+
+PAYLOAD= struct.Struct('>QI8s')
+TAG_SIZE= 16
+TOKEN_SIZE= PAYLOAD.size+ TAG_SIZE
+REVOCATION_BUCKET_SECONDS= 3600
+
+
+class TokenInvalid(Exception):
+    """Raised for malformed, forged, expired or revoked tokens."""
+    def __init__(self, reason:str):
+        super().__init__(reason)
+        self.reason= reason
+
+
+class SignedToken(NamedTuple):
+    user_id: int
+    expires_at: int
+    nonce: bytes
+
+
+class TokenSigner:
+    """
+    Issues and validates tokens for one purpose (e.g. email verification).
+    Keys are derived per purpose from SECRET_KEY; tokens signed with a key from
+    SECRET_KEY_FALLBACKS still validate, so the secret can be rotated.
+    """
+    def __init__(self, purpose:str, ttl:int, secret:str, fallbacks:Optional[List[str]]=None):
+        self.purpose= purpose
+        self.ttl= ttl
+        self._keys= [self._derive(purpose, key) for key in [secret, *(fallbacks or [])]]
+
+    @staticmethod
+    def _derive(purpose:str, secret:str)-> bytes:
+        return hashlib.sha256(f'{purpose}:{secret}'.encode()).digest()
+
+    @staticmethod
+    def _tag(key:bytes, payload:bytes)-> bytes:
+        return hmac.new(key, payload, hashlib.sha256).digest()[:TAG_SIZE]
+
+    def issue(self, user_id:int, now:Optional[float]=None)-> str:
+        """A fresh token for the user, valid for ttl seconds."""
+        expires_at= int(now if now is not None else time.time())+ self.ttl
+        payload= PAYLOAD.pack(user_id, expires_at, secrets.token_bytes(8))
+        return base64.urlsafe_b64encode(payload+ self._tag(self._keys[0], payload)).rstrip(b'=').decode()
+
+    def validate(self, token:str, now:Optional[float]=None)-> SignedToken:
+        """
+        Checks format, signature and expiry; pure CPU work.
+        :raises TokenInvalid:
+        """
+        try:
+            raw= base64.urlsafe_b64decode(token+ '='* (-len(token)% 4))
+        except (ValueError, TypeError):
+            raise TokenInvalid('malformed')
+        if len(raw)!= TOKEN_SIZE:
+            raise TokenInvalid('malformed')
+        payload, tag= raw[:PAYLOAD.size], raw[PAYLOAD.size:]
+        if not any(hmac.compare_digest(tag, self._tag(key, payload)) for key in self._keys):
+            raise TokenInvalid('bad signature')
+        signed= SignedToken(*PAYLOAD.unpack(payload))
+        if signed.expires_at<= (now if now is not None else time.time()):
+            raise TokenInvalid('expired')
+        return signed
+
+
+class TokenRevocations:
+    """Redis sets of revoked nonces, one per expiry hour, expiring with their tokens."""
+    def __init__(self, client:Redis, prefix:str, async_client:Optional[AsyncRedis]=None):
+        self._client= client
+        self._async_client= async_client
+        self._prefix= prefix
+
+    def _key(self, token:SignedToken)-> str:
+        return f'{self._prefix}:{token.expires_at// REVOCATION_BUCKET_SECONDS}'
+
+    @staticmethod
+    def _expire_at(token:SignedToken)-> int:
+        return (token.expires_at// REVOCATION_BUCKET_SECONDS+ 1)* REVOCATION_BUCKET_SECONDS
+
+    def revoke(self, token:SignedToken)-> bool:
+        """
+        Revokes a validated token in one round trip.
+        :returns: False if it was already revoked, which makes this a single-use check as well.
+        """
+        pipeline= self._client.pipeline(transaction=False)
+        pipeline.sadd(self._key(token), token.nonce)
+        pipeline.expireat(self._key(token), self._expire_at(token))
+        added, _= pipeline.execute()
+        return bool(added)
+
+    def is_revoked(self, token:SignedToken)-> bool:
+        return bool(self._client.sismember(self._key(token), token.nonce))
+
+    async def arevoke(self, token:SignedToken)-> bool:
+        """Async variant of revoke()."""
+        pipeline= self._async_client.pipeline(transaction=False)
+        pipeline.sadd(self._key(token), token.nonce)
+        pipeline.expireat(self._key(token), self._expire_at(token))
+        added, _= await pipeline.execute()
+        return bool(added)
+
+    async def ais_revoked(self, token:SignedToken)-> bool:
+        """Async variant of is_revoked()."""
+        return bool(await self._async_client.sismember(self._key(token), token.nonce))
+
+
+@lru_cache()
+def verification_signer()-> TokenSigner:
+    """Cached signer for email verification tokens (VERIFICATION_TOKEN_TTL seconds, default 24h)."""
+    from django.conf import settings
+    return TokenSigner(
+        'email-verification',
+        int(os.getenv('VERIFICATION_TOKEN_TTL', 86_400)),
+        settings.SECRET_KEY,
+        getattr(settings, 'SECRET_KEY_FALLBACKS', []),
+    )
+
+@lru_cache()
+def verification_revocations()-> TokenRevocations:
+    """Cached revocation store for email verification tokens."""
+    from app_config.settings.redis_registry import redis_registry
+    return TokenRevocations(
+        redis_registry().client(),
+        os.getenv('VERIFICATION_REVOKED_PREFIX', 'auth:verify:revoked'),
+        async_client=redis_registry().async_client(),
+    )
@@ -0,0 +1,100 @@
+"""Performance benchmarks for the auth stack."""
+
+import os
+import json
+from typing import Any, Dict, List, Optional
+
+
+def percentile(samples:List[float], pct:float)-> float:
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered= sorted(samples)
+    index= max(0, min(len(ordered)- 1, int(round(pct/ 100* len(ordered)))- 1))
+    return ordered[index]
+
+def latency_summary(samples:List[float])-> Dict[str, float]:
+    """Summarises latency samples (seconds) as milliseconds."""
+    return {
+        'count':len(samples),
+        'p50_ms':round(percentile(samples, 50)* 1000, 3),
+        'p99_ms':round(percentile(samples, 99)* 1000, 3),
+        'max_ms':round(max(samples, default=0.0)* 1000, 3),
+    }
+
+# Requests turned away by the rate limiter or a saturated hashing pool, not served.
+REJECTED_STATUSES= (429, 503)
+
+def rejected(statuses:Dict[int, int])-> int:
+    """Rejected requests among status code counts; throughput figures leave them out."""
+    return sum(statuses.get(status, 0) for status in REJECTED_STATUSES)
+
+def report(results:Dict[str, Any])-> None:
+    """Prints benchmark results as indented JSON."""
+    print(json.dumps(results, indent=2))
+
+def stand_in_environment(directory:str)-> Dict[str, str]:
+    """
+    Environment replacing Postgres with a SQLite file in directory and Redis with an
+    in-process fakeredis server; pass it to benchmark subprocesses.
+    """
+    path= os.path.join(os.path.abspath(directory), 'benchmark.db')
+    return {
+        'DB_URL':f'sqlite:///{path}',
+        'DB_ASYNC_URL':f'sqlite+aiosqlite:///{path}',
+        'REDIS_FAKE':'true',
+    }
+
+# Units marking a metric as better when lower or higher, matched against whole '_'-separated
+# words of a key ('us_per_request', 'peak_kib'); keys without a known unit are not compared.
+LOWER_IS_BETTER= ('ms', 'us', 'seconds', 'bytes', 'kib', 'round_trips')
+HIGHER_IS_BETTER= ('per_sec', 'per_second')
+
+def _has_unit(words:List[str], unit:str)-> bool:
+    unit_words= unit.split('_')
+    return any(words[index:index+ len(unit_words)]== unit_words for index in range(len(words)))
+
+def metric_direction(path:str)-> Optional[int]:
+    """
+    -1 if lower values of the metric are better, 1 if higher ones are, None if unknown.
+    Looks at the innermost key first, then its parents ('import_ms.p50' is lower-is-better).
+    Rates end in their unit ('requests_per_sec'); anything else per request or row is a cost.
+    Maxima are single samples and too noisy to compare.
+    """
+    keys= path.split('.')
+    if keys[-1].startswith('max'):
+        return None
+    for key in reversed(keys):
+        words= key.split('_')
+        if any(key== unit or key.endswith(f'_{unit}') for unit in HIGHER_IS_BETTER):
+            return 1
+        if any(_has_unit(words, unit) for unit in LOWER_IS_BETTER):
+            return -1
+    return None
+
+def flatten(results:Dict[str, Any], prefix:str='')-> Dict[str, float]:
+    """Numeric leaves of nested results keyed by dotted path."""
+    flat: Dict[str, float]= {}
+    for key, value in results.items():
+        path= f'{prefix}{key}'
+        if isinstance(value, dict):
+            flat.update(flatten(value, f'{path}.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path]= float(value)
+    return flat
+
+def compare(current:Dict[str, Any], baseline:Dict[str, Any], threshold:float)-> List[Dict[str, Any]]:
+    """
+    Metrics present in both results whose change is worse than threshold (0.1 = 10%).
+    :returns: One entry per regression, worst first.
+    """
+    regressions= []
+    now, before= flatten(current), flatten(baseline)
+    for path, old in before.items():
+        direction= metric_direction(path)
+        if direction is None or path not in now or old== 0:
+            continue
+        change= (now[path]- old)/ abs(old)
+        if change* direction< -threshold:
+            regressions.append({'metric':path, 'baseline':old, 'current':now[path], 'change':round(change, 4)})
+    return sorted(regressions, key=lambda regression: -abs(regression['change']))
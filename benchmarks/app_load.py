@@ -0,0 +1,271 @@
+"""
+In-process load generator for the WSGI and ASGI applications.
+Calls Django's WSGIHandler from a thread pool and its ASGIHandler from asyncio tasks,
+through the full middleware stack and URLconf, at each concurrency level of a sweep.
+Scenarios: an invalid verification link (middleware, routing and a 400; no database),
+registration (hash, insert, mail enqueue) and login of a seeded user (lookup, verify,
+session). Each entry runs in its own interpreter, the ASGI one with AUTH_ASYNC_VIEWS=true
+as app_config/asgi.py sets it. No sockets are involved, so this measures the
+application, not a server.
+Uses DB_URL/DB_ASYNC_URL (e.g. sqlite:////tmp/load.db and sqlite+aiosqlite:////tmp/load.db)
+and REDIS_FAKE=true as stand-ins (needs the fakeredis and aiosqlite packages from requirements-dev.txt).
+
+Usage: python -m benchmarks.app_load [--entry wsgi asgi] [--scenario verify_invalid register login] [--requests 300] [--concurrency 1 8 32]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+from benchmarks import latency_summary, rejected, report
+
+PASSWORD= 'app-load-password'
+LOGIN_EMAIL= 'app-load@example.com'
+# Sent as cookie and header, the way a browser client passes CsrfViewMiddleware.
+CSRF_TOKEN= 'b'* 32
+
+Request= Tuple[str, str, str, bytes]
+
+
+def _configure_django()-> None:
+    import django
+    from django.conf import settings
+    from app_config.settings.cache_redis import redis_cache_config
+    if not settings.configured:
+        settings.configure(
+            SECRET_KEY='benchmark',
+            ALLOWED_HOSTS=['*'],
+            ROOT_URLCONF='app_config.urls',
+            # Same stack as BaseConfig.middleware.
+            MIDDLEWARE=[
+                'applications.shared.middleware.metrics.MetricsMiddleware',
+                'django.middleware.security.SecurityMiddleware',
+                'django.contrib.sessions.middleware.SessionMiddleware',
+                'django.middleware.common.CommonMiddleware',
+                'django.middleware.csrf.CsrfViewMiddleware',
+                'applications.shared.middleware.rate_limit.RateLimitMiddleware',
+            ],
+            CACHES=redis_cache_config.cache_settings,
+            DJANGO_REDIS_CONNECTION_FACTORY='app_config.settings.redis_registry.SharedConnectionFactory',
+            SESSION_ENGINE='applications.shared.sessions.two_tier',
+            SESSION_CACHE_ALIAS='default',
+        )
+    django.setup()
+
+def _seed()-> None:
+    from sqlalchemy import update
+    from app_config.settings.database import SessionLocal, create_schema
+    from applications.auth.auth_models import ClientUser
+    from applications.auth.auth_repository import bulk_create_users_if_absent
+    from applications.shared.utils.hashing import hash_password
+
+    create_schema()
+    session= SessionLocal()
+    try:
+        bulk_create_users_if_absent(session, [
+            {'first_name':'App', 'last_name':'Load', 'email':LOGIN_EMAIL, 'password_hash':hash_password(PASSWORD)},
+        ])
+        session.execute(update(ClientUser).where(ClientUser.email== LOGIN_EMAIL).values(verified_at=ClientUser.created_at))
+        session.commit()
+    finally:
+        session.close()
+
+def _verify_invalid()-> Request:
+    return 'GET', '/auth/verify/', 'token=invalid', b''
+
+def _register()-> Request:
+    return 'POST', '/auth/register/', '', json.dumps({
+        'first_name':'App',
+        'last_name':'Load',
+        'email':f'app-load-{uuid.uuid4().hex}@example.com',
+        'password':PASSWORD,
+    }).encode()
+
+def _login()-> Request:
+    return 'POST', '/auth/login/', '', json.dumps({'email':LOGIN_EMAIL, 'password':PASSWORD}).encode()
+
+SCENARIOS: Dict[str, Callable[[], Request]]= {
+    'verify_invalid':_verify_invalid,
+    'register':_register,
+    'login':_login,
+}
+
+
+def _environ(method:str, path:str, query:str, body:bytes)-> Dict[str, Any]:
+    return {
+        'REQUEST_METHOD':method,
+        'PATH_INFO':path,
+        'QUERY_STRING':query,
+        'SERVER_NAME':'benchmark',
+        'SERVER_PORT':'80',
+        'SERVER_PROTOCOL':'HTTP/1.1',
+        'REMOTE_ADDR':'127.0.0.1',
+        'CONTENT_TYPE':'application/json',
+        'CONTENT_LENGTH':str(len(body)),
+        'HTTP_COOKIE':f'csrftoken={CSRF_TOKEN}',
+        'HTTP_X_CSRFTOKEN':CSRF_TOKEN,
+        'wsgi.version':(1, 0),
+        'wsgi.url_scheme':'http',
+        'wsgi.input':io.BytesIO(body),
+        'wsgi.errors':sys.stderr,
+        'wsgi.multithread':True,
+        'wsgi.multiprocess':False,
+        'wsgi.run_once':False,
+    }
+
+def _scope(method:str, path:str, query:str, body:bytes)-> Dict[str, Any]:
+    return {
+        'type':'http',
+        'asgi':{'version':'3.0'},
+        'http_version':'1.1',
+        'method':method,
+        'scheme':'http',
+        'path':path,
+        'raw_path':path.encode(),
+        'query_string':query.encode(),
+        'root_path':'',
+        'headers':[
+            (b'host', b'benchmark'),
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+            (b'cookie', f'csrftoken={CSRF_TOKEN}'.encode()),
+            (b'x-csrftoken', CSRF_TOKEN.encode()),
+        ],
+        'client':('127.0.0.1', 50000),
+        'server':('benchmark', 80),
+    }
+
+def _summary(samples:List[float], statuses:Dict[int, int], elapsed:float)-> Dict[str, Any]:
+    """Latency of every request; throughput counts served requests only, rejections are reported apart."""
+    return dict(
+        latency_summary(samples),
+        requests_per_sec=round((len(samples)- rejected(statuses))/ elapsed, 1),
+        rejected=rejected(statuses),
+        statuses={str(status):count for status, count in sorted(statuses.items())},
+    )
+
+def drive_wsgi(scenario:Callable[[], Request], requests:int, concurrency:int)-> Dict[str, Any]:
+    """Serves requests from `concurrency` threads, like a threaded WSGI worker."""
+    from django.core.handlers.wsgi import WSGIHandler
+    handler= WSGIHandler()
+    statuses: Dict[int, int]= {}
+
+    def one(_)-> float:
+        environ= _environ(*scenario())
+        status= []
+        started= time.perf_counter()
+        response= handler(environ, lambda line, headers, exc_info=None: status.append(line))
+        b''.join(response)
+        response.close()
+        elapsed= time.perf_counter()- started
+        code= int(status[0].split()[0])
+        statuses[code]= statuses.get(code, 0)+ 1
+        return elapsed
+
+    started= time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples= list(executor.map(one, range(requests)))
+    return _summary(samples, statuses, time.perf_counter()- started)
+
+async def drive_asgi(scenario:Callable[[], Request], requests:int, concurrency:int)-> Dict[str, Any]:
+    """Serves requests from `concurrency` concurrent tasks on one event loop, like an ASGI worker."""
+    from django.core.handlers.asgi import ASGIHandler
+    handler= ASGIHandler()
+    semaphore= asyncio.Semaphore(concurrency)
+    statuses: Dict[int, int]= {}
+    samples: List[float]= []
+
+    async def one()-> None:
+        method, path, query, body= scenario()
+        sent= []
+
+        async def receive()-> Dict[str, Any]:
+            if sent:
+                # Only asked for again once the response is complete.
+                await asyncio.Future()
+            sent.append(True)
+            return {'type':'http.request', 'body':body, 'more_body':False}
+
+        messages= []
+        async def send(message:Dict[str, Any])-> None:
+            messages.append(message)
+
+        async with semaphore:
+            started= time.perf_counter()
+            await handler(_scope(method, path, query, body), receive, send)
+            samples.append(time.perf_counter()- started)
+        code= next(message['status'] for message in messages if message['type']== 'http.response.start')
+        statuses[code]= statuses.get(code, 0)+ 1
+
+    started= time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return _summary(samples, statuses, time.perf_counter()- started)
+
+def run_entry(entry:str, scenarios:Sequence[str], requests:int, concurrency:Sequence[int])-> Dict[str, Any]:
+    """Sweeps one entry point in this interpreter; run() calls this in a fresh one per entry."""
+    os.environ.setdefault('RATE_LIMIT_PER_IP', str(requests* len(scenarios)* len(concurrency)* 10))
+    os.environ.setdefault('RATE_LIMIT_PER_EMAIL', str(requests* len(concurrency)* 10))
+    _configure_django()
+    _seed()
+
+    results: Dict[str, Any]= {}
+    for name in scenarios:
+        results[name]= {}
+        for level in concurrency:
+            if entry== 'wsgi':
+                results[name][f'c{level}']= drive_wsgi(SCENARIOS[name], requests, level)
+            else:
+                results[name][f'c{level}']= asyncio.run(drive_asgi(SCENARIOS[name], requests, level))
+    return results
+
+def run(
+    entries:Sequence[str]=('wsgi', 'asgi'),
+    scenarios:Sequence[str]=tuple(SCENARIOS),
+    requests:int=300,
+    concurrency:Sequence[int]=(1, 8, 32),
+)-> Dict[str, Any]:
+    """Requests/sec and latency per entry point, scenario and concurrency level."""
+    results: Dict[str, Any]= {'requests':requests}
+    for entry in entries:
+        command= [
+            sys.executable, '-m', 'benchmarks.app_load', '--child',
+            '--entry', entry,
+            '--scenario', *scenarios,
+            '--requests', str(requests),
+            '--concurrency', *map(str, concurrency),
+        ]
+        output= subprocess.run(
+            command,
+            cwd=Path(__file__).resolve().parent.parent,
+            env=dict(os.environ, AUTH_ASYNC_VIEWS='true' if entry== 'asgi' else 'false'),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip().splitlines()[-1]
+        results[entry]= json.loads(output)
+    return results
+
+def main()-> None:
+    parser= argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--entry', nargs='+', choices=['wsgi', 'asgi'], default=['wsgi', 'asgi'])
+    parser.add_argument('--scenario', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 8, 32])
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args= parser.parse_args()
+    if args.child:
+        print(json.dumps(run_entry(args.entry[0], args.scenario, args.requests, args.concurrency)))
+        return
+    report(run(args.entry, args.scenario, args.requests, args.concurrency))
+
+
+if __name__== '__main__':
+    main()
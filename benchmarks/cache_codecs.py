@@ -0,0 +1,86 @@
+"""
+Cache codec benchmark.
+Encodes representative session and cached user payloads with django_redis'
+default pickle serializer and with each envelope configuration, and reports
+bytes stored plus encode/decode microseconds per entry.
+
+Usage: python -m benchmarks.cache_codecs [--iterations 20000]
+"""
+
+import time
+import argparse
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict
+
+PAYLOADS= {
+    'session':{
+        '_auth_user_id':'184467',
+        '_auth_user_backend':'django.contrib.auth.backends.ModelBackend',
+        '_auth_user_hash':'f1e5c8a2b9d4e7f0a3c6b9d2e5f8a1c4b7d0e3f6a9c2b5d8e1f4a7c0b3d6e9f2',
+        '_session_expiry':120950,
+        'csrf_rotated':True,
+    },
+    'user':{
+        'id':184467,
+        'first_name':'Ada',
+        'last_name':'Lovelace',
+        'email':'ada.lovelace@example.com',
+        'password_hash':'$argon2id$v=19$m=65536,t=3,p=4$c2FsdHNhbHRzYWx0$aGFzaGhhc2hoYXNoaGFzaGhhc2hoYXNo',
+        'created_at':datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc).isoformat(),
+        'deleted_at':None,
+    },
+    'user_list':[{
+        'id':index,
+        'first_name':f'User{index}',
+        'last_name':'Example',
+        'email':f'user{index}@example.com',
+        'created_at':'2024-05-01T12:30:00+00:00',
+    } for index in range(50)],
+}
+
+CONFIGS= {
+    'pickle (current)':None,
+    'msgpack':{'ENVELOPE_SERIALIZER':'msgpack', 'ENVELOPE_COMPRESSOR':'none'},
+    'msgpack+zlib':{'ENVELOPE_SERIALIZER':'msgpack', 'ENVELOPE_COMPRESSOR':'zlib', 'ENVELOPE_COMPRESS_MIN_BYTES':256},
+    'msgpack+lz4':{'ENVELOPE_SERIALIZER':'msgpack', 'ENVELOPE_COMPRESSOR':'lz4', 'ENVELOPE_COMPRESS_MIN_BYTES':256},
+    'orjson':{'ENVELOPE_SERIALIZER':'orjson', 'ENVELOPE_COMPRESSOR':'none'},
+    'orjson+zlib':{'ENVELOPE_SERIALIZER':'orjson', 'ENVELOPE_COMPRESSOR':'zlib', 'ENVELOPE_COMPRESS_MIN_BYTES':256},
+}
+
+
+def _per_entry_us(function:Callable[[], Any], iterations:int)-> float:
+    started= time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return round((time.perf_counter()- started)/ iterations* 1_000_000, 2)
+
+def run(iterations:int=20_000)-> Dict[str, Any]:
+    """Bytes and encode/decode cost per payload and codec configuration."""
+    from django_redis.serializers.pickle import PickleSerializer
+    from applications.shared.utils.codecs import EnvelopeSerializer
+
+    results: Dict[str, Any]= {'iterations':iterations}
+    for payload_name, payload in PAYLOADS.items():
+        rows= {}
+        for config_name, options in CONFIGS.items():
+            serializer= PickleSerializer({}) if options is None else EnvelopeSerializer(options)
+            encoded= serializer.dumps(payload)
+            assert serializer.loads(encoded)== payload
+            rows[config_name]= {
+                'bytes':len(encoded),
+                'encode_us':_per_entry_us(lambda: serializer.dumps(payload), iterations),
+                'decode_us':_per_entry_us(lambda: serializer.loads(encoded), iterations),
+            }
+        results[payload_name]= rows
+    return results
+
+def main()-> None:
+    parser= argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--iterations', type=int, default=20_000)
+    args= parser.parse_args()
+    from benchmarks import report
+    report(run(args.iterations))
+
+
+if __name__== '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Registration saturation benchmark.
+Simulates a threaded WSGI worker serving a burst of sign-ups alongside a cheap
+non-auth route, with hashing inline vs. on the bounded hashing pool, and reports
+the p99 latency of the non-auth route in both modes.
+
+Usage: python -m benchmarks.hashing_offload [--threads 8] [--duration 5]
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+from benchmarks import latency_summary, report
+from applications.shared.utils.hashing import (
+    hash_password,
+    hash_password_pooled,
+    hashing_pool,
+    HashingPoolSaturated,
+)
+
+
+def _register_inline()-> int:
+    hash_password('benchmark-password')
+    return 201
+
+def _register_pooled()-> int:
+    try:
+        hash_password_pooled('benchmark-password')
+        return 201
+    except HashingPoolSaturated:
+        return 503
+
+def _health()-> int:
+    json.dumps({'status':'ok', 'time':time.time()})
+    return 200
+
+def _run_mode(register:Callable[[], int], threads:int, duration:float, signup_rate:int)-> Dict[str, Any]:
+    """Drives signups and health checks through a fixed-size request thread pool."""
+    health_latencies= []
+    statuses= {}
+
+    def timed(handler:Callable[[], int], enqueued:float, record:bool)-> None:
+        status= handler()
+        if record:
+            health_latencies.append(time.perf_counter()- enqueued)
+        statuses[status]= statuses.get(status, 0)+ 1
+
+    with ThreadPoolExecutor(max_workers=threads) as server:
+        deadline= time.perf_counter()+ duration
+        while time.perf_counter()< deadline:
+            for _ in range(signup_rate):
+                server.submit(timed, register, time.perf_counter(), False)
+            server.submit(timed, _health, time.perf_counter(), True)
+            time.sleep(0.01)
+
+    return {
+        'health':latency_summary(health_latencies),
+        'statuses':statuses,
+    }
+
+def run(threads:int=8, duration:float=5.0, signup_rate:int=1)-> Dict[str, Any]:
+    """Runs the baseline, inline and pooled scenarios."""
+    hashing_pool().submit(hash_password, 'warm-up').result()
+    results= {
+        'idle':_run_mode(lambda: 200, threads, duration, 0),
+        'inline':_run_mode(_register_inline, threads, duration, signup_rate),
+        'pooled':_run_mode(_register_pooled, threads, duration, signup_rate),
+    }
+    hashing_pool().shutdown()
+    return results
+
+def main()-> None:
+    parser= argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--signup-rate', type=int, default=1, help='Sign-ups submitted per 10 ms tick.')
+    args= parser.parse_args()
+    report(run(args.threads, args.duration, args.signup_rate))
+
+
+if __name__== '__main__':
+    main()
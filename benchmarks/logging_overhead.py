@@ -0,0 +1,77 @@
+"""
+Logging overhead benchmark.
+Simulates request threads each emitting the log calls of a registration
+(two INFO records and one WARNING) with the synchronous file handlers and with
+the queued JSON setup, and reports the time spent inside log calls per request
+(p50/p99) plus how long the queued listener needed to drain afterwards.
+
+Usage: python -m benchmarks.logging_overhead [--threads 8] [--requests 2000]
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+from benchmarks import latency_summary, report
+
+
+def _request(logger:logging.Logger, index:int)-> float:
+    started= time.perf_counter()
+    logger.info('Registration request received', extra={'request_id':index})
+    logger.warning('Hashing pool at %d%% capacity', 80)
+    logger.info(f'Registration successful! User: Load Test {index}')
+    return time.perf_counter()- started
+
+def _measure(queued:bool, threads:int, requests:int)-> Dict[str, Any]:
+    os.environ['LOG_QUEUE']= 'true' if queued else 'false'
+    from app_config.settings.logger import LoggingConfiguration
+
+    root= logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    with tempfile.TemporaryDirectory() as base_dir:
+        configuration= LoggingConfiguration(base_dir)
+        configuration.configure_logging()
+        logger= logging.getLogger('django')
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            samples= list(executor.map(lambda index: _request(logger, index), range(requests)))
+        started= time.perf_counter()
+        configuration.stop_listener()
+        drain_seconds= time.perf_counter()- started
+        for handler in list(root.handlers)+ configuration._handlers:
+            root.removeHandler(handler)
+            handler.close()
+    result= latency_summary(samples)
+    if queued:
+        result['listener_drain_ms']= round(drain_seconds* 1000, 3)
+    return result
+
+def run(threads:int=8, requests:int=2000)-> Dict[str, Any]:
+    """Per-request log-call cost with synchronous and queued handlers."""
+    # The console handler binds sys.stderr when configured; keep benchmark output readable.
+    stderr, sys.stderr= sys.stderr, open(os.devnull, 'w')
+    try:
+        return {
+            'threads':threads,
+            'requests':requests,
+            'sync_handlers':_measure(False, threads, requests),
+            'queued_json':_measure(True, threads, requests),
+        }
+    finally:
+        sys.stderr.close()
+        sys.stderr= stderr
+
+def main()-> None:
+    parser= argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=2000)
+    args= parser.parse_args()
+    report(run(args.threads, args.requests))
+
+
+if __name__== '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Login load test with a cold and a warm user lookup cache.
+Seeds verified users, then drives the sync login view through SessionMiddleware
+from a thread pool (default: as many threads as the hashing pool admits, so
+no login is shed with a 503). Cold runs clear the user cache before every login; warm runs
+prime it first. Also compares the latency of a wrong password for a known email
+with that of an unknown email, which should be indistinguishable.
+Uses DB_URL (e.g. sqlite:////tmp/login.db) and REDIS_FAKE=true as stand-ins.
+
+Usage: DB_URL=sqlite:////tmp/login.db REDIS_FAKE=true python -m benchmarks.login_load [--users 200] [--logins 400] [--threads N]
+"""
+
+import os
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from benchmarks import latency_summary, report
+
+PASSWORD= 'login-load-password'
+
+
+def _configure_django()-> None:
+    import django
+    from django.conf import settings
+    from app_config.settings.cache_redis import redis_cache_config
+    if not settings.configured:
+        settings.configure(
+            SECRET_KEY='benchmark',
+            ALLOWED_HOSTS=['*'],
+            CACHES=redis_cache_config.cache_settings,
+            DJANGO_REDIS_CONNECTION_FACTORY='app_config.settings.redis_registry.SharedConnectionFactory',
+            SESSION_ENGINE='applications.shared.sessions.two_tier',
+            SESSION_CACHE_ALIAS='default',
+        )
+    django.setup()
+
+def _seed(users:int)-> List[str]:
+    from sqlalchemy import update
+    from app_config.settings.database import SessionLocal, create_schema
+    from applications.auth.auth_models import ClientUser
+    from applications.auth.auth_repository import bulk_create_users_if_absent
+    from applications.shared.utils.hashing import hash_password
+
+    create_schema()
+    password_hash= hash_password(PASSWORD)
+    emails= [f'login-{index}@example.com' for index in range(users)]
+    session= SessionLocal()
+    try:
+        bulk_create_users_if_absent(session, [
+            {'first_name':'Login', 'last_name':'Load', 'email':email, 'password_hash':password_hash} for email in emails
+        ])
+        session.execute(update(ClientUser).values(verified_at=ClientUser.created_at))
+        session.commit()
+    finally:
+        session.close()
+    return emails
+
+def _login(view:Callable, email:str, password:str)-> Tuple[float, int]:
+    from django.test import RequestFactory
+    request= RequestFactory().post('/auth/login/', data=json.dumps({'email':email, 'password':password}), content_type='application/json')
+    started= time.perf_counter()
+    response= view(request)
+    elapsed= time.perf_counter()- started
+    if response.status_code not in (200, 401, 503):
+        raise RuntimeError(f'Unexpected login status {response.status_code}: {response.content!r}')
+    return elapsed, response.status_code
+
+def _drive(view:Callable, emails:List[str], logins:int, threads:int, before:Callable[[str], None])-> Dict[str, Any]:
+    def one(index:int)-> Tuple[float, int]:
+        email= emails[index% len(emails)]
+        before(email)
+        return _login(view, email, PASSWORD)
+
+    started= time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results= list(executor.map(one, range(logins)))
+    elapsed= time.perf_counter()- started
+    shed= sum(1 for _, status in results if status== 503)
+    return dict(
+        latency_summary([sample for sample, _ in results]),
+        logins_per_sec=round((logins- shed)/ elapsed, 1),
+        rejected=shed,
+    )
+
+def run(users:int=200, logins:int=400, threads:Optional[int]=None)-> Dict[str, Any]:
+    """Logins/sec with a cold and a warm user cache, plus the failure-path timing comparison."""
+    os.environ.setdefault('RATE_LIMIT_PER_EMAIL', str(logins* 10))
+    _configure_django()
+    from django.contrib.sessions.middleware import SessionMiddleware
+    from applications.auth.auth_cache import user_lookup_cache
+    from applications.auth.auth_views import login
+    from applications.shared.utils.hashing import hashing_pool
+
+    threads= threads or hashing_pool().capacity
+
+    emails= _seed(users)
+    view= SessionMiddleware(login)
+
+    cold= _drive(view, emails, logins, threads, lambda email: user_lookup_cache.invalidate(email))
+    for email in emails:
+        _login(view, email, PASSWORD)
+    warm= _drive(view, emails, logins, threads, lambda email: None)
+
+    wrong_password= [_login(view, email, 'wrong-password')[0] for email in emails[:50]]
+    unknown_email= [_login(view, f'nobody-{index}@example.com', PASSWORD)[0] for index in range(50)]
+    return {
+        'users':users,
+        'logins':logins,
+        'threads':threads,
+        'cold_cache':cold,
+        'warm_cache':warm,
+        'failure_timing':{
+            'wrong_password':latency_summary(wrong_password),
+            'unknown_email':latency_summary(unknown_email),
+        },
+    }
+
+def main()-> None:
+    parser= argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--logins', type=int, default=400)
+    parser.add_argument('--threads', type=int, help='Defaults to the hashing pool capacity.')
+    args= parser.parse_args()
+    report(run(args.users, args.logins, args.threads))
+
+
+if __name__== '__main__':
+    main()
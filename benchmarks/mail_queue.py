@@ -0,0 +1,137 @@
+"""
+Verification mail queue benchmark.
+Starts a local debugging SMTP sink, then compares sending a verification mail
+inline (what a request would pay without the queue) with enqueueing it, and
+drains the queue with the batching worker. Reports enqueue p50/p99, inline send
+p50/p99, worker mails/sec and SMTP connections opened. Uses the configured Redis,
+or an in-process fakeredis server with REDIS_FAKE=true.
+
+Usage: REDIS_FAKE=true python -m benchmarks.mail_queue [--mails 2000] [--batch-size 50]
+"""
+
+import time
+import argparse
+import threading
+import socketserver
+from typing import Any, Dict
+from benchmarks import latency_summary, report
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """Minimal SMTP server accepting and discarding every message."""
+    daemon_threads= True
+    allow_reuse_address= True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), SMTPSinkHandler)
+        self.connections= 0
+        self.messages= 0
+        self.lock= threading.Lock()
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    def reply(self, line:str)-> None:
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        with self.server.lock:
+            self.server.connections+= 1
+        self.reply('220 sink ready')
+        while True:
+            line= self.rfile.readline()
+            if not line:
+                return
+            command= line.decode(errors='replace').strip().upper()
+            if command.startswith('EHLO'):
+                self.reply('250 sink')
+            elif command== 'DATA':
+                self.reply('354 end with .')
+                while self.rfile.readline() not in (b'.\r\n', b''):
+                    pass
+                with self.server.lock:
+                    self.server.messages+= 1
+                self.reply('250 queued')
+            elif command== 'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('250 ok')
+
+
+def _configure_django(port:int)-> None:
+    import django
+    from django.conf import settings
+    if not settings.configured:
+        settings.configure(
+            SECRET_KEY='benchmark',
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=port,
+            DEFAULT_FROM_EMAIL='no-reply@localhost',
+        )
+    django.setup()
+
+def run(mails:int=2000, batch_size:int=50, inline:int=200)-> Dict[str, Any]:
+    """Enqueue vs inline send latency and worker drain rate."""
+    sink= SMTPSink()
+    threading.Thread(target=sink.serve_forever, daemon=True).start()
+    _configure_django(sink.server_address[1])
+    from django.core.mail import get_connection
+    from applications.shared.utils.mail_queue import MailSender, mail_queue, verification_message
+    from applications.shared.utils.tokens import verification_signer
+
+    context= {'first_name':'Ada', 'token':verification_signer().issue(1)}
+
+    inline_samples= []
+    for index in range(inline):
+        started= time.perf_counter()
+        message= verification_message({'context':context})
+        message.to= [f'user{index}@example.com']
+        get_connection().send_messages([message])
+        inline_samples.append(time.perf_counter()- started)
+    connections_before= sink.connections
+
+    queue= mail_queue()
+    enqueue_samples= []
+    for index in range(mails):
+        started= time.perf_counter()
+        queue.enqueue('verification', f'user{index}@example.com', context)
+        enqueue_samples.append(time.perf_counter()- started)
+
+    sender= MailSender(idle_timeout=30)
+    started= time.perf_counter()
+    delivered= 0
+    while True:
+        jobs= queue.take('benchmark', batch_size, timeout=0.1)
+        if not jobs:
+            break
+        sent, failed= sender.send_batch(jobs)
+        queue.settle('benchmark', sent, failed)
+        delivered+= len(sent)
+    drain_seconds= time.perf_counter()- started
+    sender.close()
+    sink.shutdown()
+
+    return {
+        'inline_send':latency_summary(inline_samples),
+        'enqueue':latency_summary(enqueue_samples),
+        'worker':{
+            'mails':delivered,
+            'batch_size':batch_size,
+            'mails_per_second':round(delivered/ drain_seconds) if drain_seconds else None,
+            'smtp_connections':sink.connections- connections_before,
+            'queue':queue.stats(),
+        },
+    }
+
+def main()-> None:
+    parser= argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--mails', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--inline', type=int, default=200, help='Mails sent inline for the baseline.')
+    args= parser.parse_args()
+    report(run(args.mails, args.batch_size, args.inline))
+
+
+if __name__== '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Micro-benchmarks of the per-request building blocks.
+Password hash and verify at the configured Argon2 cost (argon2_params.json or library
+defaults), JSON parsing of a registration body (bare json.loads and the view's field
+parsing), and ORM insert and select on the configured database.
+Uses DB_URL (e.g. sqlite:////tmp/micro.db) as a stand-in for Postgres.
+
+Usage: DB_URL=sqlite:////tmp/micro.db python -m benchmarks.micro [--hashes 20] [--parses 20000] [--rows 500]
+"""
+
+import json
+import time
+import uuid
+import argparse
+from typing import Any, Callable, Dict, List
+from benchmarks import latency_summary, report
+
+
+def _configure_django()-> None:
+    import django
+    from django.conf import settings
+    if not settings.configured:
+        settings.configure(SECRET_KEY='benchmark', ALLOWED_HOSTS=['*'])
+    django.setup()
+
+def _timed(operation:Callable[[int], Any], count:int)-> List[float]:
+    samples= []
+    for index in range(count):
+        started= time.perf_counter()
+        operation(index)
+        samples.append(time.perf_counter()- started)
+    return samples
+
+def _per_op(samples:List[float])-> Dict[str, float]:
+    """Per-operation cost in microseconds, for operations too fast for millisecond percentiles."""
+    return {
+        'count':len(samples),
+        'mean_us':round(sum(samples)/ len(samples)* 1e6, 3),
+        'ops_per_sec':round(len(samples)/ sum(samples), 1),
+    }
+
+def _body()-> bytes:
+    return json.dumps({
+        'first_name':'Micro',
+        'last_name':'Bench',
+        'email':f'micro-{uuid.uuid4().hex}@example.com',
+        'password':'micro-bench-password',
+    }).encode()
+
+def bench_hashing(hashes:int)-> Dict[str, Any]:
+    from applications.shared.utils import hashing
+    hashing.init_password_hasher('never')
+    hashed= hashing.hash_password('micro-bench-password')
+    hasher= hashing.password_hasher
+    return {
+        'params':{'time_cost':hasher.time_cost, 'memory_cost':hasher.memory_cost, 'parallelism':hasher.parallelism},
+        'hash':latency_summary(_timed(lambda _: hashing.hash_password('micro-bench-password'), hashes)),
+        'verify':latency_summary(_timed(lambda _: hashing.verify_password('micro-bench-password', hashed), hashes)),
+    }
+
+def bench_json(parses:int)-> Dict[str, Any]:
+    from django.test import RequestFactory
+    from applications.auth.auth_requests import registration_fields
+    body= _body()
+    factory= RequestFactory()
+    requests= [factory.post('/auth/register/', data=body, content_type='application/json') for _ in range(parses)]
+    return {
+        'json_loads':_per_op(_timed(lambda _: json.loads(body), parses)),
+        'registration_fields':_per_op(_timed(lambda index: registration_fields(requests[index]), parses)),
+    }
+
+def bench_orm(rows:int)-> Dict[str, Any]:
+    from app_config.settings.database import SessionLocal, create_schema
+    from applications.auth.auth_repository import create_user_if_absent, find_user_by_email
+
+    create_schema()
+    run_id= uuid.uuid4().hex[:8]
+    emails= [f'micro-{run_id}-{index}@example.com' for index in range(rows)]
+    session= SessionLocal()
+    try:
+        insert= _timed(lambda index: create_user_if_absent(session, 'Micro', 'Bench', emails[index], 'not-a-hash'), rows)
+        select= _timed(lambda index: find_user_by_email(session, emails[index]), rows)
+    finally:
+        session.close()
+    return {
+        'dialect':session.get_bind().dialect.name,
+        'insert':dict(latency_summary(insert), rows_per_sec=round(rows/ sum(insert), 1)),
+        'select':dict(latency_summary(select), rows_per_sec=round(rows/ sum(select), 1)),
+    }
+
+def run(hashes:int=20, parses:int=20_000, rows:int=500)-> Dict[str, Any]:
+    """Runs the hashing, JSON and ORM micro-benchmarks."""
+    _configure_django()
+    return {
+        'hashing':bench_hashing(hashes),
+        'json':bench_json(parses),
+        'orm':bench_orm(rows),
+    }
+
+def main()-> None:
+    parser= argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--hashes', type=int, default=20)
+    parser.add_argument('--parses', type=int, default=20_000)
+    parser.add_argument('--rows', type=int, default=500)
+    args= parser.parse_args()
+    report(run(args.hashes, args.parses, args.rows))
+
+
+if __name__== '__main__':
+    main()
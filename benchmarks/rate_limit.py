@@ -0,0 +1,88 @@
+"""
+Rate limiter overhead benchmark.
+Drives requests through RateLimitMiddleware and the view's own limiter call, as the
+Django handler does (process_view, then the view), and reports microseconds per request
+and Redis round trips per request (connection checkouts from the shared pool):
+for auth POSTs, whose per-IP and per-email limits share one call, for other limited
+auth requests, and for unlimited paths. Uses the configured Redis, or an in-process
+fakeredis server with REDIS_FAKE=true.
+
+Usage: REDIS_FAKE=true python -m benchmarks.rate_limit [--requests 5000]
+"""
+
+import os
+import time
+import argparse
+from typing import Any, Dict
+
+
+def _configure_django()-> None:
+    import django
+    from django.conf import settings
+    if not settings.configured:
+        settings.configure(DEFAULT_CHARSET='utf-8', ALLOWED_HOSTS=['*'])
+    django.setup()
+
+def run(requests:int=5000)-> Dict[str, Any]:
+    """Measures rate limiting cost on auth POSTs, other limited requests and unlimited paths."""
+    os.environ.setdefault('RATE_LIMIT_PER_IP', str(requests* 10))
+    os.environ.setdefault('RATE_LIMIT_PER_EMAIL', str(requests* 10))
+    _configure_django()
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+    from app_config.settings.redis_registry import redis_registry
+    from applications.shared.middleware.rate_limit import RateLimitMiddleware, defers_rate_limit, rate_limiter
+
+    pool= redis_registry().sync_pool()
+    checkouts= {'count':0}
+    get_connection= pool.get_connection
+
+    def counting_get_connection(*args, **kwargs):
+        checkouts['count']+= 1
+        return get_connection(*args, **kwargs)
+
+    pool.get_connection= counting_get_connection
+    @defers_rate_limit
+    def auth_view(request):
+        # What register and login do once the body is parsed.
+        if rate_limiter().hit_email(request, 'user@example.com'):
+            return HttpResponse(status=429)
+        return HttpResponse('ok')
+
+    def view(request):
+        return HttpResponse('ok')
+
+    def handle(request, view_func):
+        return middleware.process_view(request, view_func, (), {}) or middleware(request)
+
+    factory= RequestFactory()
+    results= {}
+    for name, method, path, view_func in (
+        ('auth_post', 'post', '/auth/register/', auth_view),
+        ('auth_get', 'get', '/auth/verify/', view),
+        ('other_path', 'post', '/health/', view),
+    ):
+        middleware= RateLimitMiddleware(view_func)
+        prepared= [getattr(factory, method)(path) for _ in range(requests)]
+        checkouts['count']= 0
+        started= time.perf_counter()
+        for request in prepared:
+            handle(request, view_func)
+        elapsed= time.perf_counter()- started
+        results[name]= {
+            'us_per_request':round(elapsed/ requests* 1_000_000, 2),
+            'redis_round_trips_per_request':round(checkouts['count']/ requests, 3),
+        }
+    pool.get_connection= get_connection
+    return results
+
+def main()-> None:
+    from benchmarks import report
+    parser= argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=5000)
+    args= parser.parse_args()
+    report(run(args.requests))
+
+
+if __name__== '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Loading users as ORM instances vs. slotted read models.
+Seeds client_user up to --users rows, then loads all of them as tracked ClientUser
+instances, as ClientUserRow read models through applications.shared.queries, as bare
+Core rows, and streamed as read models. Reports rows/sec and the memory retained per
+loaded object (peak memory per row for the stream, which keeps only one batch alive).
+Uses DB_URL (e.g. sqlite:////tmp/read.db) as a stand-in for Postgres.
+
+Usage: DB_URL=sqlite:////tmp/read.db python -m benchmarks.read_models [--users 100000] [--batch-size 1000]
+"""
+
+import gc
+import time
+import argparse
+import tracemalloc
+from typing import Any, Callable, Dict
+from benchmarks import report
+
+
+def _seed(session_factory, users:int)-> None:
+    from sqlalchemy import func, insert, select
+    from applications.auth.auth_models import ClientUser
+
+    session= session_factory()
+    try:
+        existing= session.execute(select(func.count()).select_from(ClientUser)).scalar_one()
+        for start in range(existing, users, 10_000):
+            session.execute(insert(ClientUser), [
+                {'first_name':'Read', 'last_name':f'Model{index}', 'email':f'read-{index}@example.com', 'password_hash':'x'* 97}
+                for index in range(start, min(users, start+ 10_000))
+            ])
+            session.commit()
+    finally:
+        session.close()
+
+def _measure(session_factory, load:Callable[[Any], Any], rows:int)-> Dict[str, Any]:
+    """Times a load, then repeats it under tracemalloc for the memory it keeps alive."""
+    session= session_factory()
+    try:
+        started= time.perf_counter()
+        loaded= load(session)
+        elapsed= time.perf_counter()- started
+        count= len(loaded) if isinstance(loaded, list) else loaded
+    finally:
+        session.close()
+    del loaded
+    gc.collect()
+
+    session= session_factory()
+    try:
+        tracemalloc.start()
+        baseline, _= tracemalloc.get_traced_memory()
+        loaded= load(session)
+        retained, peak= tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        session.close()
+    del loaded
+    gc.collect()
+    return {
+        'rows':count,
+        'rows_per_sec':round(count/ elapsed),
+        'retained_bytes_per_row':round((retained- baseline)/ max(rows, 1)),
+        'peak_bytes_per_row':round((peak- baseline)/ max(rows, 1)),
+    }
+
+def run(users:int=100_000, batch_size:int=1000)-> Dict[str, Any]:
+    """rows/sec and memory per object for each way of loading the table."""
+    from sqlalchemy import select
+    from app_config.settings.database import SessionLocal, create_schema
+    from applications.auth.auth_models import ClientUser, ClientUserRow
+    from applications.shared.queries import all_rows, columns_of, select_rows, stream
+
+    create_schema()
+    _seed(SessionLocal, users)
+    statement= select_rows(ClientUser, ClientUserRow).limit(users)
+
+    def stream_count(session)-> int:
+        # Nothing is kept: the count is all that survives each batch.
+        return sum(1 for _ in stream(session, statement, ClientUserRow, batch_size))
+
+    return {
+        'users':users,
+        'orm_instances':_measure(SessionLocal, lambda session: session.execute(select(ClientUser).limit(users)).scalars().all(), users),
+        'read_models':_measure(SessionLocal, lambda session: all_rows(session, statement, ClientUserRow), users),
+        'core_rows':_measure(SessionLocal, lambda session: session.execute(select(*columns_of(ClientUser, ClientUserRow)).limit(users)).all(), users),
+        'read_models_streamed':_measure(SessionLocal, stream_count, users),
+    }
+
+def main()-> None:
+    parser= argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args= parser.parse_args()
+    report(run(args.users, args.batch_size))
+
+
+if __name__== '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Registration load test: sync view vs. async-native view under ASGI.
+The sync view is driven through sync_to_async exactly as Django's ASGI handler
+runs it; the async view is awaited directly. Reports requests/sec and traced
+memory per in-flight connection for each concurrency level.
+Requires the configured database (DB_* environment variables).
+
+Usage: python -m benchmarks.register_load [--requests 200] [--concurrency 1 10 50]
+"""
+
+import os
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import tracemalloc
+from typing import Any, Dict, List
+from benchmarks import rejected
+
+
+def _payload()-> bytes:
+    return json.dumps({
+        'first_name':'Load',
+        'last_name':'Test',
+        'email':f'load-{uuid.uuid4().hex}@example.com',
+        'password':'load-test-password',
+    }).encode()
+
+async def _drive(view, requests:int, concurrency:int)-> Dict[str, Any]:
+    from django.test import RequestFactory
+    factory= RequestFactory()
+    semaphore= asyncio.Semaphore(concurrency)
+    statuses= {}
+
+    async def one()-> None:
+        async with semaphore:
+            request= factory.post('/auth/register/', data=_payload(), content_type='application/json')
+            response= await view(request)
+            statuses[response.status_code]= statuses.get(response.status_code, 0)+ 1
+
+    tracemalloc.start()
+    started= time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed= time.perf_counter()- started
+    _, peak= tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'requests_per_sec':round((requests- rejected(statuses))/ elapsed, 1),
+        'rejected':rejected(statuses),
+        'peak_kib_per_connection':round(peak/ 1024/ concurrency, 1),
+        'statuses':statuses,
+    }
+
+def run(requests:int=200, concurrency:List[int]=(1, 10, 50))-> Dict[str, Any]:
+    """Sweeps concurrency levels for both registration paths."""
+    import django
+    from asgiref.sync import sync_to_async
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app_config.deployment')
+    django.setup()
+    from applications.auth.auth_views import register, register_async
+
+    sync_view= sync_to_async(register, thread_sensitive=True)
+
+    async def sweep()-> Dict[str, Any]:
+        results= {}
+        for level in concurrency:
+            results[f'c{level}']= {
+                'sync':await _drive(sync_view, requests, level),
+                'async':await _drive(register_async, requests, level),
+            }
+        return results
+
+    # One event loop for the whole sweep: asyncpg connections are bound to their loop.
+    return asyncio.run(sweep())
+
+def main()-> None:
+    from benchmarks import report
+    parser= argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50])
+    args= parser.parse_args()
+    report(run(args.requests, args.concurrency))
+
+
+if __name__== '__main__':
+    main()
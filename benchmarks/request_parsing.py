@@ -0,0 +1,122 @@
+"""
+Auth request parsing and response building: previous stdlib path vs. the shared parsing layer.
+The previous path is json.loads(request.body) with ad-hoc checks and a JsonResponse;
+the current one is applications.auth.auth_requests with fastjson (orjson when installed)
+and FastJsonResponse. Reports µs per request and the peak memory allocated while
+handling one, for a valid registration, an invalid payload and a 1 MiB body (which the
+previous path read in full).
+
+Usage: python -m benchmarks.request_parsing [--requests 20000]
+"""
+
+import json
+import time
+import argparse
+import tracemalloc
+from typing import Any, Callable, Dict, List
+from benchmarks import report
+
+VALID= json.dumps({
+    'first_name':'Parse',
+    'last_name':'Bench',
+    'email':'Parse.Bench@Example.com',
+    'password':'parse-bench-password',
+}).encode()
+INVALID= json.dumps({'first_name':'Parse', 'email':['not', 'a', 'string']}).encode()
+OVERSIZED= json.dumps({'first_name':'x'* (1 << 20)}).encode()
+
+
+def _configure_django()-> None:
+    import django
+    from django.conf import settings
+    if not settings.configured:
+        settings.configure(SECRET_KEY='benchmark', ALLOWED_HOSTS=['*'], DATA_UPLOAD_MAX_MEMORY_SIZE=None)
+    django.setup()
+
+def previous_path(request):
+    """Registration parsing and 201 response as the views did them before auth_requests."""
+    from django.http import JsonResponse
+    from applications.shared.utils.email import normalize_email
+    if request.method!= 'POST':
+        return JsonResponse({'error':'Invalid request method!'}, status=405)
+    try:
+        data= json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'error':'Invalid JSON!'}, status=400)
+    fields= {
+        'first_name':data.get('first_name'),
+        'last_name':data.get('last_name'),
+        'email':data.get('email'),
+        'password':data.get('password'),
+    }
+    if not all(isinstance(value, str) and value.strip() for value in fields.values()):
+        return JsonResponse({'error':'Some required fields are empty!'}, status=400)
+    fields['email']= fields['email'].strip()
+    fields['normalized_email']= normalize_email(fields['email'])
+    return JsonResponse({
+        'message':f'Registration successful! New user: {fields["first_name"]} {fields["last_name"]}',
+        'id':1,
+    }, status=201)
+
+def current_path(request):
+    """The same through the shared parsing layer."""
+    from applications.auth.auth_requests import registration_fields
+    from applications.auth.auth_views import _created_response
+    fields, error= registration_fields(request)
+    if error:
+        return error
+    return _created_response(1, fields)
+
+def _measure(handler:Callable, body:bytes, requests:int)-> Dict[str, Any]:
+    from django.test import RequestFactory
+    factory= RequestFactory()
+    build= lambda: factory.post('/auth/register/', data=body, content_type='application/json')
+    status= handler(build()).status_code
+
+    prepared: List= [build() for _ in range(requests)]
+    started= time.perf_counter()
+    for request in prepared:
+        handler(request)
+    elapsed= time.perf_counter()- started
+
+    # Peak allocation of a single request, averaged; requests are built outside the traced window.
+    prepared= [build() for _ in range(min(requests, 500))]
+    peaks= 0
+    tracemalloc.start()
+    for request in prepared:
+        tracemalloc.reset_peak()
+        baseline, _= tracemalloc.get_traced_memory()
+        handler(request)
+        peaks+= tracemalloc.get_traced_memory()[1]- baseline
+    tracemalloc.stop()
+    return {
+        'status':status,
+        'us_per_request':round(elapsed/ requests* 1e6, 2),
+        'peak_bytes_per_request':round(peaks/ len(prepared)),
+    }
+
+def run(requests:int=20_000)-> Dict[str, Any]:
+    """Both paths on valid, invalid and oversized bodies."""
+    import logging
+    _configure_django()
+    from applications.shared.utils import fastjson
+    # Rejections are logged; keep handler output out of the timings.
+    logging.getLogger('django').setLevel(logging.ERROR)
+
+    results: Dict[str, Any]= {'json_backend':'orjson' if fastjson.orjson is not None else 'json', 'requests':requests}
+    for name, body, count in (('valid', VALID, requests), ('invalid', INVALID, requests), ('oversized', OVERSIZED, max(1, requests// 100))):
+        results[name]= {
+            'previous':_measure(previous_path, body, count),
+            'current':_measure(current_path, body, count),
+        }
+    return results
+
+def main()-> None:
+    parser= argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=20_000)
+    args= parser.parse_args()
+    report(run(args.requests))
+
+
+if __name__== '__main__':
+    main()
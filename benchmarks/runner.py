@@ -0,0 +1,148 @@
+"""
+Runs benchmark suites and compares their results between commits.
+Each suite runs in a fresh interpreter (so Django settings, metrics hooks and connection
+pools never leak between suites) and the combined results are written as JSON together
+with the commit they were measured on. Comparing against a baseline file lists every
+latency, size or throughput metric that got worse by more than the threshold.
+Also available as `python manage.py benchmark`.
+
+Usage: python -m benchmarks.runner [--suite micro app_load] [--stand-ins] [--output results.json] [--compare baseline.json] [--threshold 0.1]
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+from benchmarks import compare, stand_in_environment
+
+ROOT= Path(__file__).resolve().parent.parent
+
+# Suite name -> run() arguments. Sizes are chosen so that the default suites finish in a few minutes.
+SUITES: Dict[str, Dict[str, Any]]= {
+    'micro':{},
+    'app_load':{'requests':200, 'concurrency':[1, 8, 32]},
+    'request_parsing':{'requests':10_000},
+    'read_models':{'users':100_000},
+    'user_listing':{'users':100_000},
+    'tokens':{'tokens':50_000},
+    'cache_codecs':{'iterations':5000},
+    'session_load':{'sessions':1000, 'loads':10_000},
+    'rate_limit':{'requests':2000},
+    'logging_overhead':{'requests':1000},
+    'login_load':{'users':100, 'logins':200},
+    'mail_queue':{'mails':500},
+    # These need the deployment settings and a real Postgres.
+    'startup':{'runs':3},
+    'register_load':{'requests':100},
+    'hashing_offload':{'duration':3.0},
+}
+DEFAULT_SUITES= ('micro', 'app_load', 'request_parsing', 'read_models', 'user_listing', 'tokens', 'cache_codecs', 'session_load', 'rate_limit', 'logging_overhead')
+
+CHILD= """
+import json, sys
+from benchmarks.{suite} import run
+results= run(**json.loads(sys.argv[1]))
+print(json.dumps(results))
+"""
+
+
+def git_revision()-> Dict[str, Any]:
+    """Commit the working tree is on and whether it has uncommitted changes."""
+    def git(*args:str)-> Optional[str]:
+        try:
+            return subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    status= git('status', '--porcelain', '--untracked-files=no')
+    return {'commit':git('rev-parse', 'HEAD'), 'dirty':bool(status) if status is not None else None}
+
+def run_suite(suite:str, env:Dict[str, str])-> Dict[str, Any]:
+    """
+    Runs one suite in a new interpreter.
+    :raises RuntimeError: if the suite fails; the message ends with its stderr.
+    """
+    completed= subprocess.run(
+        [sys.executable, '-c', CHILD.format(suite=suite), json.dumps(SUITES[suite])],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode:
+        raise RuntimeError(f'Benchmark suite {suite} failed:\n{completed.stderr[-4000:]}')
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def run_suites(suites:Sequence[str], stand_ins:bool=False, log=print)-> Dict[str, Any]:
+    """
+    Runs the suites in order against the configured services, or against a temporary
+    SQLite file and fakeredis with stand_ins.
+    :returns: {'meta':{...}, 'suites':{suite: results}}
+    """
+    unknown= [suite for suite in suites if suite not in SUITES]
+    if unknown:
+        raise ValueError(f'Unknown benchmark suites: {", ".join(unknown)}')
+
+    with tempfile.TemporaryDirectory(prefix='benchmark-') as directory:
+        env= dict(os.environ, **(stand_in_environment(directory) if stand_ins else {}))
+        results: Dict[str, Any]= {}
+        for suite in suites:
+            started= time.perf_counter()
+            results[suite]= run_suite(suite, env)
+            log(f'{suite}: done in {time.perf_counter()- started:.1f}s')
+
+    return {
+        'meta':dict(
+            git_revision(),
+            created_at=time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            python=platform.python_version(),
+            platform=platform.platform(),
+            cpus=os.cpu_count(),
+            stand_ins=stand_ins,
+        ),
+        'suites':results,
+    }
+
+def load(path:str)-> Dict[str, Any]:
+    with open(path) as results_file:
+        return json.load(results_file)
+
+def save(results:Dict[str, Any], path:str)-> None:
+    with open(path, 'w') as results_file:
+        json.dump(results, results_file, indent=2)
+
+def regressions_against(results:Dict[str, Any], baseline:Dict[str, Any], threshold:float)-> List[Dict[str, Any]]:
+    """Regressions of results relative to a baseline results file, both as written by run_suites()."""
+    return compare(results['suites'], baseline['suites'], threshold)
+
+def format_regression(regression:Dict[str, Any])-> str:
+    return f'{regression["metric"]}: {regression["baseline"]:g} -> {regression["current"]:g} ({regression["change"]:+.1%})'
+
+def main()-> None:
+    parser= argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--suite', nargs='+', choices=list(SUITES), default=list(DEFAULT_SUITES))
+    parser.add_argument('--stand-ins', action='store_true', help='Use a temporary SQLite file and fakeredis.')
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--compare', metavar='BASELINE', help='Results file of an earlier commit.')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Allowed relative slowdown (0.1 = 10%%).')
+    args= parser.parse_args()
+
+    results= run_suites(args.suite, args.stand_ins, log=lambda line: print(line, file=sys.stderr))
+    save(results, args.output)
+    print(f'Results written to {args.output}')
+    if args.compare:
+        regressions= regressions_against(results, load(args.compare), args.threshold)
+        for regression in regressions:
+            print(f'REGRESSION {format_regression(regression)}')
+        if regressions:
+            sys.exit(1)
+        print(f'No regressions above {args.threshold:.0%} against {args.compare}.')
+
+
+if __name__== '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Session load latency benchmark.
+Creates a pool of sessions, then loads them in a skewed access pattern (a hot
+tenth of the sessions gets most of the traffic, as with active users) through
+the plain cache engine and the two-tier engine. Reports p50/p99 load latency,
+plus hit ratio and approximate memory of the local tier. Uses the configured
+Redis, or an in-process fakeredis server with REDIS_FAKE=true (which hides the
+network round trip the local tier saves, so prefer a real Redis for numbers).
+
+Usage: REDIS_FAKE=true python -m benchmarks.session_load [--sessions 2000] [--loads 20000]
+"""
+
+import time
+import random
+import argparse
+from importlib import import_module
+from typing import Any, Dict, List
+from benchmarks import latency_summary, report
+
+ENGINES= {
+    'cache':'django.contrib.sessions.backends.cache',
+    'two_tier':'applications.shared.sessions.two_tier',
+}
+
+
+def _configure_django()-> None:
+    import django
+    from django.conf import settings
+    from app_config.settings.cache_redis import redis_cache_config
+    if not settings.configured:
+        settings.configure(
+            CACHES=redis_cache_config.cache_settings,
+            DJANGO_REDIS_CONNECTION_FACTORY='app_config.settings.redis_registry.SharedConnectionFactory',
+            SESSION_CACHE_ALIAS='default',
+        )
+    django.setup()
+
+def _access_pattern(keys:List[str], loads:int, seed:int)-> List[str]:
+    """90% of loads hit the first 10% of sessions."""
+    rng= random.Random(seed)
+    hot= keys[:max(1, len(keys)// 10)]
+    return [rng.choice(hot) if rng.random()< 0.9 else rng.choice(keys) for _ in range(loads)]
+
+def run(sessions:int=2000, loads:int=20_000, seed:int=7)-> Dict[str, Any]:
+    """Compares session load latency of both engines on the same access pattern."""
+    _configure_django()
+    results: Dict[str, Any]= {'sessions':sessions, 'loads':loads}
+    for name, engine in ENGINES.items():
+        store_class= import_module(engine).SessionStore
+        keys= []
+        for index in range(sessions):
+            store= store_class()
+            store.update({'_auth_user_id':str(index), 'cart':list(range(10))})
+            store.create()
+            store.update({'_auth_user_id':str(index), 'cart':list(range(10))})
+            store.save()
+            keys.append(store.session_key)
+
+        if name== 'two_tier':
+            from applications.shared.sessions.two_tier import local_session_cache
+            local_session_cache().clear()
+            local_session_cache().hits= local_session_cache().misses= 0
+
+        samples= []
+        for key in _access_pattern(keys, loads, seed):
+            started= time.perf_counter()
+            store_class(key).load()
+            samples.append(time.perf_counter()- started)
+        results[name]= latency_summary(samples)
+        if name== 'two_tier':
+            results[name]['local_tier']= local_session_cache().stats()
+
+        for key in keys:
+            store_class(key).delete()
+    return results
+
+def main()-> None:
+    parser= argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sessions', type=int, default=2000)
+    parser.add_argument('--loads', type=int, default=20_000)
+    parser.add_argument('--seed', type=int, default=7)
+    args= parser.parse_args()
+    report(run(args.sessions, args.loads, args.seed))
+
+
+if __name__== '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Worker startup benchmark.
+Boots fresh interpreters the way a gunicorn/uvicorn worker does and measures the
+time to import the WSGI/ASGI application and the time to serve a first request
+(a GET on /auth/register/, answered with 405 before any database access).
+
+Usage: python -m benchmarks.startup [--runs 5] [--entry wsgi|asgi]
+"""
+
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+from typing import Any, Dict
+
+PROBE= """
+import json, time
+started= time.perf_counter()
+from app_config.{entry} import application
+imported= time.perf_counter()
+from django.test import Client
+Client().get('/auth/register/')
+served= time.perf_counter()
+print(json.dumps({{'import_ms':(imported- started)* 1000, 'first_request_ms':(served- imported)* 1000}}))
+"""
+
+
+def run(runs:int=5, entry:str='wsgi')-> Dict[str, Any]:
+    """Averages import and first-request time over several cold interpreters."""
+    from benchmarks import percentile
+    samples= []
+    for _ in range(runs):
+        output= subprocess.run(
+            [sys.executable, '-c', PROBE.format(entry=entry)],
+            cwd=Path(__file__).resolve().parent.parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip().splitlines()[-1]
+        samples.append(json.loads(output))
+
+    return {
+        key:{
+            'p50':round(percentile([sample[key] for sample in samples], 50), 1),
+            'max':round(max(sample[key] for sample in samples), 1),
+        } for key in ('import_ms', 'first_request_ms')
+    }
+
+def main()-> None:
+    from benchmarks import report
+    parser= argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--entry', choices=['wsgi', 'asgi'], default='wsgi')
+    args= parser.parse_args()
+    report(run(args.runs, args.entry))
+
+
+if __name__== '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Admin listing and export cost as the table grows.
+Seeds client_user up to --users rows, then times a page near the start and one near the
+end of the table with keyset pagination and with the OFFSET it replaces, and streams the
+NDJSON and CSV exports while tracing peak memory. With the export streamed from a
+server-side cursor, the peak should stay flat as the row count grows.
+Uses DB_URL (e.g. sqlite:////tmp/listing.db) as a stand-in for Postgres.
+
+Usage: DB_URL=sqlite:////tmp/listing.db python -m benchmarks.user_listing [--users 100000] [--page-size 100]
+"""
+
+import time
+import argparse
+import tracemalloc
+from typing import Any, Callable, Dict
+from benchmarks import latency_summary, report
+from benchmarks.read_models import _seed
+
+
+def _configure_django()-> None:
+    import django
+    from django.conf import settings
+    if not settings.configured:
+        settings.configure(SECRET_KEY='benchmark', ALLOWED_HOSTS=['*'])
+    django.setup()
+
+def _page_latency(page:Callable[[Any], Any], repeats:int=20)-> Dict[str, float]:
+    from app_config.settings.database import SessionLocal
+    session= SessionLocal()
+    try:
+        samples= []
+        for _ in range(repeats):
+            started= time.perf_counter()
+            page(session)
+            samples.append(time.perf_counter()- started)
+    finally:
+        session.close()
+    return latency_summary(samples)
+
+def _export(export_format:str)-> Dict[str, Any]:
+    from applications.auth.admin_views import _export_chunks
+    tracemalloc.start()
+    started= time.perf_counter()
+    size= sum(len(chunk) for chunk in _export_chunks(export_format))
+    elapsed= time.perf_counter()- started
+    _, peak= tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'bytes':size, 'seconds':round(elapsed, 3), 'peak_kib':round(peak/ 1024, 1)}
+
+def run(users:int=100_000, page_size:int=100)-> Dict[str, Any]:
+    """Shallow vs. deep page latency for keyset and OFFSET, and export time and peak memory."""
+    _configure_django()
+    from app_config.settings.database import SessionLocal, create_schema
+    from applications.auth.auth_models import ClientUser, ClientUserRow
+    from applications.auth.auth_repository import _listing, list_users
+    from applications.shared.queries import all_rows
+
+    create_schema()
+    _seed(SessionLocal, users)
+    session= SessionLocal()
+    try:
+        dialect= session.get_bind().dialect.name
+        deep_offset= max(0, users- page_size* 10)
+        deep_row= all_rows(session, _listing(dialect, None).offset(deep_offset).limit(1), ClientUserRow)[0]
+    finally:
+        session.close()
+    deep_keyset= (deep_row.created_at, deep_row.id)
+
+    def offset_page(offset:int)-> Callable[[Any], Any]:
+        return lambda session: all_rows(session, _listing(dialect, None).offset(offset).limit(page_size), ClientUserRow)
+
+    return {
+        'users':users,
+        'page_size':page_size,
+        'first_page':{
+            'keyset':_page_latency(lambda session: list_users(session, page_size)),
+            'offset':_page_latency(offset_page(0)),
+        },
+        'deep_page':{
+            'keyset':_page_latency(lambda session: list_users(session, page_size, deep_keyset)),
+            'offset':_page_latency(offset_page(deep_offset)),
+        },
+        'export':{
+            'ndjson':_export('ndjson'),
+            'csv':_export('csv'),
+        },
+    }
+
+def main()-> None:
+    parser= argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--page-size', type=int, default=100)
+    args= parser.parse_args()
+    report(run(args.users, args.page_size))
+
+
+if __name__== '__main__':
+    main()
@@ -1,8 +1,8 @@
 import os
 import sys
-from dotenv import load_dotenv
+from app_config.settings.env import load_environment
 
-load_dotenv()
+load_environment()
 
 def main():
     """
@@ -0,0 +1,55 @@
+"""
+Runs the suite against the in-process stand-ins: a SQLite file for Postgres and
+fakeredis for Redis (requirements-dev.txt). Set DB_URL and DB_ASYNC_URL to run the
+database tests on Postgres instead. Settings are configured before any test imports
+the application, as benchmarks/app_load.py does.
+"""
+
+import os
+import sys
+import tempfile
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import stand_in_environment
+
+database_configured= bool(os.getenv('DB_URL'))
+for key, value in stand_in_environment(tempfile.mkdtemp(prefix='basicauth-tests-')).items():
+    if not (database_configured and key.startswith('DB_')):
+        os.environ[key]= value
+os.environ.setdefault('LOG_QUEUE', 'false')
+
+
+def pytest_configure(config):
+    import django
+    from django.conf import settings
+    from app_config.settings.cache_redis import redis_cache_config
+    if not settings.configured:
+        settings.configure(
+            SECRET_KEY='tests',
+            ALLOWED_HOSTS=['*'],
+            ROOT_URLCONF='app_config.urls',
+            CACHES=redis_cache_config.cache_settings,
+            DJANGO_REDIS_CONNECTION_FACTORY='app_config.settings.redis_registry.SharedConnectionFactory',
+            SESSION_ENGINE='applications.shared.sessions.two_tier',
+            SESSION_CACHE_ALIAS='default',
+        )
+    django.setup()
+
+
+@pytest.fixture(scope='session')
+def schema():
+    """Tables and indexes on the SQLite stand-in."""
+    from app_config.settings.database import create_schema
+    create_schema()
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """A small hashing pool replacing the process-wide one; it queues up to 32 jobs."""
+    from applications.shared.utils import hashing
+    pool= hashing.HashingPool(max_workers=2, queue_size=32)
+    monkeypatch.setattr(hashing, 'hashing_pool', lambda: pool)
+    yield pool
+    pool.shutdown()
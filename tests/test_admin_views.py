@@ -0,0 +1,24 @@
+"""The admin user API behind ADMIN_API_TOKEN."""
+
+import pytest
+from django.test import RequestFactory
+from applications.auth import admin_views
+
+
+def _list(authorization:str=''):
+    headers= {'HTTP_AUTHORIZATION':authorization} if authorization else {}
+    return admin_views.admin_users(RequestFactory().get('/admin/users/', **headers))
+
+
+@pytest.mark.parametrize('authorization', ['', 'Bearer ', 'Bearer wrong', 'Bearer admin-sécret'])
+def test_requests_without_the_configured_token_are_refused(monkeypatch, authorization):
+    monkeypatch.setenv('ADMIN_API_TOKEN', 'admin-secret')
+    assert _list(authorization).status_code== 403
+
+def test_requests_are_refused_while_no_token_is_configured(monkeypatch):
+    monkeypatch.delenv('ADMIN_API_TOKEN', raising=False)
+    assert _list('Bearer ').status_code== 403
+
+def test_requests_with_the_configured_token_are_served(schema, monkeypatch):
+    monkeypatch.setenv('ADMIN_API_TOKEN', 'admin-secret')
+    assert _list('Bearer admin-secret').status_code== 200
@@ -0,0 +1,38 @@
+"""Metric directions and regressions of the benchmark runner."""
+
+import pytest
+from benchmarks import compare, metric_direction
+from benchmarks.app_load import _summary
+
+
+@pytest.mark.parametrize('path, direction', [
+    ('request_parsing.fastjson.us_per_request', -1),
+    ('micro.json_loads.mean_us', -1),
+    ('user_listing.export.seconds', -1),
+    ('startup.import_ms.p50', -1),
+    ('app_load.wsgi.login.c8.p99_ms', -1),
+    ('read_models.orm.peak_bytes_per_row', -1),
+    ('session_load.peak_kib_per_connection', -1),
+    ('rate_limit.redis_round_trips_per_request', -1),
+    ('app_load.wsgi.login.c8.requests_per_sec', 1),
+    ('tokens.validated_per_second', 1),
+    ('app_load.wsgi.login.c8.max_ms', None),
+    ('app_load.wsgi.login.c8.rejected', None),
+    ('tokens.token_length', None),
+    ('mail_queue.smtp_connections', None),
+    ('app_load.requests', None),
+])
+def test_metric_direction(path, direction):
+    assert metric_direction(path)== direction
+
+def test_compare_reports_regressions_in_either_direction():
+    baseline= {'parsing':{'us_per_request':10.0}, 'load':{'requests_per_sec':100.0, 'rejected':0}}
+    current= {'parsing':{'us_per_request':12.0}, 'load':{'requests_per_sec':95.0, 'rejected':40}}
+    regressions= compare(current, baseline, threshold=0.1)
+    assert [regression['metric'] for regression in regressions]== ['parsing.us_per_request']
+
+def test_rejected_requests_do_not_count_as_throughput():
+    summary= _summary([0.01]* 10, {201:4, 429:2, 503:4}, elapsed=2.0)
+    assert summary['requests_per_sec']== 2.0
+    assert summary['rejected']== 6
+    assert summary['statuses']== {'201':4, '429':2, '503':4}
@@ -0,0 +1,39 @@
+"""Values written through the cache envelope come back with the same types."""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+import pytest
+from applications.shared.utils.codecs import SERIALIZER_IDS, EnvelopeSerializer, MAGIC
+
+VALUES= [
+    {'id':1, 'name':'user', 'verified':True, 'score':1.5, 'tags':['a', 'b'], 'nothing':None},
+    (1, 2),
+    {'nested':[(1, 'a')]},
+    {1:'int key'},
+    {'a', 'b'},
+    datetime(2026, 10, 18, tzinfo=timezone.utc),
+    Decimal('1.10'),
+    float('nan'),
+    2** 70,
+]
+
+
+def _serializer_id(data:bytes)-> int:
+    assert data.startswith(MAGIC)
+    return data[len(MAGIC)+ 1]
+
+
+@pytest.mark.parametrize('serializer', ['orjson', 'msgpack', 'pickle'])
+@pytest.mark.parametrize('value', VALUES, ids=repr)
+def test_values_round_trip_with_their_types(serializer, value):
+    codec= EnvelopeSerializer({'ENVELOPE_SERIALIZER':serializer})
+    loaded= codec.loads(codec.dumps(value))
+    assert type(loaded) is type(value)
+    assert repr(loaded)== repr(value)
+
+@pytest.mark.parametrize('serializer', ['orjson', 'msgpack'])
+def test_json_native_values_keep_the_configured_serializer(serializer):
+    pytest.importorskip(serializer)
+    codec= EnvelopeSerializer({'ENVELOPE_SERIALIZER':serializer})
+    assert _serializer_id(codec.dumps(VALUES[0]))== SERIALIZER_IDS[serializer]
+    assert _serializer_id(codec.dumps((1, 2)))== SERIALIZER_IDS['pickle']
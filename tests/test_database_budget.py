@@ -0,0 +1,42 @@
+"""Connection budget split between Django and the SQLAlchemy engines."""
+
+import pytest
+from app_config.settings.database import DatabaseConfig
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    def configure(budget:int, share:int, async_views:bool)-> DatabaseConfig:
+        monkeypatch.setenv('DB_CONNECTION_BUDGET', str(budget))
+        monkeypatch.setenv('DB_DJANGO_POOL_SHARE', str(share))
+        monkeypatch.setenv('DB_POOL_SIZE', '5')
+        monkeypatch.setenv('DB_MAX_OVERFLOW', '10')
+        monkeypatch.setenv('AUTH_ASYNC_VIEWS', 'true' if async_views else 'false')
+        return DatabaseConfig()
+    return configure
+
+
+def test_sync_engine_gets_the_whole_sqlalchemy_share(budget):
+    config= budget(20, 4, async_views=False)
+    assert config.sqlalchemy_pool_limits()== (5, 10)
+    assert sum(config.sqlalchemy_pool_limits())<= 16
+
+def test_sync_and_async_engines_share_the_budget(budget):
+    config= budget(20, 4, async_views=True)
+    sync, asynchronous= config.engine_options(), config.engine_options(asynchronous=True)
+    limits= [(options['pool_size'], options['max_overflow']) for options in (sync, asynchronous)]
+    assert limits== [(5, 3), (5, 3)]
+    assert sum(pool_size+ max_overflow for pool_size, max_overflow in limits)+ 4<= 20
+
+def test_single_engine_databases_keep_the_whole_share(budget):
+    config= budget(20, 4, async_views=True)
+    assert config.sqlalchemy_pool_limits(engines=1)== (5, 10)
+
+def test_budget_too_small_for_every_engine_is_refused(budget):
+    config= budget(2, 1, async_views=True)
+    with pytest.raises(ValueError):
+        config.engine_options()
+
+def test_no_budget_keeps_the_configured_pool(budget):
+    config= budget(0, 0, async_views=True)
+    assert config.sqlalchemy_pool_limits()== (5, 10)
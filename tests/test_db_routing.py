@@ -0,0 +1,60 @@
+"""RoutingSession over a primary and a replica, two SQLite files telling apart which one answered."""
+
+import pytest
+from sqlalchemy import Column, MetaData, String, Table, create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+from app_config.settings.db_routing import ReplicaSet, RoutingSession
+
+metadata= MetaData()
+origin= Table('origin', metadata, Column('name', String(20)))
+
+
+@pytest.fixture
+def engines(tmp_path):
+    """(primary, replica) engines, each holding one origin row with its own name."""
+    engines= {}
+    for name in ('primary', 'replica'):
+        engine= create_engine(f'sqlite:///{tmp_path}/{name}.db')
+        metadata.create_all(engine)
+        with engine.begin() as connection:
+            connection.execute(insert(origin).values(name=name))
+        engines[name]= engine
+    yield engines['primary'], engines['replica']
+    for engine in engines.values():
+        engine.dispose()
+
+def _session(engines, read_your_writes:float=0.0)-> RoutingSession:
+    primary, replica= engines
+    return sessionmaker(
+        class_=RoutingSession,
+        replicas=ReplicaSet([replica], retry_after=30),
+        read_your_writes=read_your_writes,
+        bind=primary,
+    )()
+
+def _answered_by(session, statement)-> str:
+    try:
+        return session.execute(statement).scalars().first()
+    finally:
+        session.rollback()
+
+
+def test_plain_selects_read_from_the_replica(engines):
+    with _session(engines) as session:
+        assert _answered_by(session, select(origin.c.name))== 'replica'
+
+def test_locking_selects_read_from_the_primary(engines):
+    with _session(engines) as session:
+        assert _answered_by(session, select(origin.c.name).with_for_update())== 'primary'
+        assert _answered_by(session, select(origin.c.name).with_for_update(skip_locked=True))== 'primary'
+
+def test_use_primary_reads_from_the_primary(engines):
+    with _session(engines) as session:
+        assert _answered_by(session, select(origin.c.name).execution_options(use_primary=True))== 'primary'
+
+def test_reads_follow_a_committed_write_to_the_primary_within_the_window(engines):
+    with _session(engines, read_your_writes=60) as session:
+        session.execute(insert(origin).values(name='written'))
+        session.commit()
+        names= set(session.execute(select(origin.c.name)).scalars())
+        assert names== {'primary', 'written'}
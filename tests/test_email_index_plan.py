@@ -0,0 +1,78 @@
+"""
+The email lookups the views run are answered from the partial normalized_email index.
+Each repository function is run for real; the SQL and parameters it sends are captured
+and EXPLAINed on the same connection. On Postgres (DB_URL pointing at one) sequential
+scans are disabled first, so a small table still shows whether the index is usable.
+"""
+
+from typing import Any, Callable, Dict, List, Tuple
+import pytest
+from sqlalchemy import event
+from app_config.settings.database import SessionLocal
+from applications.auth.auth_cache import user_lookup_cache
+from applications.auth.auth_repository import create_user_if_absent, email_exists, find_user_by_email
+from applications.shared.utils.email import normalize_email
+
+INDEX= 'uq_client_user_live_normalized_email'
+EMAIL= normalize_email(' Plan.Check@Example.com ')
+
+
+def _captured(session, lookup:Callable[[Any, str], Any])-> List[Tuple[str, Any]]:
+    """(SQL, DBAPI parameters) of every statement lookup(session, EMAIL) sends."""
+    statements= []
+
+    def capture(connection, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    engine= session.get_bind()
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        lookup(session, EMAIL)
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+    return statements
+
+def _postgres_index_scans(plan:Dict[str, Any])-> List[str]:
+    scans= [plan['Index Name']] if plan['Node Type'] in ('Index Scan', 'Index Only Scan') else []
+    for child in plan.get('Plans', []):
+        scans.extend(_postgres_index_scans(child))
+    return scans
+
+def _uses_email_index(session, statement:str, parameters:Any)-> bool:
+    connection= session.connection()
+    if connection.dialect.name== 'postgresql':
+        connection.exec_driver_sql('SET LOCAL enable_seqscan= off')
+        plan= connection.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {statement}', parameters).scalar_one()[0]['Plan']
+        return INDEX in _postgres_index_scans(plan)
+    details= [row[-1] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)]
+    return any(detail.startswith('SEARCH') and f'INDEX {INDEX} ' in f'{detail} ' for detail in details)
+
+
+@pytest.mark.parametrize('lookup', [
+    email_exists,
+    find_user_by_email,
+    lambda session, email: user_lookup_cache.fetch(session, email),
+], ids=['email_exists', 'find_user_by_email', 'user_lookup_cache.fetch'])
+def test_email_lookup_uses_the_partial_normalized_email_index(schema, lookup):
+    user_lookup_cache.invalidate(EMAIL)
+    session= SessionLocal.for_key(EMAIL)
+    try:
+        statements= [(sql, parameters) for sql, parameters in _captured(session, lookup) if 'client_user' in sql]
+        assert statements, 'the lookup sent no query on client_user'
+        for statement, parameters in statements:
+            assert _uses_email_index(session, statement, parameters), statement
+        session.rollback()
+    finally:
+        session.close()
+
+
+def test_emails_differing_only_in_non_ascii_case_are_one_user(schema):
+    # Python folds Ä to ä; SQLite's lower() leaves it alone, so comparing against lower(email) missed it.
+    session= SessionLocal.for_key(normalize_email('ärger@example.com'))
+    try:
+        user_id= create_user_if_absent(session, 'Anna', 'Ärger', 'ÄRGER@Example.com', 'hash')
+        assert user_id is not None
+        assert email_exists(session, normalize_email('ärger@example.com'))
+        assert create_user_if_absent(session, 'Anna', 'Ärger', 'ärger@example.com', 'hash') is None
+    finally:
+        session.close()
@@ -0,0 +1,59 @@
+"""Argon2 hashing off the request threads and its calibration."""
+
+import os
+import multiprocessing
+import pytest
+from applications.shared.utils import hashing
+
+
+@pytest.fixture
+def cold_dummy_hash(monkeypatch):
+    monkeypatch.setattr(hashing, '_dummy_hash', None)
+
+
+def test_dummy_hash_is_computed_once_on_the_pool(cold_dummy_hash, pool, monkeypatch):
+    submitted= []
+    submit= pool.submit
+    monkeypatch.setattr(pool, 'submit', lambda fn, *args: submitted.append(fn) or submit(fn, *args))
+    first= hashing.dummy_hash()
+    assert hashing.dummy_hash()== first
+    assert submitted== [hashing.hash_password]
+    assert not hashing.verify_password('anything', first)
+
+def test_dummy_hash_is_refused_by_a_saturated_pool(cold_dummy_hash, monkeypatch):
+    full= hashing.HashingPool(max_workers=1, queue_size=0)
+    monkeypatch.setattr(hashing, 'hashing_pool', lambda: full)
+    full.submit(hashing.time.sleep, 0.5)
+    try:
+        with pytest.raises(hashing.HashingPoolSaturated):
+            hashing.dummy_hash()
+        assert hashing._dummy_hash is None
+    finally:
+        full.shutdown()
+
+def test_startup_warms_the_dummy_hash(cold_dummy_hash, monkeypatch):
+    monkeypatch.setattr(hashing, 'hashing_pool', lambda: pytest.fail('dummy hash computed on the pool'))
+    monkeypatch.setattr(hashing, 'password_hasher', hashing.password_hasher)
+    hashing.init_password_hasher('never')
+    assert hashing.dummy_hash().startswith('$argon2')
+
+def test_workers_booting_together_calibrate_once(tmp_path, monkeypatch):
+    monkeypatch.setenv('ARGON2_PARAMS_PATH', str(tmp_path/ 'argon2_params.json'))
+    log= tmp_path/ 'calibrations'
+
+    def calibrate(self):
+        with open(log, 'a') as log_file:
+            log_file.write(f'{os.getpid()}\n')
+        hashing.time.sleep(0.2)
+        return {'time_cost':1, 'memory_cost':8* 1024, 'parallelism':1}
+
+    monkeypatch.setattr(hashing.Argon2Calibration, 'calibrate', calibrate)
+    monkeypatch.setattr(hashing, 'warm_dummy_hash', lambda: None)
+    context= multiprocessing.get_context('fork')
+    workers= [context.Process(target=hashing.init_password_hasher, args=('missing',)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert len(log.read_text().split())== 1
+    assert hashing.Argon2Calibration().load()== {'time_cost':1, 'memory_cost':8* 1024, 'parallelism':1}
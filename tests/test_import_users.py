@@ -0,0 +1,54 @@
+"""Record validation of `manage.py import_users`."""
+
+import io
+import json
+import uuid
+import pytest
+from django.core.management import call_command
+from app_config.settings.database import SessionLocal
+from applications.auth.auth_models import ClientUser
+from applications.auth.auth_repository import email_exists
+from applications.auth.management.commands.import_users import Command, validate_record
+
+RECORD= {'first_name':'Import', 'last_name':'User', 'email':' Import.User@Example.com ', 'password':'import-password'}
+
+
+def test_valid_records_come_back_with_the_email_stripped():
+    fields, reason= validate_record(dict(RECORD, extra='ignored'))
+    assert reason is None
+    assert fields== dict(RECORD, email='Import.User@Example.com')
+
+@pytest.mark.parametrize('change', [
+    {'email':'not-an-email'},
+    {'email':'@example.com'},
+    {'first_name':'   '},
+    {'password':None},
+    {'last_name':'x'* (ClientUser.__table__.c.last_name.type.length+ 1)},
+    {'email':'a'* ClientUser.__table__.c.email.type.length+ '@example.com'},
+])
+def test_records_failing_the_registration_checks_are_rejected(change):
+    fields, reason= validate_record(dict(RECORD, **change))
+    assert fields is None
+    assert reason
+
+def test_lengths_follow_the_model_columns():
+    length= ClientUser.__table__.c.first_name.type.length
+    assert validate_record(dict(RECORD, first_name='x'* length))[1] is None
+    assert 'first_name' in validate_record(dict(RECORD, first_name='x'* (length+ 1)))[1]
+
+def test_import_inserts_valid_rows_and_rejects_the_rest(schema, tmp_path):
+    email= f'Imported-{uuid.uuid4().hex}@Example.com'
+    source= tmp_path/ 'users.ndjson'
+    source.write_text('\n'.join(json.dumps(record) for record in [
+        dict(RECORD, email=f' {email} '),
+        dict(RECORD, email='broken'),
+    ])+ '\n')
+    call_command(Command(), str(source), workers=1, stdout=io.StringIO())
+
+    session= SessionLocal.for_key(email.lower())
+    try:
+        assert email_exists(session, email.lower())
+    finally:
+        session.close()
+    rejects= [json.loads(line) for line in (tmp_path/ 'users.ndjson.rejects').read_text().splitlines()]
+    assert [reject['reason'] for reject in rejects]== ['Invalid email address!']
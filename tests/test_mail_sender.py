@@ -0,0 +1,54 @@
+"""SMTP connection reuse by the mail worker's sender."""
+
+import json
+import pytest
+from applications.shared.utils import mail_queue
+from applications.shared.utils.mail_queue import MailSender
+
+
+class FakeConnection:
+    opened= 0
+    closed= 0
+
+    def open(self):
+        FakeConnection.opened+= 1
+
+    def close(self):
+        FakeConnection.closed+= 1
+
+    def send_messages(self, messages):
+        return len(messages)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    FakeConnection.opened= FakeConnection.closed= 0
+    monkeypatch.setattr(mail_queue, 'get_connection', lambda fail_silently: FakeConnection())
+    now= [1000.0]
+    monkeypatch.setattr(mail_queue.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def _jobs(count:int):
+    return [json.dumps({'kind':'verification', 'to':f'user-{index}@example.com', 'context':{'first_name':'Mail', 'token':'t'}}).encode() for index in range(count)]
+
+
+def test_batches_share_one_connection_while_busy(clock):
+    sender= MailSender(idle_timeout=30)
+    sent, failed= sender.send_batch(_jobs(3))
+    clock[0]+= 10
+    assert not sender.close_if_idle()
+    sender.send_batch(_jobs(2))
+    assert (len(sent), failed)== (3, [])
+    assert (FakeConnection.opened, FakeConnection.closed)== (1, 0)
+
+def test_connection_closes_only_after_the_idle_timeout(clock):
+    sender= MailSender(idle_timeout=30)
+    sender.send_batch(_jobs(1))
+    clock[0]+= 30
+    assert not sender.close_if_idle()
+    clock[0]+= 1
+    assert sender.close_if_idle()
+    assert not sender.close_if_idle()
+    sender.send_batch(_jobs(1))
+    assert (FakeConnection.opened, FakeConnection.closed)== (2, 1)
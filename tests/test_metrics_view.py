@@ -0,0 +1,24 @@
+"""Access to the Prometheus scrape endpoint."""
+
+from django.test import RequestFactory
+from applications.shared.middleware.metrics import metrics_view
+
+
+def _scrape(authorization:str=''):
+    headers= {'HTTP_AUTHORIZATION':authorization} if authorization else {}
+    return metrics_view(RequestFactory().get('/metrics', **headers))
+
+
+def test_scrapes_are_refused_without_a_configured_token(monkeypatch):
+    monkeypatch.delenv('METRICS_TOKEN', raising=False)
+    assert _scrape().status_code== 403
+    assert _scrape('Bearer ').status_code== 403
+
+def test_scrapes_need_the_configured_token(monkeypatch):
+    monkeypatch.setenv('METRICS_TOKEN', 'scrape-secret')
+    assert _scrape().status_code== 403
+    assert _scrape('Bearer wrong').status_code== 403
+    assert _scrape('Bearer scrape-sécret').status_code== 403
+    response= _scrape('Bearer scrape-secret')
+    assert response.status_code== 200
+    assert response['Content-Type'].startswith('text/plain')
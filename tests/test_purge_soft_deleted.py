@@ -0,0 +1,40 @@
+"""`manage.py purge_soft_deleted` moves every client_user column into client_user_archive."""
+
+import io
+import uuid
+from datetime import datetime, timedelta, timezone
+from django.core.management import call_command
+from sqlalchemy import select, update
+from app_config.settings.database import SessionLocal
+from applications.auth.auth_models import ClientUser, ClientUserArchive
+from applications.auth.auth_repository import create_user_if_absent, mark_verified
+from applications.auth.management.commands.purge_soft_deleted import Command
+from applications.shared.utils.email import normalize_email
+
+
+def test_archive_has_every_client_user_column():
+    assert set(ClientUser.__table__.columns.keys())<= set(ClientUserArchive.__table__.columns.keys())
+
+def test_users_soft_deleted_past_the_retention_period_are_archived(schema):
+    email= normalize_email(f'purged-{uuid.uuid4().hex}@example.com')
+    session= SessionLocal.for_key(email)
+    try:
+        user_id= create_user_if_absent(session, 'Purged', 'User', email, 'hash')
+        assert mark_verified(session, user_id)== email
+        session.execute(
+            update(ClientUser).where(ClientUser.id== user_id)
+            .values(deleted_at=datetime.now(timezone.utc)- timedelta(days=91))
+        )
+        session.commit()
+
+        output= io.StringIO()
+        call_command(Command(), retention_days=90, pause=0, stdout=output)
+
+        assert session.execute(
+            select(ClientUser.id).where(ClientUser.id== user_id).execution_options(include_deleted=True)
+        ).first() is None
+        archived= session.execute(select(ClientUserArchive).where(ClientUserArchive.id== user_id)).scalar_one()
+        assert archived.normalized_email== email
+        assert archived.verified_at is not None
+    finally:
+        session.close()
@@ -0,0 +1,81 @@
+"""Per-IP and per-email limits on the auth POSTs, as the Django handler runs them."""
+
+import json
+import uuid
+import asyncio
+from importlib import import_module
+import pytest
+from django.conf import settings
+from django.test import RequestFactory
+from applications.auth import auth_views
+from applications.shared.middleware.rate_limit import RateLimitMiddleware, rate_limiter
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    """The process-wide limiter with small limits; records the identities of every call."""
+    limiter= rate_limiter()
+    monkeypatch.setattr(limiter, 'per_ip', 3)
+    monkeypatch.setattr(limiter, 'per_email', 2)
+    calls= []
+    hit= limiter.hit
+
+    def recording_hit(identities):
+        calls.append([identity for identity, _ in identities])
+        return hit(identities)
+
+    async def recording_ahit(identities):
+        calls.append([identity for identity, _ in identities])
+        return await ahit(identities)
+
+    ahit= limiter.ahit
+    monkeypatch.setattr(limiter, 'hit', recording_hit)
+    monkeypatch.setattr(limiter, 'ahit', recording_ahit)
+    return calls
+
+def _login_request(ip:str, email:str, body:str=None):
+    request= RequestFactory().post(
+        '/auth/login/',
+        data=body if body is not None else json.dumps({'email':email, 'password':'wrong-password'}),
+        content_type='application/json',
+        REMOTE_ADDR=ip,
+    )
+    request.session= import_module(settings.SESSION_ENGINE).SessionStore()
+    return request
+
+def _login(ip:str, email:str, body:str=None):
+    """Runs a login POST through the middleware's process_view and the view, like the handler."""
+    request= _login_request(ip, email, body)
+    middleware= RateLimitMiddleware(auth_views.login)
+    return middleware.process_view(request, auth_views.login, (), {}) or middleware(request)
+
+def _unique_ip()-> str:
+    return f'10.{uuid.uuid4().int% 250}.{uuid.uuid4().int% 250}.{uuid.uuid4().int% 250}'
+
+
+def test_ip_and_email_limits_share_one_call(schema, pool, limiter):
+    ip, email= _unique_ip(), f'limited-{uuid.uuid4().hex}@example.com'
+    assert _login(ip, email).status_code== 401
+    assert limiter== [[f'ip:{ip}', f'email:{email}:ip:{ip}']]
+
+def test_async_ip_and_email_limits_share_one_call(schema, pool, limiter):
+    ip, email= _unique_ip(), f'limited-{uuid.uuid4().hex}@example.com'
+    middleware= RateLimitMiddleware(auth_views.login_async)
+
+    async def handle():
+        request= _login_request(ip, email)
+        return await middleware.process_view(request, auth_views.login_async, (), {}) or await middleware(request)
+
+    assert asyncio.run(handle()).status_code== 401
+    assert limiter== [[f'ip:{ip}', f'email:{email}:ip:{ip}']]
+
+def test_ip_limit_still_counts_bodies_without_an_email(limiter):
+    ip= _unique_ip()
+    assert [_login(ip, '', body='not json').status_code for _ in range(4)]== [400, 400, 400, 429]
+    assert limiter== [[f'ip:{ip}']]* 4
+
+def test_failed_logins_from_one_address_do_not_lock_out_others(schema, pool, limiter):
+    email= f'target-{uuid.uuid4().hex}@example.com'
+    attacker, owner= _unique_ip(), _unique_ip()
+    assert [_login(attacker, email).status_code for _ in range(3)]== [401, 401, 429]
+    assert _login(owner, email).status_code== 401
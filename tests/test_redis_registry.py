@@ -0,0 +1,69 @@
+"""Process-wide Redis pools, on the in-process fakeredis server."""
+
+import os
+import asyncio
+import pytest
+from app_config.settings.cache_redis import redis_cache_config
+from app_config.settings.redis_registry import RedisRegistry, redis_registry
+
+
+@pytest.fixture
+def registry(monkeypatch)-> RedisRegistry:
+    monkeypatch.setenv('REDIS_FAKE', 'true')
+    monkeypatch.setenv('REDIS_MAX_CONNECTIONS', '7')
+    return RedisRegistry(redis_cache_config)
+
+
+def test_clients_share_one_sync_pool(registry):
+    first, second= registry.client(), registry.client()
+    assert first.connection_pool is second.connection_pool is registry.sync_pool()
+    first.set('registry-test', 'value')
+    assert second.get('registry-test')== b'value'
+
+def test_clients_share_one_async_pool(registry):
+    async def roundtrip():
+        first, second= registry.async_client(), registry.async_client()
+        assert first.connection_pool is second.connection_pool is registry.async_pool()
+        await first.set('registry-test', 'value')
+        return await second.get('registry-test')
+
+    assert asyncio.run(roundtrip())== b'value'
+
+def test_registry_is_cached_per_process():
+    assert redis_registry() is redis_registry()
+
+def test_pipeline_sends_queued_commands(registry):
+    with registry.pipeline() as pipe:
+        pipe.incr('registry-counter')
+        pipe.incr('registry-counter')
+    assert registry.client().get('registry-counter')== b'2'
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs fork()')
+def test_forked_child_rebuilds_its_pools(registry):
+    parent_pool= registry.sync_pool()
+    parent_id= id(parent_pool)
+    read_end, write_end= os.pipe()
+    pid= os.fork()
+    if pid== 0:
+        try:
+            child_pool= registry.sync_pool()
+            rebuilt= child_pool is not parent_pool and id(child_pool)!= parent_id and registry.stats()['pid']== os.getpid()
+            os.write(write_end, b'1' if rebuilt else b'0')
+        finally:
+            os._exit(0)
+    os.close(write_end)
+    os.waitpid(pid, 0)
+    assert os.read(read_end, 1)== b'1'
+    os.close(read_end)
+    assert registry.sync_pool() is parent_pool
+
+def test_stats_report_pool_usage(registry):
+    assert registry.stats()== {'pid':os.getpid(), 'sync':None, 'async':None}
+    client= registry.client()
+    client.ping()
+    connection= registry.sync_pool().get_connection('PING')
+    stats= registry.stats()
+    registry.sync_pool().release(connection)
+    assert stats['sync']== {'max_connections':7, 'created':1, 'in_use':1, 'available':0}
+    assert stats['async'] is None
+    assert registry.stats()['sync']['in_use']== 0
@@ -0,0 +1,35 @@
+"""Concurrent sign-ups for one email through the sync registration view."""
+
+import json
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.test import RequestFactory
+from applications.auth import auth_views
+from applications.shared.middleware.rate_limit import rate_limiter
+
+# No more than the pool fixture queues, so no request is turned away with a 503.
+PARALLEL= 32
+
+
+def test_only_one_of_concurrent_duplicate_sign_ups_is_created(schema, pool, monkeypatch):
+    monkeypatch.setattr(rate_limiter(), 'per_email', PARALLEL+ 1)
+    body= json.dumps({
+        'first_name':'Race',
+        'last_name':'Test',
+        'email':f'Race-{uuid.uuid4().hex}@Example.com',
+        'password':'race-test-password',
+    })
+    factory= RequestFactory()
+    start= threading.Barrier(PARALLEL)
+
+    def attempt(_)-> int:
+        request= factory.post('/auth/register/', data=body, content_type='application/json')
+        start.wait()
+        return auth_views.register(request).status_code
+
+    with ThreadPoolExecutor(max_workers=PARALLEL) as executor:
+        statuses= list(executor.map(attempt, range(PARALLEL)))
+
+    assert statuses.count(201)== 1
+    assert statuses.count(400)== PARALLEL- 1
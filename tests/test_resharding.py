@@ -0,0 +1,166 @@
+"""
+Requests and `manage.py reshard_users` over two SQLite shards while a bucket moves:
+its rows are on both shards until the move ends, and the map decides which copy counts.
+"""
+
+import io
+import json
+import uuid
+import asyncio
+from typing import Tuple
+import pytest
+from django.core.management import call_command
+from django.test import RequestFactory
+from sqlalchemy import insert, select
+from app_config.settings.database import LazySessionFactory, init_postgresql, init_postgresql_async
+from app_config.settings.sharding import ShardedSessionFactory, ShardMap, ShardMapStore, async_url, init_shard_ids
+from applications.auth import admin_views, auth_views
+from applications.auth.auth_models import ClientUser, ClientUserArchive
+from applications.auth.auth_repository import create_user_if_absent
+from applications.auth.management.commands import reshard_users
+from applications.shared.utils.email import normalize_email
+from applications.shared.utils.tokens import verification_signer
+
+BUCKETS= 4
+ID_STRIDE= 8
+client_user= ClientUser.__table__
+
+
+class Shards:
+    """Two SQLite shards behind SessionLocal and AsyncSessionLocal, with their own shard map."""
+    def __init__(self, tmp_path, monkeypatch):
+        monkeypatch.setenv('DB_SHARD_MAP_PATH', str(tmp_path/ 'shard_map.json'))
+        self.store= ShardMapStore()
+        self.store.save(ShardMap.initial(BUCKETS, 2, ID_STRIDE))
+        self.factories, async_factories= [], []
+        for shard in range(2):
+            url= f'sqlite:///{tmp_path}/shard-{shard}.db'
+            factory= init_postgresql(url, f'shard-{shard}')
+            engine= factory.kw['bind']
+            ClientUser.metadata.create_all(bind=engine, tables=[client_user, ClientUserArchive.__table__])
+            init_shard_ids(engine, shard, ID_STRIDE, 0)
+            async_factory= init_postgresql_async(async_url(url), f'shard-{shard}-async')
+            for each in (factory, async_factory):
+                each.configure(info={'shard':shard, 'id_stride':ID_STRIDE})
+            self.factories.append(factory)
+            async_factories.append(async_factory)
+        sharded= LazySessionFactory(lambda: ShardedSessionFactory(self.factories, self.store))
+        async_sharded= LazySessionFactory(lambda: ShardedSessionFactory(async_factories, self.store))
+        for module in (auth_views, admin_views):
+            monkeypatch.setattr(module, 'SessionLocal', sharded)
+            monkeypatch.setattr(module, 'AsyncSessionLocal', async_sharded)
+        monkeypatch.setattr(reshard_users, 'SessionLocal', sharded)
+        monkeypatch.setattr(reshard_users, 'shard_map_store', lambda: self.store)
+        self.SessionLocal= sharded
+
+    def register(self)-> Tuple[int, str]:
+        """(id, normalized email) of a new user on the shard owning the email."""
+        email= normalize_email(f'Moving-{uuid.uuid4().hex}@Example.com')
+        session= self.SessionLocal.for_key(email)
+        try:
+            return create_user_if_absent(session, 'Moving', 'User', email, 'hash'), email
+        finally:
+            session.close()
+
+    def rows(self, shard:int, user_id:int):
+        session= self.factories[shard]()
+        try:
+            return session.execute(
+                select(client_user).where(client_user.c.id== user_id).execution_options(include_deleted=True)
+            ).mappings().all()
+        finally:
+            session.close()
+
+    def copy_and_reassign(self, user_id:int, email:str, frozen:bool=False)-> int:
+        """Copies the user to the other shard, as a reshard does, and hands the bucket to it unless frozen."""
+        shard_map= self.store.current()
+        bucket, source= shard_map.bucket_of(email), shard_map.shard_of(email)
+        destination= 1- source
+        row= dict(self.rows(source, user_id)[0])
+        session= self.factories[destination]()
+        try:
+            session.execute(insert(client_user).values(row))
+            session.commit()
+        finally:
+            session.close()
+        assignments= list(shard_map.assignments)
+        if frozen:
+            self.store.save(ShardMap(assignments, ID_STRIDE, {bucket}))
+            return source
+        assignments[bucket]= destination
+        self.store.save(ShardMap(assignments, ID_STRIDE))
+        return destination
+
+
+@pytest.fixture
+def shards(tmp_path, monkeypatch):
+    return Shards(tmp_path, monkeypatch)
+
+def _verify(user_id:int):
+    return RequestFactory().get('/auth/verify/', {'token':verification_signer().issue(user_id)})
+
+
+def test_verification_updates_the_shard_owning_the_user(shards):
+    user_id, email= shards.register()
+    owner= shards.copy_and_reassign(user_id, email)
+    assert auth_views.verify(_verify(user_id)).status_code== 200
+    assert shards.rows(owner, user_id)[0]['verified_at'] is not None
+    assert shards.rows(1- owner, user_id)[0]['verified_at'] is None
+
+def test_async_verification_updates_the_shard_owning_the_user(shards):
+    user_id, email= shards.register()
+    owner= shards.copy_and_reassign(user_id, email)
+    assert asyncio.run(auth_views.verify_async(_verify(user_id))).status_code== 200
+    assert shards.rows(owner, user_id)[0]['verified_at'] is not None
+    assert shards.rows(1- owner, user_id)[0]['verified_at'] is None
+
+def test_verification_waits_while_the_bucket_is_frozen(shards):
+    user_id, email= shards.register()
+    shards.copy_and_reassign(user_id, email, frozen=True)
+    response= auth_views.verify(_verify(user_id))
+    assert response.status_code== 503
+    assert response['Retry-After']
+    assert asyncio.run(auth_views.verify_async(_verify(user_id))).status_code== 503
+
+def test_admin_listing_and_export_skip_copies_on_other_shards(shards, monkeypatch):
+    monkeypatch.setenv('ADMIN_API_TOKEN', 'admin-secret')
+    user_id, email= shards.register()
+    shards.copy_and_reassign(user_id, email)
+    headers= {'HTTP_AUTHORIZATION':'Bearer admin-secret'}
+
+    listed= json.loads(admin_views.admin_users(RequestFactory().get('/admin/users/', {'limit':1}, **headers)).content)
+    assert [user['id'] for user in listed['users']]== [user_id]
+    assert listed['next_cursor'] is None
+
+    async def alist():
+        return json.loads((await admin_views.admin_users_async(RequestFactory().get('/admin/users/', **headers))).content)
+
+    assert [user['id'] for user in asyncio.run(alist())['users']]== [user_id]
+
+    export= admin_views.admin_users_export(RequestFactory().get('/admin/users/export/', **headers))
+    assert [json.loads(line)['id'] for line in b''.join(export.streaming_content).splitlines()]== [user_id]
+
+def test_reshard_drops_copies_of_users_deleted_during_the_move(shards, monkeypatch):
+    shards.store.save(ShardMap.initial(BUCKETS, 1, ID_STRIDE))
+    users= [shards.register() for _ in range(16)]
+    moving= [user_id for user_id, email in users if shards.store.current().rebalanced(2).shard_of(email)== 1]
+    deleted= moving[0]
+    copy= reshard_users.Command._copy
+
+    def copy_then_delete(command, source, destination, buckets, options, changed_since=None):
+        copied= copy(command, source, destination, buckets, options, changed_since)
+        if changed_since is None:
+            session= source()
+            try:
+                session.execute(client_user.delete().where(client_user.c.id== deleted))
+                session.commit()
+            finally:
+                session.close()
+        return copied
+
+    monkeypatch.setattr(reshard_users.Command, '_copy', copy_then_delete)
+    output= io.StringIO()
+    call_command(reshard_users.Command(), shards=2, settle=0, pause=0, stdout=output)
+    assert 'pruned 1 rows' in output.getvalue()
+    assert not shards.rows(1, deleted)
+    assert all(shards.rows(1, user_id) and not shards.rows(0, user_id) for user_id in moving[1:])
@@ -0,0 +1,37 @@
+"""One-off migrate_* commands on a sharded deployment (two SQLite shards)."""
+
+import io
+import pytest
+from django.core.management import call_command
+from sqlalchemy import text
+from app_config.settings.database import Base, LazySessionFactory, init_postgresql
+from app_config.settings.sharding import ShardedSessionFactory, ShardMapStore
+from applications.auth.auth_models import ClientUser, ClientUserArchive
+from applications.auth.management.commands import migrate_listing_index
+
+
+@pytest.fixture
+def shards(tmp_path, monkeypatch):
+    """Sharded SessionLocal over two fresh SQLite databases, without the listing index."""
+    factories= [init_postgresql(f'sqlite:///{tmp_path}/shard-{shard}.db', f'shard-{shard}') for shard in range(2)]
+    for factory in factories:
+        engine= factory.kw['bind']
+        Base.metadata.create_all(bind=engine, tables=[ClientUser.__table__, ClientUserArchive.__table__])
+        with engine.begin() as connection:
+            connection.execute(text('DROP INDEX ix_client_user_created_at_id'))
+    sharded= ShardedSessionFactory(factories, ShardMapStore())
+    monkeypatch.setattr(migrate_listing_index, 'SessionLocal', LazySessionFactory(lambda: sharded))
+    return factories
+
+
+def _indexes(factory)-> set:
+    with factory.kw['bind'].connect() as connection:
+        return set(connection.execute(text("SELECT name FROM sqlite_master WHERE type= 'index' AND tbl_name= 'client_user'")).scalars())
+
+
+def test_listing_index_is_built_on_every_shard(shards):
+    assert all('ix_client_user_created_at_id' not in _indexes(factory) for factory in shards)
+    output= io.StringIO()
+    call_command(migrate_listing_index.Command(), stdout=output)
+    assert all('ix_client_user_created_at_id' in _indexes(factory) for factory in shards)
+    assert 'Shard 1: index built.' in output.getvalue()
@@ -0,0 +1,87 @@
+"""Verification and login through the views, with the cached login record in between."""
+
+import json
+import uuid
+import asyncio
+from importlib import import_module
+import pytest
+from django.conf import settings
+from django.test import RequestFactory
+from applications.auth import auth_views
+from applications.auth.auth_cache import email_filter, user_lookup_cache
+from applications.shared.utils.tokens import verification_revocations, verification_signer
+
+PASSWORD= 'verify-login-password'
+
+
+@pytest.fixture
+def user(schema, pool):
+    """(id, email) of a freshly registered, unverified user."""
+    email= f'Verify-{uuid.uuid4().hex}@Example.com'
+    response= auth_views.register(RequestFactory().post('/auth/register/', data=json.dumps({
+        'first_name':'Verify',
+        'last_name':'Login',
+        'email':email,
+        'password':PASSWORD,
+    }), content_type='application/json'))
+    assert response.status_code== 201
+    return json.loads(response.content)['id'], email
+
+def _login_request(email:str):
+    request= RequestFactory().post('/auth/login/', data=json.dumps({'email':email, 'password':PASSWORD}), content_type='application/json')
+    request.session= import_module(settings.SESSION_ENGINE).SessionStore()
+    return request
+
+@pytest.fixture
+def empty_email_filter():
+    """A seeded email filter that has seen no email, as after a failed add."""
+    email_filter.bloom.rebuild([])
+    yield
+    email_filter.bloom._client.delete(email_filter.bloom.key, email_filter.bloom.ready_key)
+
+def _verify_request(user_id:int, token:str=None):
+    return RequestFactory().get('/auth/verify/', {'token':token or verification_signer().issue(user_id)})
+
+
+def test_login_right_after_verification_succeeds(user):
+    user_id, email= user
+    assert auth_views.login(_login_request(email)).status_code== 403
+    assert auth_views.verify(_verify_request(user_id)).status_code== 200
+    assert auth_views.login(_login_request(email)).status_code== 200
+
+def test_async_login_right_after_async_verification_succeeds(user):
+    user_id, email= user
+
+    async def scenario():
+        return [
+            (await auth_views.login_async(_login_request(email))).status_code,
+            (await auth_views.verify_async(_verify_request(user_id))).status_code,
+            (await auth_views.login_async(_login_request(email))).status_code,
+        ]
+
+    assert asyncio.run(scenario())== [403, 200, 200]
+
+def test_verification_links_are_single_use(user):
+    user_id, _= user
+    assert auth_views.verify(_verify_request(user_id)).status_code== 200
+    assert auth_views.verify(_verify_request(user_id)).status_code== 400
+
+def test_revoked_links_are_refused_and_used_links_revoked(user):
+    user_id, _= user
+    revoked, fresh= verification_signer().issue(user_id), verification_signer().issue(user_id)
+    assert verification_revocations().revoke(verification_signer().validate(revoked))
+    assert auth_views.verify(_verify_request(user_id, revoked)).status_code== 400
+
+    assert auth_views.verify(_verify_request(user_id, fresh)).status_code== 200
+    assert verification_revocations().is_revoked(verification_signer().validate(fresh))
+
+def test_users_the_email_filter_missed_can_still_log_in(user, empty_email_filter):
+    user_id, email= user
+    assert auth_views.verify(_verify_request(user_id)).status_code== 200
+    assert auth_views.login(_login_request(email)).status_code== 200
+    user_lookup_cache.invalidate(email.lower())
+
+    async def scenario():
+        return (await auth_views.login_async(_login_request(email))).status_code
+
+    assert asyncio.run(scenario())== 200